@@ -0,0 +1,121 @@
+import hmac
+
+import streamlit as st
+
+# Facilitator dashboard over the saved submissions. Run it next to the app:
+#
+#     streamlit run admin_app.py --server.port 8502
+#
+# It needs an [admin] table in st.secrets:
+#
+#     [admin]
+#     password = "..."
+#     refresh_seconds = 30   # read new rows at most this often
+#     page_size = 1000       # rows per storage read
+#
+# Figures come from analytics.py, which reads only rows appended since the
+# last refresh and keeps running totals, so reruns don't re-read the sheet.
+import metrics
+from analytics import GROUP_FIELDS, get_aggregates
+from questionnaire import LAYOUTS, OPTIONS, OWNER_REQUIREMENTS, PAGES
+
+# ---------------- CONFIG ----------------
+st.set_page_config(page_title="Assessment Dashboard", page_icon="📊", layout="wide")
+st.title("📊 Assessment Dashboard")
+metrics.configure()
+
+admin = st.secrets.get("admin", {})
+if not admin.get("password"):
+    st.error("The dashboard is disabled: set [admin] password in secrets.")
+    st.stop()
+
+# ---------------- SIGN IN ----------------
+if not st.session_state.get("admin_signed_in"):
+    with st.form("admin_sign_in"):
+        password = st.text_input("Password", type="password")
+        if st.form_submit_button("Sign in"):
+            if hmac.compare_digest(password.encode("utf-8"), str(admin["password"]).encode("utf-8")):
+                st.session_state.admin_signed_in = True
+                st.rerun()
+            st.error("Wrong password.")
+    st.stop()
+
+# ---------------- REFRESH ----------------
+aggregates = get_aggregates()
+refresh_col, status_col = st.columns([1, 4])
+try:
+    if refresh_col.button("🔄 Refresh now"):
+        aggregates.refresh()
+    else:
+        aggregates.refresh_if_stale(float(admin.get("refresh_seconds", 30)))
+except Exception as e:
+    # Keep showing what was read before; the next refresh picks up from the cursor
+    st.warning(f"Could not read new submissions: {e}")
+stats = aggregates.stats()
+status_col.caption(f"{stats['rows_read']} submissions read · last refresh {stats['last_new_rows']} new rows "
+                   f"in {stats['last_refresh_seconds'] * 1000:.0f} ms"
+                   + (f" · {stats['unplaced']} sheet1 rows fit no user type" if stats["unplaced"] else ""))
+
+# ---------------- FILTERS ----------------
+TYPE_LABELS = {"owner": "Business Owner", "starter": "Starting a Business", "future": "Future Entrepreneur"}
+
+st.sidebar.header("Filters")
+filters = {}
+for field in GROUP_FIELDS[1:]:
+    value = st.sidebar.selectbox(field, ["All"] + aggregates.values(field), key=f"filter_{field}")
+    if value != "All":
+        filters[field] = value
+
+# ---------------- SUBMISSIONS ----------------
+st.subheader("Submissions")
+by = st.radio("Group by", GROUP_FIELDS[1:], index=len(GROUP_FIELDS) - 2, horizontal=True)
+counts = aggregates.counts(by, filters)
+if not counts:
+    st.info("No submissions match these filters yet.")
+    st.stop()
+
+order = aggregates.values(by)
+table = [{by: value, **{TYPE_LABELS[t]: counts[value][t] for t in LAYOUTS}, "Total": sum(counts[value].values())}
+         for value in order if value in counts]
+totals = {TYPE_LABELS[t]: sum(per_type[t] for per_type in counts.values()) for t in LAYOUTS}
+cols = st.columns(len(totals) + 1)
+cols[0].metric("Total", sum(totals.values()))
+for col, (label, n) in zip(cols[1:], totals.items()):
+    col.metric(label, n)
+st.dataframe(table, hide_index=True, width="stretch")
+
+# ---------------- STAGE 3 COMPLIANCE ----------------
+st.subheader("Stage 3 compliance (business owners)")
+compliance = aggregates.compliance(by, filters)
+if compliance:
+    st.dataframe([{by: value, **{req: f"{rate:.0%}" for req, rate in compliance[value].items()}}
+                  for value in order if value in compliance],
+                 hide_index=True, width="stretch")
+    # Grouping by user type leaves one group: all owners matching the filters
+    overall = aggregates.compliance("User Type", filters)["owner"]
+    st.bar_chart({"Requirement": OWNER_REQUIREMENTS, "Met": [overall[req] for req in OWNER_REQUIREMENTS]},
+                 x="Requirement", y="Met", horizontal=True)
+else:
+    st.caption("No business owner submissions match these filters.")
+
+# ---------------- SCORES ----------------
+st.subheader("Average readiness scores")
+for user_type in LAYOUTS:
+    scores = aggregates.mean_scores(user_type, by, filters)
+    if scores:
+        st.markdown(f"**{TYPE_LABELS[user_type]}**")
+        st.dataframe([{by: value, **{column: round(mean, 1) for column, mean in scores[value].items()}}
+                      for value in order if value in scores],
+                     hide_index=True, width="stretch")
+
+# ---------------- ANSWER DISTRIBUTIONS ----------------
+st.subheader("Answer distributions")
+user_type = st.selectbox("User type", list(LAYOUTS), format_func=TYPE_LABELS.get)
+questions = {q.key: q.text for (ut, _), page in PAGES.items() if ut == user_type for q in page.questions}
+key = st.selectbox("Question", list(questions), format_func=lambda k: f"{k}: {questions[k]}")
+distribution = aggregates.distribution(user_type, key, filters)
+if sum(distribution.values()):
+    st.bar_chart({"Answer": list(OPTIONS[key][1:]), "Submissions": [distribution[o] for o in OPTIONS[key][1:]]},
+                 x="Answer", y="Submissions", horizontal=True)
+else:
+    st.caption("No submissions of this type match these filters.")
@@ -0,0 +1,229 @@
+"""Incremental aggregates over the saved submissions, for the admin dashboard.
+
+``Aggregates`` keeps a read cursor per worksheet. ``refresh`` pages in only the
+rows appended since the last call (``Storage.read_rows`` from the cursor), so
+when nothing is new a refresh is one read per worksheet, and otherwise its cost
+follows the number of new rows, not the size of the sheet.
+
+Rows are folded into a cube with one cell per user type and Stage 1 answer
+combination (age group, gender, KK Number). Each cell keeps its submission
+count, the option counts of every question and the score sums. Every breakdown
+the dashboard shows (per KK Number, per age group, Stage 3 compliance, ...)
+sums the matching cells, and there are at most a few hundred of those however
+many rows have been read.
+
+Rows of the first worksheet saved before per-user-type worksheets
+(storage.LEGACY_SHEET) are read the same way, from their own cursor, and
+counted under the user type their answers fit (history.upgrade_legacy), with
+the scores they never saved computed from the answers. Rows that fit no user
+type are only counted, as ``unplaced``.
+
+The aggregates live in memory for the life of the server process (one per
+storage config, see ``get_aggregates``); a restart reads the sheet once, a page
+at a time.
+"""
+import threading
+import time
+
+import streamlit as st
+
+import metrics
+from history import upgrade_legacy
+from questionnaire import BASIC_FIELDS, LAYOUTS, OPTIONS, OWNER_REQUIREMENTS, ROW_PREFIX, SCORE_COLUMNS, WORKSHEETS
+from storage import LEGACY_SHEET, get_storage, storage_config
+
+GROUP_FIELDS = ("User Type",) + tuple(BASIC_FIELDS[1:])   # User Type, Age Group, Gender, KK Number
+_GROUP_START = len(ROW_PREFIX) + 1   # Stage 1 choices follow the registration code
+_ANSWERS_START = len(ROW_PREFIX) + len(BASIC_FIELDS)
+_INDEX = {key: {option: i for i, option in enumerate(options)} for key, options in OPTIONS.items()}
+_REQUIREMENT_POSITIONS = [LAYOUTS["owner"].index(key) for key in OWNER_REQUIREMENTS]
+_YES = [_INDEX[key]["Yes"] for key in OWNER_REQUIREMENTS]
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class Cell:
+    __slots__ = ("count", "options", "scores")
+
+    def __init__(self, user_type):
+        self.count = 0
+        # options[question position][option index]; index 0 counts blank or unknown answers
+        self.options = [[0] * len(OPTIONS[key]) for key in LAYOUTS[user_type]]
+        self.scores = [0.0] * len(SCORE_COLUMNS[user_type])
+
+
+class Aggregates:
+    def __init__(self, storage, page_size=1000):
+        self._storage = storage
+        self._page_size = page_size
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._cursors = {sheet: 0 for sheet in (LEGACY_SHEET, *WORKSHEETS.values())}
+        self._cells = {}   # (user type, age group, gender, KK Number) -> Cell
+        self.rows_read = 0
+        self.unplaced = 0   # sheet1 rows no user type fits
+        self.refreshes = 0
+        self.last_refresh = None   # time.time() of the last completed refresh
+        self.last_refresh_seconds = 0.0
+        self.last_new_rows = 0
+
+    def rebuild(self):
+        # Forget everything and read the sheets again from the top
+        with self._lock:
+            self._reset()
+        return self.refresh()
+
+    # -------- reading --------
+    def _fold(self, user_type, rows):
+        indices = [_INDEX[key] for key in LAYOUTS[user_type]]
+        scores_start = _ANSWERS_START + len(indices)
+        scores_end = scores_start + len(SCORE_COLUMNS[user_type])
+        for row in rows:
+            group = (user_type,) + tuple(str(v) for v in row[_GROUP_START:_ANSWERS_START])
+            cell = self._cells.get(group)
+            if cell is None:
+                cell = self._cells[group] = Cell(user_type)
+            cell.count += 1
+            for counts, index, value in zip(cell.options, indices, row[_ANSWERS_START:scores_start]):
+                counts[index.get(value, 0)] += 1
+            for i, value in enumerate(row[scores_start:scores_end]):
+                cell.scores[i] += _number(value)
+
+    def _fold_legacy(self, rows):
+        # sheet1 rows, each under the user type its answers fit
+        placed = {}
+        for row in rows:
+            upgraded = upgrade_legacy(row)
+            if upgraded is None:
+                self.unplaced += 1
+            else:
+                placed.setdefault(upgraded[0], []).append(upgraded[1])
+        for user_type, upgraded in placed.items():
+            self._fold(user_type, upgraded)
+
+    def refresh(self):
+        # Pages in the rows appended since the last call; returns how many were new.
+        # The cursor moves per page, so a failed read resumes where it stopped.
+        with self._lock, metrics.span("admin_refresh"):
+            started = time.perf_counter()
+            new = 0
+            sources = [(LEGACY_SHEET, self._fold_legacy)]
+            sources += [(sheet, lambda rows, user_type=user_type: self._fold(user_type, rows))
+                        for user_type, sheet in WORKSHEETS.items()]
+            for sheet, fold in sources:
+                while True:
+                    rows = self._storage.read_rows(sheet, self._cursors[sheet], self._page_size)
+                    fold(rows)
+                    self._cursors[sheet] += len(rows)
+                    new += len(rows)
+                    if len(rows) < self._page_size:
+                        break
+            self.rows_read += new
+            self.refreshes += 1
+            self.last_new_rows = new
+            self.last_refresh = time.time()
+            self.last_refresh_seconds = time.perf_counter() - started
+        metrics.inc("admin_rows_read", new)
+        return new
+
+    def refresh_if_stale(self, max_age):
+        # Every rerun of the dashboard calls this; the sheet is read at most once per max_age seconds
+        if self.last_refresh is not None and time.time() - self.last_refresh < max_age:
+            return 0
+        return self.refresh()
+
+    # -------- queries --------
+    def _matching(self, filters, user_type=None):
+        # filters maps a GROUP_FIELDS name to the value to keep
+        positions = [(GROUP_FIELDS.index(field), value) for field, value in filters.items()]
+        for group, cell in self._cells.items():
+            if user_type is not None and group[0] != user_type:
+                continue
+            if all(group[i] == value for i, value in positions):
+                yield group, cell
+
+    def values(self, field):
+        # Values of a group field seen so far, in questionnaire order where there is one
+        i = GROUP_FIELDS.index(field)
+        with self._lock:
+            seen = {group[i] for group in self._cells}
+        order = list(LAYOUTS) if field == "User Type" else list(OPTIONS.get(field, ()))
+        return sorted(seen, key=lambda v: (order.index(v) if v in order else len(order), v))
+
+    def counts(self, by, filters=None):
+        # {value of `by`: {user type: submissions}}
+        i = GROUP_FIELDS.index(by)
+        result = {}
+        with self._lock:
+            for group, cell in self._matching(filters or {}):
+                per_type = result.setdefault(group[i], dict.fromkeys(LAYOUTS, 0))
+                per_type[group[0]] += cell.count
+        return result
+
+    def distribution(self, user_type, key, filters=None):
+        # {option: submissions} for one question; blank or unrecognised answers count as "(none)"
+        position = LAYOUTS[user_type].index(key)
+        totals = [0] * len(OPTIONS[key])
+        with self._lock:
+            for _, cell in self._matching(filters or {}, user_type):
+                for option, n in enumerate(cell.options[position]):
+                    totals[option] += n
+        result = dict(zip(OPTIONS[key][1:], totals[1:]))
+        if totals[0]:
+            result["(none)"] = totals[0]
+        return result
+
+    def compliance(self, by="KK Number", filters=None):
+        # {value of `by`: {requirement: share of owners answering Yes}}
+        i = GROUP_FIELDS.index(by)
+        yes, owners = {}, {}
+        with self._lock:
+            for group, cell in self._matching(filters or {}, "owner"):
+                met = yes.setdefault(group[i], [0] * len(OWNER_REQUIREMENTS))
+                owners[group[i]] = owners.get(group[i], 0) + cell.count
+                for r, (position, option) in enumerate(zip(_REQUIREMENT_POSITIONS, _YES)):
+                    met[r] += cell.options[position][option]
+        return {value: {req: n / owners[value] for req, n in zip(OWNER_REQUIREMENTS, met)}
+                for value, met in yes.items()}
+
+    def mean_scores(self, user_type, by="KK Number", filters=None):
+        # {value of `by`: {score column: mean}}
+        i = GROUP_FIELDS.index(by)
+        sums, counts = {}, {}
+        with self._lock:
+            for group, cell in self._matching(filters or {}, user_type):
+                total = sums.setdefault(group[i], [0.0] * len(cell.scores))
+                counts[group[i]] = counts.get(group[i], 0) + cell.count
+                for s, value in enumerate(cell.scores):
+                    total[s] += value
+        return {value: {column: s / counts[value] for column, s in zip(SCORE_COLUMNS[user_type], total)}
+                for value, total in sums.items()}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rows_read": self.rows_read,
+                "unplaced": self.unplaced,
+                "cells": len(self._cells),
+                "refreshes": self.refreshes,
+                "last_new_rows": self.last_new_rows,
+                "last_refresh_seconds": self.last_refresh_seconds,
+                "cursors": dict(self._cursors),
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def _cached_aggregates(storage_cfg, page_size):
+    return Aggregates(get_storage(storage_cfg), page_size)
+
+
+def get_aggregates():
+    cfg = st.secrets.get("admin", {})
+    return _cached_aggregates(storage_config(), int(cfg.get("page_size", 1000)))
@@ -0,0 +1,105 @@
+"""Compact per-session answer store.
+
+Instead of keeping the full option strings in a dict, a session stores one
+small integer per question (the option's index in questionnaire.OPTIONS) in a
+fixed-layout ``bytearray`` for its user type, plus the three Stage 1 choices
+and the free-text registration code. Strings are only decoded when a row is
+written or a report is rendered (``to_dict``).
+
+``Answers`` keeps the ``update``/``get`` calls the app already used on the
+plain dict, and ``pack``/``unpack`` give a byte form for hashing and storage.
+"""
+from questionnaire import BASIC_FIELDS, LAYOUTS, OPTIONS
+
+REGISTRATION_CODE = BASIC_FIELDS[0]
+CHOICE_FIELDS = BASIC_FIELDS[1:]   # Age Group, Gender, KK Number
+
+_LAYOUT_IDS = {name: i for i, name in enumerate(LAYOUTS, start=1)}
+_LAYOUT_NAMES = {i: name for name, i in _LAYOUT_IDS.items()}
+_SLOTS = {key: (name, pos) for name, keys in LAYOUTS.items() for pos, key in enumerate(keys)}
+_CHOICE_SLOTS = {key: pos for pos, key in enumerate(CHOICE_FIELDS)}
+_INDEX = {key: {option: i for i, option in enumerate(options)} for key, options in OPTIONS.items()}
+
+
+class Answers:
+    __slots__ = ("registration_code", "basic", "layout", "codes")
+
+    def __init__(self):
+        self.registration_code = ""
+        self.basic = bytearray(len(CHOICE_FIELDS))
+        self.layout = None
+        self.codes = None
+
+    # -------- writing --------
+    def _store(self, key, index):
+        if key in _CHOICE_SLOTS:
+            self.basic[_CHOICE_SLOTS[key]] = index
+            return
+        layout, pos = _SLOTS[key]
+        if self.layout != layout:
+            # Switching user type (e.g. after going back) starts a fresh layout
+            self.layout = layout
+            self.codes = bytearray(len(LAYOUTS[layout]))
+        self.codes[pos] = index
+
+    def __setitem__(self, key, value):
+        if key == REGISTRATION_CODE:
+            self.registration_code = value
+        else:
+            self._store(key, _INDEX[key][value])
+
+    def update(self, mapping):
+        for key, value in mapping.items():
+            self[key] = value
+
+    def set_codes(self, picks):
+        # picks maps key -> option index, as returned by the schema-driven widgets
+        for key, index in picks.items():
+            self._store(key, index)
+
+    # -------- reading --------
+    def get(self, key, default=None):
+        if key == REGISTRATION_CODE:
+            return self.registration_code or default
+        if key in _CHOICE_SLOTS:
+            index = self.basic[_CHOICE_SLOTS[key]]
+        else:
+            slot = _SLOTS.get(key)
+            if slot is None or slot[0] != self.layout:
+                return default
+            index = self.codes[slot[1]]
+        return OPTIONS[key][index] if index else default
+
+    def items(self):
+        # Decoded (key, option string) pairs for every answered question
+        if self.registration_code:
+            yield REGISTRATION_CODE, self.registration_code
+        for key, index in zip(CHOICE_FIELDS, self.basic):
+            if index:
+                yield key, OPTIONS[key][index]
+        if self.layout:
+            for key, index in zip(LAYOUTS[self.layout], self.codes):
+                if index:
+                    yield key, OPTIONS[key][index]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    # -------- byte form --------
+    def pack(self):
+        # layout id, Stage 1 choices, answer codes, then the registration code
+        header = bytes([_LAYOUT_IDS.get(self.layout, 0)]) + bytes(self.basic)
+        return header + bytes(self.codes or b"") + self.registration_code.encode("utf-8")
+
+    @classmethod
+    def unpack(cls, packed):
+        answers = cls()
+        layout = _LAYOUT_NAMES.get(packed[0])
+        offset = 1 + len(CHOICE_FIELDS)
+        answers.basic[:] = packed[1:offset]
+        if layout:
+            answers.layout = layout
+            answers.codes = bytearray(packed[offset:offset + len(LAYOUTS[layout])])
+            offset += len(LAYOUTS[layout])
+        answers.registration_code = bytes(packed[offset:]).decode("utf-8")
+        return answers
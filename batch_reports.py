@@ -0,0 +1,215 @@
+"""Offline regeneration of report PDFs from stored submissions.
+
+    python batch_reports.py --mode zip --out reports/          # reports/reports.zip
+    python batch_reports.py --mode kk --kk 3 --out reports/    # reports/KK_3.pdf
+
+Stored rows, and the sheet1 rows saved before per-user-type worksheets, are
+read a page at a time and normalized like export.py does, then rendered on the
+same worker pool the app uses (workers.ReportPool), so every PDF comes from the
+same layout code (report.render_report) as a live download. The report date
+is the submission's timestamp. ``--processes`` defaults to one per CPU; at most
+``4 x processes`` reports are in flight at once.
+
+``--mode zip`` writes one zip with a PDF per respondent, grouped in folders by
+KK Number. ``--mode kk`` writes one merged PDF per KK Number: a contents page
+listing every respondent with their page number, then the reports in order,
+each with a bookmark. Merging needs pypdf, imported only for this mode.
+
+Progress goes to stderr; a summary with reports/sec is printed at the end.
+"""
+import argparse
+import io
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from collections import deque
+from datetime import datetime
+
+from export import PAGE_SIZE, iter_legacy_rows, iter_rows, storage_from_args
+from questionnaire import LAYOUTS, SHEET_HEADERS, WORKSHEETS
+from report_specs import REPORTS
+
+TYPE_LABELS = {"owner": "Business Owner", "starter": "Starting a Business", "future": "Future Entrepreneur"}
+PROGRESS_INTERVAL = 1.0   # seconds between progress lines
+
+
+def submissions(storage, user_types, kk_numbers=None, page_size=PAGE_SIZE):
+    # (user_type, data dict) per stored row, optionally only for some KK Numbers
+    def stored():
+        # sheet1 in one pass, then each user type's worksheet
+        yield from iter_legacy_rows(storage, user_types, page_size)
+        for user_type in user_types:
+            for row in iter_rows(storage, WORKSHEETS[user_type], page_size):
+                yield user_type, row
+
+    for user_type, row in stored():
+        data = dict(zip(SHEET_HEADERS[WORKSHEETS[user_type]], row))
+        if kk_numbers and data["KK Number"] not in kk_numbers:
+            continue
+        yield user_type, data
+
+
+def _submitted_at(data):
+    try:
+        return datetime.strptime(data["Timestamp"], "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return datetime.now()
+
+
+def _file_name(user_type, data, when):
+    code = re.sub(r"[^A-Za-z0-9._-]+", "_", data["Registration Code"]).strip("_") or "unknown"
+    return f"{code}_{REPORTS[user_type].file_name(when)}"
+
+
+def render_all(pool, items, sink, progress):
+    # Keeps the pool's pending slots full and hands finished PDFs to sink in input order
+    pending = deque()
+
+    def finish_oldest():
+        (user_type, data, when), future = pending.popleft()
+        sink(user_type, data, when, future.result())
+        progress.step()
+
+    for user_type, data in items:
+        if len(pending) >= pool.max_pending:
+            finish_oldest()
+        when = _submitted_at(data)
+        pending.append(((user_type, data, when), pool.submit(user_type, data, when)))
+    while pending:
+        finish_oldest()
+
+
+class Progress:
+    def __init__(self, stream=sys.stderr):
+        self.stream = stream
+        self.done = 0
+        self.started = time.perf_counter()
+        self._last = 0.0
+
+    def step(self):
+        self.done += 1
+        now = time.perf_counter()
+        if now - self._last >= PROGRESS_INTERVAL:
+            self._last = now
+            self.stream.write(f"\r{self.done} reports  {self.rate:.1f}/s")
+            self.stream.flush()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        return self.done / self.elapsed if self.elapsed else 0.0
+
+
+# ---------------- outputs ----------------
+class ZipSink:
+    def __init__(self, path):
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+        self._names = set()
+
+    def __call__(self, user_type, data, when, pdf_bytes):
+        name = f"KK_{data['KK Number']}/{_file_name(user_type, data, when)}"
+        base, n = name[:-len(".pdf")], 1
+        while name in self._names:
+            n += 1
+            name = f"{base}_{n}.pdf"
+        self._names.add(name)
+        self._zip.writestr(name, pdf_bytes)
+
+    def close(self):
+        self._zip.close()
+
+
+class KKBundleSink:
+    """Spools PDFs to a temp dir per KK Number, then merges each with a contents page."""
+
+    def __init__(self, out_dir):
+        self._out_dir = out_dir
+        self._tmp = tempfile.mkdtemp(prefix="kk_bundles_")
+        self._entries = {}   # KK Number -> [(label, path), ...]
+        self._count = 0
+
+    def __call__(self, user_type, data, when, pdf_bytes):
+        entries = self._entries.setdefault(data["KK Number"], [])
+        self._count += 1
+        path = os.path.join(self._tmp, f"{self._count}.pdf")
+        with open(path, "wb") as f:
+            f.write(pdf_bytes)
+        label = f"{data['Registration Code']} · {TYPE_LABELS[user_type]} · {data['Timestamp']}"
+        entries.append((label, path))
+
+    def close(self):
+        try:
+            for kk, entries in sorted(self._entries.items()):
+                self._merge(kk, entries)
+        finally:
+            shutil.rmtree(self._tmp)
+
+    def _merge(self, kk, entries):
+        from pypdf import PdfReader, PdfWriter
+
+        from report import render_contents
+
+        readers = [PdfReader(path) for _, path in entries]
+        # The contents pages come first, so render once to learn how many there are
+        contents_pages = 1
+        while True:
+            page, toc = contents_pages + 1, []
+            for (label, _), reader in zip(entries, readers):
+                toc.append((label, page))
+                page += len(reader.pages)
+            contents, pages = render_contents(f"KK Number {kk}: {len(entries)} reports", toc)
+            if pages == contents_pages:
+                break
+            contents_pages = pages
+
+        writer = PdfWriter()
+        writer.append(PdfReader(io.BytesIO(contents)))
+        for (label, _), reader in zip(entries, readers):
+            writer.append(reader, outline_item=label)
+        with open(os.path.join(self._out_dir, f"KK_{kk}.pdf"), "wb") as f:
+            writer.write(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["zip", "kk"], default="zip")
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--user-type", action="append", choices=sorted(LAYOUTS),
+                        help="only this user type (repeatable; default all)")
+    parser.add_argument("--kk", action="append", help="only this KK Number (repeatable; default all)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="rows per storage read")
+    parser.add_argument("--backend", choices=["sheets", "sqlite", "csv", "parquet"],
+                        help="read this backend instead of the [storage] secret")
+    parser.add_argument("--path", help="file or directory of a local --backend")
+    args = parser.parse_args()
+
+    from workers import ReportPool
+
+    os.makedirs(args.out, exist_ok=True)
+    sink = ZipSink(os.path.join(args.out, "reports.zip")) if args.mode == "zip" else KKBundleSink(args.out)
+    items = submissions(storage_from_args(args), args.user_type or list(LAYOUTS), args.kk, args.page_size)
+    pool = ReportPool(args.processes, args.processes * 4)
+    progress = Progress()
+    try:
+        render_all(pool, items, sink, progress)
+        rendered = progress.elapsed
+        sink.close()
+    finally:
+        pool.close()
+    total = progress.elapsed
+    sys.stderr.write("\n")
+    print(f"{progress.done} reports on {args.processes} processes: {rendered:.1f}s rendering "
+          f"({progress.done / rendered if rendered else 0.0:.1f} reports/s), {total:.1f}s in total")
+    print(f"written to {os.path.abspath(args.out)}")
+
+
+if __name__ == "__main__":
+    main()
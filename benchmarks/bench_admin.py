@@ -0,0 +1,92 @@
+"""Admin dashboard refresh cost as the sheet grows (see analytics.py).
+
+Grows a storage backend to each size in --sizes, appending --new rows after
+every step, and times refreshing the dashboard aggregates two ways: the
+incremental refresh (read from the cursor, fold in the new rows) and a full
+rebuild (re-read every row, what a get_all_records() dashboard does). The
+incremental column should stay flat while the rebuild grows with the sheet.
+
+    python benchmarks/bench_admin.py --sizes 1000 10000 100000 --backend sqlite
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+from analytics import Aggregates  # noqa: E402
+from questionnaire import BASIC_QUESTIONS, LAYOUTS, OPTIONS, SCHEMA_VERSION, SCORE_COLUMNS, WORKSHEETS  # noqa: E402
+from recommendations import recommend, summary  # noqa: E402
+
+
+def synthetic_rows(n, rng):
+    # (worksheet, row) pairs with random answers across the three user types
+    for i in range(n):
+        user_type = rng.choice(list(LAYOUTS))
+        row = ["2026-01-01 00:00:00", SCHEMA_VERSION, f"REG-{i:06d}"]
+        row += [rng.choice(q.options[1:]) for q in BASIC_QUESTIONS]
+        answers = {key: rng.choice(OPTIONS[key][1:]) for key in LAYOUTS[user_type]}
+        row += answers.values()
+        row += [round(rng.uniform(0, 100), 1) for _ in SCORE_COLUMNS[user_type]]
+        row.append(summary(recommend(user_type, answers)))
+        yield WORKSHEETS[user_type], row
+
+
+def append(backend, rows):
+    by_sheet = {}
+    for sheet, row in rows:
+        by_sheet.setdefault(sheet, []).append(row)
+    for sheet, batch in by_sheet.items():
+        backend.append_rows(sheet, batch)
+
+
+def make_backend(name, tmp):
+    if name == "sqlite":
+        return storage.SQLiteStorage(os.path.join(tmp, "bench.db"))
+    if name == "csv":
+        return storage.CsvLogStorage(os.path.join(tmp, "csv"))
+    return storage.FakeSheetsStorage(latency=0, jitter=0, quota_per_minute=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--new", type=int, default=200, help="rows appended between refreshes")
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--backend", default="sqlite", choices=["sqlite", "csv", "fake"])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tmp = tempfile.mkdtemp(prefix="bench_admin_")
+    try:
+        backend = make_backend(args.backend, tmp)
+        aggregates = Aggregates(backend, args.page)
+        size = 0
+        print(f"{'rows':>9}{'incremental ms':>16}{'rebuild ms':>12}")
+        for target in sorted(args.sizes):
+            append(backend, synthetic_rows(target - size, rng))
+            size = target
+            aggregates.refresh()   # catch up to the grown sheet, untimed
+
+            append(backend, synthetic_rows(args.new, rng))
+            size += args.new
+            started = time.perf_counter()
+            aggregates.refresh()
+            incremental = time.perf_counter() - started
+
+            started = time.perf_counter()
+            Aggregates(backend, args.page).refresh()
+            rebuild = time.perf_counter() - started
+            print(f"{size:>9}{incremental * 1000:>16.1f}{rebuild * 1000:>12.1f}")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""Load test: concurrent simulated respondents through personality_app.py.
+
+Each simulated session drives the real script through Streamlit's AppTest
+harness: Stage 1 -> 1.5 -> Stage 2 (future/starter/owner) -> Stage 3 (owners)
+-> report, with randomized answers so the report cache doesn't short-circuit
+rendering. Rows go to the ``fake`` storage backend (storage.py), whose latency
+and quota are configurable, through the usual write-behind queue.
+
+AppTest patches process-wide state, so each concurrent client is its own
+process with its own report pool (--pdf-processes each), write-behind queue
+and fake backend; sessions within a client run back to back and stay alive
+until the level ends. Concurrency N is therefore N independent copies of the
+app side by side, each with its own caches and its own fake Sheets quota, not
+N sessions sharing one ``streamlit run`` server: the figures are aggregate
+throughput of N instances, not the capacity of one. The printed report and the
+JSON (``topology``, ``app_instances``) say so.
+
+For every concurrency level the run reports per-step p50/p95/p99 latency,
+sessions/sec and resident-memory growth per live session; the highest
+sessions/sec across levels is the saturation throughput (of that many
+instances together). PDF render time is
+measured separately, in-process, on the answers the sessions produced.
+
+    python benchmarks/bench_load.py --sessions 60 --concurrency 1,4,8,16 \\
+        --latency 0.3 --output load.json
+
+Results are written as JSON so runs can be compared over time.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "personality_app.py")
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from questionnaire import CHOICES, OPTIONS, PAGES  # noqa: E402
+from scoring import score  # noqa: E402
+
+FLOWS = ("future", "starter", "owner")
+TOPOLOGY = "one app instance per client"
+TOPOLOGY_NOTE = ("each concurrent client is a separate process running its own copy of the app (report pool, "
+                 "queue, caches, fake Sheets quota); figures at concurrency N are N independent instances, "
+                 "not per-instance capacity")
+ADULT_AGES = [a for a in OPTIONS["Age Group"][1:] if a != "Below 18"]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def rss_mb():
+    # Current RSS where /proc is available, peak RSS otherwise
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Session:
+    def __init__(self, index, flow, secrets, rng, timeout):
+        self.index = index
+        self.flow = flow
+        self.rng = rng
+        self.timings = []   # (step, seconds)
+        self.at = AppTest.from_file(APP, default_timeout=timeout)
+        for section, values in secrets.items():
+            self.at.secrets[section] = values
+
+    def _step(self, name, action):
+        t0 = time.perf_counter()
+        action()
+        self.at.run()
+        self.timings.append((name, time.perf_counter() - t0))
+        if self.at.exception:
+            raise RuntimeError(f"{name}: {self.at.exception[0].message}")
+        if self.at.error:
+            raise RuntimeError(f"{name}: {self.at.error[0].value}")
+
+    def _answer_page(self):
+        # Widgets come back in question order, split by widget type
+        page = PAGES[(self.at.session_state.user_type, self.at.session_state.stage)]
+        widgets = {"selectbox": iter(self.at.selectbox), "radio": iter(self.at.radio)}
+        for q in page.questions:
+            next(widgets[q.widget]).set_value(self.rng.randrange(1, len(CHOICES[q.key])))
+        self.at.button[1].click()
+
+    def run(self):
+        at = self.at
+        self._step("load", lambda: None)
+
+        def stage1():
+            at.text_input[0].input(f"LOAD-{self.index:06d}")
+            at.selectbox[0].set_value("Below 18" if self.flow == "future" else self.rng.choice(ADULT_AGES))
+            at.selectbox[1].set_value(self.rng.choice(OPTIONS["Gender"][1:]))
+            at.selectbox[2].set_value(self.rng.choice(OPTIONS["KK Number"][1:]))
+            at.button[0].click()
+        self._step("stage1", stage1)
+
+        if self.flow != "future":
+            def stage1_5():
+                at.selectbox[0].set_value("Yes" if self.flow == "owner" else "No")
+                at.button[1].click()
+            self._step("stage1_5", stage1_5)
+
+        if self.flow == "owner":
+            self._step("stage2_owner", self._answer_page)
+            self._step("stage3_report", self._answer_page)
+        else:
+            self._step(f"stage2_{self.flow}_report", self._answer_page)
+
+        if at.session_state.stage != 4 or not at.get("download_button"):
+            raise RuntimeError("finished without a report download")
+        # A rerun of the final screen is served from the report cache
+        self._step("stage4_rerun", lambda: None)
+        return self
+
+
+def client(job):
+    # One simulated client process: runs its share of sessions back to back
+    # and keeps them alive until the end, like live sessions on a server.
+    plans, secrets, args = job
+    if not args.verbose:
+        # AppTest resets Streamlit's log level on every run; the app's widget
+        # warnings would drown the report, and failures are counted anyway
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 2)
+    sessions, errors = [], defaultdict(int)
+    # One uncounted session first, so imports and caches aren't billed to the rest
+    Session(-1, "owner", secrets, random.Random(0), args.timeout).run()
+    rss_before = rss_mb()
+    started = time.time()
+    for index, flow, seed in plans:
+        try:
+            sessions.append(Session(index, flow, secrets, random.Random(seed), args.timeout).run())
+        except Exception as e:
+            errors[str(e).split(":")[0]] += 1
+    finished = time.time()
+    rss_after = rss_mb()
+    return {
+        "timings": [t for s in sessions for t in s.timings],
+        "errors": dict(errors),
+        "rss_growth_mb": rss_after - rss_before,
+        "started": started,
+        "finished": finished,
+        "answers": [(s.flow, {**s.at.session_state.data.to_dict(), **score(s.at.session_state.data)})
+                    for s in sessions],
+        "answers_bytes": [len(s.at.session_state.data.pack()) for s in sessions],
+        "backend": shutdown(secrets, args.drain_wait),
+    }
+
+
+def run_level(concurrency, sessions, secrets, args, first_index, tmp):
+    # AppTest patches process-wide state (st.secrets, the Runtime singleton),
+    # so concurrent sessions need one process each rather than threads.
+    rng = random.Random(args.seed + first_index)
+    plans = [(first_index + i, FLOWS[(first_index + i) % len(FLOWS)], rng.random()) for i in range(sessions)]
+    jobs = []
+    for k in range(concurrency):
+        client_secrets = dict(secrets, queue={"spool_path": os.path.join(tmp, f"level{first_index}-{k}.db")},
+                              registrations={"path": os.path.join(tmp, f"level{first_index}-{k}-codes.db")},
+                              drafts={"path": os.path.join(tmp, f"level{first_index}-{k}-drafts.db")})
+        jobs.append((plans[k::concurrency], client_secrets, args))
+
+    # Executor workers aren't daemonic, so each client can start its report pool
+    with ProcessPoolExecutor(concurrency, mp_context=multiprocessing.get_context("spawn")) as pool:
+        clients = list(pool.map(client, jobs))
+    # Wall time from the first measured session to the last, without process startup
+    elapsed = max(c["finished"] for c in clients) - min(c["started"] for c in clients)
+
+    steps, errors = defaultdict(list), defaultdict(int)
+    for c in clients:
+        for name, seconds in c["timings"]:
+            steps[name].append(seconds)
+        for kind, n in c["errors"].items():
+            errors[kind] += n
+    answers = [a for c in clients for a in c["answers"]]
+    answer_sizes = [n for c in clients for n in c["answers_bytes"]]
+    completed = len(answers)
+    results = {
+        "concurrency": concurrency,
+        "app_instances": concurrency,
+        "sessions": sessions,
+        "completed": completed,
+        "errors": dict(errors),
+        "elapsed_s": elapsed,
+        "sessions_per_sec": completed / elapsed,
+        "rss_growth_mb_per_session": sum(c["rss_growth_mb"] for c in clients) / max(1, completed),
+        "answers_bytes_per_session": statistics.mean(answer_sizes) if answer_sizes else 0,
+        "steps": {name: summarize(samples) for name, samples in sorted(steps.items())},
+        "backend": {
+            "rows_stored": sum(c["backend"]["rows_stored"] for c in clients),
+            "quota_errors": sum(c["backend"]["quota_errors"] for c in clients),
+            "queue_failures": sum(c["backend"]["queue"]["failures"] for c in clients),
+            "queue_depth": sum(c["backend"]["queue"]["depth"] for c in clients),
+        },
+    }
+    return results, answers
+
+
+def summarize(samples):
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+def pdf_render_times(answers, limit):
+    from report import render_report, warm_up
+    warm_up()
+    timings = defaultdict(list)
+    sizes = defaultdict(list)
+    for user_type, data in answers[:limit]:
+        t0 = time.perf_counter()
+        pdf = render_report(user_type, data)
+        timings[user_type].append(time.perf_counter() - t0)
+        sizes[user_type].append(len(pdf))
+    return {ut: dict(summarize(t), avg_bytes=statistics.mean(sizes[ut])) for ut, t in timings.items()}
+
+
+def shutdown(secrets, wait):
+    # Same arguments as the app's calls, so these hit the same cached instances.
+    # Drains the queue and stops the report pool so the client process can exit.
+    import storage
+    import submission_queue
+    import workers
+    config = tuple(sorted(secrets["storage"].items()))
+    queue = submission_queue._cached_queue(secrets["queue"]["spool_path"])
+    deadline = time.monotonic() + wait
+    while queue.depth and time.monotonic() < deadline:
+        time.sleep(0.1)
+    fake = storage.get_storage(config)
+    stats = {"queue": queue.stats(), "rows_stored": sum(fake.row_count(sheet) for sheet in list(fake._sheets)),
+             "quota_errors": fake.quota_errors}
+    queue.close()
+    workers._cached_pool(secrets["workers"]["pdf_processes"], secrets["workers"]["max_pending"]).close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=30, help="sessions per concurrency level")
+    parser.add_argument("--concurrency", default="1,4,8", help="comma-separated concurrency levels")
+    parser.add_argument("--latency", type=float, default=0.3, help="fake Sheets seconds per call")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--quota", type=int, default=60, help="fake Sheets writes per minute (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake Sheets calls that fail")
+    parser.add_argument("--pdf-processes", type=int, default=1, help="[workers].pdf_processes per client")
+    parser.add_argument("--pdf-samples", type=int, default=60, help="reports to time in-process")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds per script run")
+    parser.add_argument("--drain-wait", type=float, default=30, help="seconds to wait for the queue to empty")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="keep the clients' Streamlit log output")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_load_")
+    secrets = {
+        "storage": {"backend": "fake", "latency": args.latency, "jitter": args.jitter,
+                    "quota_per_minute": args.quota, "error_rate": args.error_rate},
+        "workers": {"pdf_processes": args.pdf_processes, "max_pending": args.pdf_processes * 4},
+    }
+
+    print(f"note: {TOPOLOGY_NOTE}")
+    levels, answers = [], []
+    for i, concurrency in enumerate(int(c) for c in args.concurrency.split(",")):
+        level, level_answers = run_level(concurrency, args.sessions, secrets, args, i * args.sessions, tmp)
+        levels.append(level)
+        answers.extend(level_answers)
+        print(f"concurrency {concurrency:>3} ({concurrency} app instances): {level['completed']}/{level['sessions']} sessions, "
+              f"{level['sessions_per_sec']:.2f} sessions/s, "
+              f"{level['rss_growth_mb_per_session'] * 1024:.0f} KB RSS/session, errors {level['errors']}")
+        print(f"    backend: {level['backend']['rows_stored']} rows stored, "
+              f"{level['backend']['quota_errors']} quota errors, {level['backend']['queue_depth']} left in spool")
+        for name, s in level["steps"].items():
+            print(f"    {name:<22}p50 {s['p50_ms']:>8.1f}  p95 {s['p95_ms']:>8.1f}  p99 {s['p99_ms']:>8.1f} ms")
+
+    saturation = max(levels, key=lambda lv: lv["sessions_per_sec"])
+    summary = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "cpus": os.cpu_count(),
+        "settings": {k: v for k, v in vars(args).items() if k != "output"},
+        "topology": TOPOLOGY,
+        "topology_note": TOPOLOGY_NOTE,
+        "levels": levels,
+        "saturation": {"concurrency": saturation["concurrency"],
+                       "app_instances": saturation["app_instances"],
+                       "sessions_per_sec": saturation["sessions_per_sec"]},
+        "pdf_render": pdf_render_times(answers, args.pdf_samples),
+    }
+    print(f"saturation: {summary['saturation']['sessions_per_sec']:.2f} sessions/s "
+          f"at concurrency {summary['saturation']['concurrency']}, summed over "
+          f"{summary['saturation']['app_instances']} independent app instances")
+    for user_type, s in summary["pdf_render"].items():
+        print(f"pdf {user_type:<8}p50 {s['p50_ms']:>7.1f}  p95 {s['p95_ms']:>7.1f}  p99 {s['p99_ms']:>7.1f} ms, "
+              f"{s['avg_bytes']:.0f} bytes")
+
+    shutil.rmtree(tmp, ignore_errors=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
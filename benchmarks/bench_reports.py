@@ -0,0 +1,66 @@
+"""Micro-benchmark for report.py.
+
+Renders each report kind repeatedly and prints reports/sec plus p50/p99 render
+time, so layout or styling changes can be checked for regressions:
+
+    python benchmarks/bench_reports.py --iterations 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report import render_report, warm_up  # noqa: E402
+from report_specs import BASIC_FIELDS, REPORTS  # noqa: E402
+
+
+def sample_data(user_type):
+    data = dict(zip(BASIC_FIELDS, ["BENCH-0001", "31–40", "Female", "3"]))
+    for section in REPORTS[user_type].sections:
+        for _, key in section.items:
+            if section.kind == "scores":
+                data[key] = 62.5
+            else:
+                data[key] = "Yes" if section.kind == "table" else "Supportive but sometimes distant"
+    return data
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def bench(user_type, iterations):
+    data = sample_data(user_type)
+    timings = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        render_report(user_type, data)
+        timings.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    return {
+        "reports_per_sec": iterations / elapsed,
+        "p50_ms": statistics.median(timings) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    warm_up()
+    print(f"{'report':<10}{'reports/sec':>14}{'p50 ms':>10}{'p99 ms':>10}")
+    for user_type in REPORTS:
+        r = bench(user_type, args.iterations)
+        print(f"{user_type:<10}{r['reports_per_sec']:>14.1f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
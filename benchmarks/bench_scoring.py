@@ -0,0 +1,66 @@
+"""Scoring throughput (see scoring.py).
+
+Builds N random owner submissions as stored rows, then scores them row by row
+with ``score`` (decoding each row into an Answers first, as a re-score of the
+sheet would) and as one NumPy batch with ``score_rows``, and prints rows/sec
+for both plus the largest difference between the two:
+
+    python benchmarks/bench_scoring.py --rows 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answers import Answers  # noqa: E402
+from questionnaire import BASIC_FIELDS, LAYOUTS, OPTIONS, ROW_PREFIX, SCHEMA_VERSION, SCORE_COLUMNS  # noqa: E402
+from scoring import score, score_rows  # noqa: E402
+
+
+def synthetic_rows(user_type, n, seed):
+    rng = random.Random(seed)
+    prefix = ["2026-01-01 00:00:00", SCHEMA_VERSION, "BENCH-0001", "31–40", "Female", "3"]
+    assert len(prefix) == len(ROW_PREFIX) + len(BASIC_FIELDS)
+    return [prefix + [rng.choice(OPTIONS[key][1:]) for key in LAYOUTS[user_type]] for _ in range(n)]
+
+
+def score_one_by_one(user_type, rows):
+    start = len(ROW_PREFIX) + len(BASIC_FIELDS)
+    results = []
+    for row in rows:
+        answers = Answers()
+        answers.update(dict(zip(LAYOUTS[user_type], row[start:])))
+        results.append([score(answers)[column] for column in SCORE_COLUMNS[user_type]])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--user-type", default="owner", choices=sorted(LAYOUTS))
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.user_type, args.rows, args.seed)
+
+    started = time.perf_counter()
+    single = score_one_by_one(args.user_type, rows)
+    single_time = time.perf_counter() - started
+
+    score_rows(args.user_type, rows[:1])   # NumPy import and matrix build
+    started = time.perf_counter()
+    batch = score_rows(args.user_type, rows)
+    batch_time = time.perf_counter() - started
+
+    drift = max(abs(a - b) for s, r in zip(single, batch.tolist()) for a, b in zip(s, r))
+    print(f"{'path':<10}{'rows/s':>14}")
+    print(f"{'single':<10}{len(rows) / single_time:>14.0f}")
+    print(f"{'batch':<10}{len(rows) / batch_time:>14.0f}")
+    print(f"max difference: {drift:.3f} (single-session scores are rounded to 0.1)")
+
+
+if __name__ == "__main__":
+    main()
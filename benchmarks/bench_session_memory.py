@@ -0,0 +1,67 @@
+"""Per-session memory of the answer store.
+
+Builds N completed sessions per user type twice, once as the plain dict of
+option strings the app used to keep in ``st.session_state.data`` and once as
+answers.Answers, and prints the bytes allocated per session for each:
+
+    python benchmarks/bench_session_memory.py --sessions 5000
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answers import Answers  # noqa: E402
+from questionnaire import BASIC_FIELDS, LAYOUTS, OPTIONS  # noqa: E402
+
+
+def completed_answers(user_type, n):
+    # Deterministic spread of options so sessions aren't all identical
+    answers = {BASIC_FIELDS[0]: f"REG-{n:06d}"}
+    for i, key in enumerate(BASIC_FIELDS[1:] + list(LAYOUTS[user_type])):
+        options = OPTIONS[key]
+        answers[key] = options[1 + (n + i) % (len(options) - 1)]
+    return answers
+
+
+def measure(build, sessions):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = [build(n) for n in range(sessions)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del kept
+    return allocated / sessions
+
+
+def build_dict(user_type):
+    def build(n):
+        return dict(completed_answers(user_type, n))
+    return build
+
+
+def build_compact(user_type):
+    def build(n):
+        answers = Answers()
+        answers.update(completed_answers(user_type, n))
+        return answers
+    return build
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'user type':<10}{'dict B/session':>16}{'Answers B/session':>19}{'ratio':>8}")
+    for user_type in LAYOUTS:
+        plain = measure(build_dict(user_type), args.sessions)
+        compact = measure(build_compact(user_type), args.sessions)
+        print(f"{user_type:<10}{plain:>16.0f}{compact:>19.0f}{plain / compact:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Cold-start benchmark for personality_app.py.
+
+Each run starts a fresh interpreter, imports Streamlit, renders Stage 1 once
+through Streamlit's AppTest harness and reports:
+
+* time to import streamlit
+* time to load secrets.toml (``streamlit run`` does this at server start)
+* time for the first Stage 1 script run
+* peak RSS after that render
+* which heavy dependencies (ReportLab, gspread, google-auth) got loaded
+
+    python benchmarks/bench_startup.py --runs 5 [--output startup.json]
+
+Exits non-zero if a heavy dependency was loaded while rendering Stage 1.
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "personality_app.py")
+HEAVY_MODULES = ("reportlab", "gspread", "google.oauth2", "google.auth.transport.requests")
+
+
+def probe():
+    t0 = time.perf_counter()
+    import streamlit
+    t1 = time.perf_counter()
+    # The server loads secrets before the first session, so keep it out of the render
+    streamlit.secrets.load_if_toml_exists()
+    ts = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP, default_timeout=60)
+    t2 = time.perf_counter()
+    at.run()
+    t3 = time.perf_counter()
+    if at.exception:
+        raise SystemExit(f"Stage 1 render failed: {at.exception}")
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "import_streamlit_ms": (t1 - t0) * 1000,
+        "load_secrets_ms": (ts - t1) * 1000,
+        "first_render_ms": (t3 - t2) * 1000,
+        "rss_mb": rss_kb / 1024,
+        "heavy_modules": [m for m in HEAVY_MODULES if m in sys.modules],
+    }))
+
+
+def run_once():
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--probe"],
+                         cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="write the summary as JSON to this path")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        probe()
+        return
+
+    runs = [run_once() for _ in range(args.runs)]
+    summary = {
+        "runs": args.runs,
+        "python": sys.version.split()[0],
+        "import_streamlit_ms": statistics.median(r["import_streamlit_ms"] for r in runs),
+        "load_secrets_ms": statistics.median(r["load_secrets_ms"] for r in runs),
+        "first_render_ms": statistics.median(r["first_render_ms"] for r in runs),
+        "rss_mb": statistics.median(r["rss_mb"] for r in runs),
+        "heavy_modules": sorted({m for r in runs for m in r["heavy_modules"]}),
+    }
+    for key in ("import_streamlit_ms", "load_secrets_ms", "first_render_ms", "rss_mb"):
+        print(f"{key:<22}{summary[key]:>10.1f}")
+    print(f"{'heavy_modules':<22}{', '.join(summary['heavy_modules']) or 'none':>10}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    if summary["heavy_modules"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
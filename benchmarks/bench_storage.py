@@ -0,0 +1,84 @@
+"""Throughput of each storage backend (see storage.py).
+
+Appends N synthetic owner rows in batches, then pages them back, and prints
+rows/sec for writes and reads per backend. The fake Sheets backend runs with
+its latency and quota settings so the numbers show what the real API would
+allow; parquet is skipped when pyarrow isn't installed. The live Sheets backend
+is only included with --sheets (it needs credentials in .streamlit/secrets.toml).
+
+    python benchmarks/bench_storage.py --rows 5000 --batch 50
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+from questionnaire import SHEET_HEADERS, WORKSHEETS  # noqa: E402
+
+SHEET = WORKSHEETS["owner"]
+
+
+def synthetic_rows(n):
+    width = len(SHEET_HEADERS[SHEET])
+    return [[f"2026-01-01 00:00:{i % 60:02d}", 1, f"REG-{i:06d}"] + [f"answer {j}" for j in range(width - 3)]
+            for i in range(n)]
+
+
+def backends(tmp, args):
+    yield storage.SQLiteStorage(os.path.join(tmp, "bench.db"))
+    yield storage.CsvLogStorage(os.path.join(tmp, "csv"))
+    try:
+        yield storage.ParquetLogStorage(os.path.join(tmp, "parquet"))
+    except ImportError:
+        print("parquet: skipped (pyarrow not installed)")
+    yield storage.FakeSheetsStorage(latency=args.fake_latency, jitter=0, quota_per_minute=0)
+    if args.sheets:
+        from sheets import get_connection
+        yield storage.SheetsStorage(get_connection())
+
+
+def bench(backend, rows, batch, page):
+    started = time.perf_counter()
+    for i in range(0, len(rows), batch):
+        backend.append_rows(SHEET, rows[i:i + batch])
+    write = time.perf_counter() - started
+
+    started = time.perf_counter()
+    read = 0
+    while True:
+        chunk = backend.read_rows(SHEET, read, page)
+        if not chunk:
+            break
+        read += len(chunk)
+    read_time = time.perf_counter() - started
+    return len(rows) / write, read / read_time if read_time else float("inf"), read
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--fake-latency", type=float, default=0.3,
+                        help="seconds per simulated Sheets call")
+    parser.add_argument("--sheets", action="store_true", help="also benchmark the live spreadsheet")
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    tmp = tempfile.mkdtemp(prefix="bench_storage_")
+    try:
+        print(f"{'backend':<10}{'write rows/s':>14}{'read rows/s':>14}{'rows read':>11}")
+        for backend in backends(tmp, args):
+            write_rate, read_rate, read = bench(backend, rows, args.batch, args.page)
+            print(f"{backend.name:<10}{write_rate:>14.0f}{read_rate:>14.0f}{read:>11}")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
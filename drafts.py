@@ -0,0 +1,101 @@
+"""Resumable sessions: unfinished assessments checkpointed on the server.
+
+Every stage change saves the session's stage, user type and answers under a
+short random token, and the token goes into the page URL as ``?resume=...``.
+If the websocket drops (a phone locking, a flaky network), the browser reloads
+that URL into a fresh session, and the app restores the draft instead of
+starting at Stage 1 again.
+
+Drafts live in a local SQLite file, one small row per session (the answers
+are ``Answers.pack()`` bytes, a few dozen bytes). Rows expire ``ttl_hours``
+after their last save; expired rows are ignored on load and deleted at most
+once a minute on save. Settings come from the optional ``[drafts]`` table in
+``st.secrets``::
+
+    [drafts]
+    path = ".spool/drafts.db"
+    ttl_hours = 24
+"""
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+
+from answers import Answers
+
+DEFAULT_PATH = os.path.join(".spool", "drafts.db")
+DEFAULT_TTL_HOURS = 24.0
+PURGE_INTERVAL = 60.0   # seconds between sweeps for expired drafts
+TOKEN_BYTES = 9         # 12 URL-safe characters
+
+
+class DraftStore:
+    def __init__(self, path, ttl):
+        self.ttl = ttl
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS drafts ("
+            " token TEXT PRIMARY KEY,"
+            " stage REAL NOT NULL,"
+            " user_type TEXT,"
+            " answers BLOB NOT NULL,"
+            " updated REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS drafts_updated ON drafts (updated)")
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        self.saves = 0
+        self.restores = 0
+        self.expired = 0
+
+    def save(self, token, stage, user_type, answers):
+        # Returns the token the draft is stored under (a new one when token is None)
+        token = token or secrets.token_urlsafe(TOKEN_BYTES)
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO drafts VALUES (?, ?, ?, ?, ?)",
+                             (token, stage, user_type, answers.pack(), now))
+            self.saves += 1
+            if now - self._last_purge >= PURGE_INTERVAL:
+                self._last_purge = now
+                self.expired += self._db.execute("DELETE FROM drafts WHERE updated < ?",
+                                                 (now - self.ttl,)).rowcount
+        return token
+
+    def load(self, token):
+        # (stage, user_type, Answers) of a live draft, or None
+        with self._lock:
+            row = self._db.execute("SELECT stage, user_type, answers FROM drafts WHERE token = ? AND updated >= ?",
+                                   (token, time.time() - self.ttl)).fetchone()
+        if row is None:
+            return None
+        self.restores += 1
+        stage, user_type, packed = row
+        return (int(stage) if stage.is_integer() else stage), user_type, Answers.unpack(packed)
+
+    def delete(self, token):
+        with self._lock:
+            self._db.execute("DELETE FROM drafts WHERE token = ?", (token,))
+
+    def stats(self):
+        with self._lock:
+            live = self._db.execute("SELECT COUNT(*) FROM drafts WHERE updated >= ?",
+                                    (time.time() - self.ttl,)).fetchone()[0]
+        return {"live": live, "saves": self.saves, "restores": self.restores, "expired": self.expired}
+
+
+@st.cache_resource(show_spinner=False)
+def _cached_store(path, ttl):
+    return DraftStore(path, ttl)
+
+
+def get_draft_store():
+    cfg = st.secrets.get("drafts", {})
+    return _cached_store(cfg.get("path", DEFAULT_PATH), float(cfg.get("ttl_hours", DEFAULT_TTL_HOURS)) * 3600)
@@ -0,0 +1,289 @@
+"""Streaming export of every stored submission to CSV, Parquet or XLSX.
+
+    python export.py --format parquet --out exports/
+    python export.py --format xlsx --backend sqlite --path data/submissions.db
+
+Rows are read from the storage backend the app writes to (the ``[storage]``
+table in st.secrets; ``--backend``/``--path`` override it) a fixed-size page at
+a time. Each row is normalized to its worksheet's header (questionnaire.
+SHEET_HEADERS: Stage 1 fields, one column per question in schema order, then
+the scores and recommendations), with Schema Version as an integer, scores as
+floats and blank cells as empty values. Pages flow through generators straight
+into the writer, so memory stays flat however many rows there are.
+
+Rows of the first worksheet saved before per-user-type worksheets (sheet1,
+alphabetically ordered answers and no user type) are exported too, ahead of
+the others. sheet1 is read once: each row is placed by the user type its
+answers fit (history.upgrade_legacy), gets Schema Version 0 and goes straight
+to that user type's output. Rows that fit no user type are counted and
+reported, not exported.
+
+CSV and Parquet write one file per user type; XLSX writes one workbook with
+a worksheet per user type. Parquet needs pyarrow and XLSX needs openpyxl;
+each is imported only when its format is chosen. Rows/sec and peak memory are
+printed per worksheet.
+"""
+import argparse
+import csv
+import os
+import resource
+import sys
+import time
+
+from history import upgrade_legacy
+from questionnaire import LAYOUTS, SHEET_HEADERS, WORKSHEETS
+from storage import LEGACY_SHEET, QuotaExceeded, make_storage
+
+FORMATS = ("csv", "parquet", "xlsx")
+PAGE_SIZE = 1000
+MAX_RETRIES = 6
+XLSX_MAX_ROWS = 1048575   # data rows that fit below the header of one Excel worksheet
+
+
+# ---------------- reading ----------------
+def _text(value):
+    return "" if value is None else str(value)
+
+
+def _int(value):
+    return int(value) if value not in (None, "") else None
+
+
+def _float(value):
+    return float(value) if value not in (None, "") else None
+
+
+def _converter(column):
+    if column == "Schema Version":
+        return _int
+    if column.endswith(" Score"):
+        return _float
+    return _text
+
+
+def _is_quota_error(e):
+    # QuotaExceeded from the fake backend, HTTP 429 from gspread
+    return isinstance(e, QuotaExceeded) or getattr(getattr(e, "response", None), "status_code", None) == 429
+
+
+def _read_page(storage, sheet, start, page_size):
+    # Sheets allows about 60 reads a minute; back off instead of failing a long export
+    delay = 1.0
+    for attempt in range(MAX_RETRIES):
+        try:
+            return storage.read_rows(sheet, start, page_size)
+        except Exception as e:
+            if attempt == MAX_RETRIES - 1 or not _is_quota_error(e):
+                raise
+            time.sleep(delay)
+            delay = min(60.0, delay * 2)
+
+
+def iter_rows(storage, sheet, page_size=PAGE_SIZE):
+    # Normalized rows of one worksheet, one page in memory at a time
+    converters = [_converter(column) for column in SHEET_HEADERS[sheet]]
+    start = 0
+    while True:
+        rows = _read_page(storage, sheet, start, page_size)
+        for row in rows:
+            yield [convert(row[i] if i < len(row) else None) for i, convert in enumerate(converters)]
+        start += len(rows)
+        if len(rows) < page_size:
+            return
+
+
+def iter_legacy_rows(storage, user_types=None, page_size=PAGE_SIZE, unplaced=None):
+    # (user_type, normalized row) for every sheet1 row that answers the
+    # questions of one of user_types, in one pass over sheet1. The offsets of
+    # rows no user type fits are added to the set unplaced.
+    converters = {user_type: [_converter(column) for column in SHEET_HEADERS[WORKSHEETS[user_type]]]
+                  for user_type in (user_types or LAYOUTS)}
+    start = 0
+    while True:
+        rows = _read_page(storage, LEGACY_SHEET, start, page_size)
+        for offset, row in enumerate(rows, start):
+            placed = upgrade_legacy(row)
+            if placed is None:
+                if unplaced is not None:
+                    unplaced.add(offset)
+            elif placed[0] in converters:
+                user_type, values = placed
+                yield user_type, [convert(value) for value, convert in zip(values, converters[user_type])]
+        start += len(rows)
+        if len(rows) < page_size:
+            return
+
+
+# ---------------- writing ----------------
+# One writer per output file (or XLSX worksheet), fed a row at a time, so the
+# rows of one sheet1 pass can go to whichever user type each belongs to.
+class CsvWriter:
+    def __init__(self, path, header):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(header)
+
+    def append(self, row):
+        self._writer.writerow(row)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    def __init__(self, path, header, row_group_size=PAGE_SIZE):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {_int: pa.int64(), _float: pa.float64(), _text: pa.string()}
+        self._schema = pa.schema([(column, types[_converter(column)]) for column in header])
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._row_group_size = row_group_size
+        self._batch = []
+
+    def append(self, row):
+        self._batch.append(row)
+        if len(self._batch) == self._row_group_size:
+            self._flush()
+
+    def _flush(self):
+        import pyarrow as pa
+
+        columns = [[row[i] for row in self._batch] for i in range(len(self._schema))]
+        self._writer.write_table(pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, self._schema)], schema=self._schema))
+        self._batch = []
+
+    def close(self):
+        if self._batch:
+            self._flush()
+        self._writer.close()
+
+
+class XlsxWriter:
+    """One worksheet of a write-only workbook; write-only mode streams rows to disk."""
+
+    def __init__(self, workbook, title, header):
+        self._workbook = workbook
+        self._title = title
+        self._header = header
+        self._part = 0
+        self._next_part()
+
+    def _next_part(self):
+        # Carry on in a continuation worksheet rather than truncate
+        self._part += 1
+        self._ws = self._workbook.create_sheet(self._title if self._part == 1 else f"{self._title} ({self._part})")
+        self._ws.append(self._header)
+        self._written = 0
+
+    def append(self, row):
+        if self._written == XLSX_MAX_ROWS:
+            self._next_part()
+        self._ws.append(row)
+        self._written += 1
+
+    def close(self):
+        pass
+
+
+# ---------------- export ----------------
+class Tally:
+    """Counts rows as they stream past and times each worksheet."""
+
+    def __init__(self):
+        self.results = []
+
+    def track(self, sheet, rows):
+        result = {"sheet": sheet, "rows": 0, "seconds": 0.0}
+        self.results.append(result)
+        started = time.perf_counter()
+        for row in rows:
+            result["rows"] += 1
+            yield row
+        result["seconds"] = time.perf_counter() - started
+        result["peak_rss_mb"] = _peak_rss_mb()
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def export(storage, fmt, out_dir, user_types=None, page_size=PAGE_SIZE):
+    # Returns one {"sheet", "rows", "seconds", "peak_rss_mb"} per worksheet read
+    # and the number of sheet1 rows left out
+    os.makedirs(out_dir, exist_ok=True)
+    user_types = list(user_types or LAYOUTS)
+    tally = Tally()
+    unplaced = set()
+    workbook = None
+    if fmt == "xlsx":
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+    writers = {}
+    try:
+        for user_type in user_types:
+            sheet = WORKSHEETS[user_type]
+            if workbook is not None:
+                writers[user_type] = XlsxWriter(workbook, sheet, SHEET_HEADERS[sheet])
+            else:
+                writer = ParquetWriter if fmt == "parquet" else CsvWriter
+                writers[user_type] = writer(os.path.join(out_dir, f"{sheet}.{fmt}"), SHEET_HEADERS[sheet])
+        # sheet1 once, each row to its user type's output; then each user type's worksheet
+        for user_type, row in tally.track("sheet1", iter_legacy_rows(storage, user_types, page_size, unplaced)):
+            writers[user_type].append(row)
+        for user_type in user_types:
+            sheet = WORKSHEETS[user_type]
+            for row in tally.track(sheet, iter_rows(storage, sheet, page_size)):
+                writers[user_type].append(row)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    if workbook is not None:
+        workbook.save(os.path.join(out_dir, "submissions.xlsx"))
+    return tally.results, len(unplaced)
+
+
+def storage_from_args(args):
+    if args.backend:
+        cfg = {"backend": args.backend}
+        if args.path:
+            cfg["path"] = args.path
+        return make_storage(cfg)
+    import streamlit as st
+    return make_storage(dict(st.secrets.get("storage", {})))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--out", default="exports", help="output directory")
+    parser.add_argument("--user-type", action="append", choices=sorted(LAYOUTS),
+                        help="export only this user type (repeatable; default all)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="rows per storage read")
+    parser.add_argument("--backend", choices=["sheets", "sqlite", "csv", "parquet"],
+                        help="read this backend instead of the [storage] secret")
+    parser.add_argument("--path", help="file or directory of a local --backend")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results, unplaced = export(storage_from_args(args), args.format, args.out, args.user_type, args.page_size)
+    elapsed = time.perf_counter() - started
+
+    print(f"{'worksheet':<18}{'rows':>10}{'seconds':>10}{'rows/s':>10}{'peak MB':>9}")
+    for r in results:
+        rate = r["rows"] / r["seconds"] if r["seconds"] else 0.0
+        print(f"{r['sheet']:<18}{r['rows']:>10}{r['seconds']:>10.2f}{rate:>10.0f}{r['peak_rss_mb']:>9.1f}")
+    total = sum(r["rows"] for r in results)
+    print(f"{'total':<18}{total:>10}{elapsed:>10.2f}{total / elapsed if elapsed else 0.0:>10.0f}"
+          f"{_peak_rss_mb():>9.1f}")
+    if unplaced:
+        print(f"sheet1: {unplaced} rows fit no user type's questions (a header row, a row mixing two flows) "
+              f"and were not exported")
+    print(f"written to {os.path.abspath(args.out)}")
+
+
+if __name__ == "__main__":
+    main()
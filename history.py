@@ -0,0 +1,54 @@
+"""Rows of the first worksheet, saved before per-user-type worksheets.
+
+Until rows went to one worksheet per user type (questionnaire.WORKSHEETS),
+every submission was appended to the spreadsheet's first worksheet
+(storage.LEGACY_SHEET) as the timestamp, the Stage 1 fields and then the
+answers in alphabetical order of their question keys, with no header and no
+user type. ``upgrade_legacy`` works the user type out from the answers: the
+row must have one answer per question of exactly one user type, each a valid
+option. Such rows come back in that user type's current header with Schema
+Version 0, the scores and recommendations they never saved computed from the
+answers with today's scoring.py and recommendations.py (``derive``). Anything
+else (a header row typed in by hand, a row mixing two flows) can't be placed.
+"""
+from answers import Answers
+from questionnaire import (BASIC_FIELDS, LAYOUTS, OPTIONS, RECOMMENDATIONS_COLUMN, SCORE_COLUMNS, SHEET_HEADERS,
+                           WORKSHEETS)
+
+LEGACY_VERSION = 0
+LEGACY_PREFIX = ["Timestamp"] + BASIC_FIELDS
+LEGACY_LAYOUTS = {user_type: tuple(sorted(layout)) for user_type, layout in LAYOUTS.items()}
+
+
+def derive(user_type, data):
+    # Score and recommendation columns for decoded answers (question key -> option text)
+    from recommendations import recommend, summary
+    from scoring import score
+
+    answers = Answers()
+    answers.update({key: data[key] for key in LAYOUTS[user_type] if data.get(key) in OPTIONS[key][1:]})
+    derived = dict.fromkeys(SCORE_COLUMNS[user_type], "")
+    if answers.layout == user_type:
+        derived.update(score(answers))
+    derived[RECOMMENDATIONS_COLUMN] = summary(recommend(user_type, data))
+    return derived
+
+
+def legacy_user_type(row):
+    # The one user type whose questions the row answers, or None
+    answers = row[len(LEGACY_PREFIX):]
+    matches = [user_type for user_type, keys in LEGACY_LAYOUTS.items()
+               if len(answers) == len(keys) and all(v in OPTIONS[k][1:] for k, v in zip(keys, answers))]
+    return matches[0] if len(matches) == 1 else None
+
+
+def upgrade_legacy(row):
+    # (user_type, row in that user type's current header), or None if the row can't be placed
+    user_type = legacy_user_type(row)
+    if user_type is None:
+        return None
+    data = dict(zip(LEGACY_PREFIX, row))
+    data.update(zip(LEGACY_LAYOUTS[user_type], row[len(LEGACY_PREFIX):]))
+    data["Schema Version"] = LEGACY_VERSION
+    data.update(derive(user_type, data))
+    return user_type, [str(data.get(column, "")) for column in SHEET_HEADERS[WORKSHEETS[user_type]]]
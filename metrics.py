@@ -0,0 +1,256 @@
+"""Timing spans and counters for the hot paths.
+
+Off by default: ``span()`` hands back a shared no-op context manager and
+``inc``/``observe`` return straight away, so instrumented code costs one global
+lookup per call. Turn it on with the optional ``[metrics]`` table in
+``st.secrets``::
+
+    [metrics]
+    enabled = true
+    port = 9464                      # Prometheus text at http://127.0.0.1:9464/metrics
+    json_log = "logs/metrics.jsonl"  # one JSON object per span/counter ("-" = stderr)
+
+Spans become histograms named ``<name>_seconds`` (their ``_count`` is the
+number of calls, e.g. reruns per stage for ``app_stage_run``), counters become
+``<name>_total`` and values observed under a ``*_bytes`` name get size buckets.
+Long-lived objects that keep their own ``stats()`` (report cache, submission
+queue, Sheets connection) are exported with ``watch_stats``: their figures are
+read at scrape time and rendered as counters and gauges.
+Report worker processes only collect samples; they ride back with each PDF and
+are merged into the app's registry (see workers.py).
+"""
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072, 262144)
+
+_NOOP = nullcontext()
+_registry = None   # set by enable()
+_configured = False
+_configure_lock = threading.Lock()
+
+
+class Registry:
+    def __init__(self, log=None, collect_only=False):
+        self._lock = threading.Lock()
+        self._counters = {}     # (name, labels) -> value
+        self._histograms = {}   # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self._log = log
+        self._collect_only = collect_only
+        self._samples = []      # raw samples waiting for drain() (worker processes)
+        self._watchers = []     # callables returning (kind, name, value, labels) at render time
+
+    def record(self, kind, name, value, labels):
+        key = (name, tuple(sorted(labels.items())))
+        if self._log is not None:
+            self._log.info(json.dumps({"ts": time.time(), "kind": kind, "name": name,
+                                       "value": value, **labels}))
+        with self._lock:
+            if self._collect_only:
+                self._samples.append((kind, name, value, labels))
+            elif kind == "counter":
+                self._counters[key] = self._counters.get(key, 0) + value
+            else:
+                buckets = SIZE_BUCKETS if name.endswith("_bytes") else TIME_BUCKETS
+                h = self._histograms.get(key)
+                if h is None:
+                    h = self._histograms[key] = [0] * (len(buckets) + 2)
+                h[bisect.bisect_left(buckets, value)] += 1
+                h[-1] += value
+
+    def drain(self):
+        with self._lock:
+            samples, self._samples = self._samples, []
+        return samples
+
+    def watch(self, fn):
+        with self._lock:
+            self._watchers.append(fn)
+
+    def _watched(self):
+        with self._lock:
+            watchers = list(self._watchers)
+        samples = []
+        for fn in watchers:
+            try:
+                samples.extend(fn())
+            except Exception as e:
+                # One broken source must not take the whole endpoint down
+                logging.getLogger(__name__).warning("metrics source %r failed: %s", fn, e)
+        return samples
+
+    def render(self):
+        # Prometheus text exposition format 0.0.4
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((k, list(v)) for k, v in self._histograms.items())
+        watched = sorted((name, tuple(sorted(labels.items())), kind, value)
+                         for kind, name, value, labels in self._watched())
+        lines, typed = [], set()
+        for name, labels, kind, value in watched:
+            if name not in typed:
+                lines.append(f"# TYPE {name} {kind}")
+                typed.add(name)
+            lines.append(f"{name}{_labels(labels)} {value}")
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_labels(labels)} {value}")
+        for (name, labels), h in histograms:
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            buckets = SIZE_BUCKETS if name.endswith("_bytes") else TIME_BUCKETS
+            cumulative = 0
+            for bound, count in zip(buckets + ("+Inf",), h[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {h[-1]}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+class _Span:
+    __slots__ = ("name", "labels", "started")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        # Recorded on exceptions too: st.rerun() ends a run by raising
+        _registry.record("histogram", f"{self.name}_seconds", time.perf_counter() - self.started, self.labels)
+        return False
+
+
+# ---------------- recording API ----------------
+def enabled():
+    return _registry is not None
+
+
+def span(name, **labels):
+    if _registry is None:
+        return _NOOP
+    return _Span(name, labels)
+
+
+def inc(name, amount=1, **labels):
+    if _registry is not None:
+        _registry.record("counter", f"{name}_total", amount, labels)
+
+
+def observe(name, value, **labels):
+    if _registry is not None:
+        _registry.record("histogram", name, value, labels)
+
+
+def drain():
+    return _registry.drain() if _registry is not None else []
+
+
+def watch_stats(prefix, stats_fn, counters=(), gauges=(), **labels):
+    # Export figures of stats_fn() on every render: keys in counters as
+    # <prefix>_<key>_total, keys in gauges as <prefix>_<key>. None values
+    # (nothing measured yet) are left out; booleans become 0/1.
+    if _registry is None:
+        return
+
+    def samples():
+        stats = stats_fn()
+        return [(kind, f"{prefix}_{key}{suffix}", int(stats[key]) if isinstance(stats[key], bool) else stats[key],
+                 labels)
+                for kind, keys, suffix in (("counter", counters, "_total"), ("gauge", gauges, ""))
+                for key in keys if stats.get(key) is not None]
+    _registry.watch(samples)
+
+
+def merge(samples):
+    # Replay samples collected in another process (see workers.py)
+    if _registry is not None:
+        for kind, name, value, labels in samples:
+            _registry.record(kind, name, value, labels)
+
+
+def render():
+    return _registry.render() if _registry is not None else ""
+
+
+# ---------------- setup ----------------
+def _json_logger(path):
+    log = logging.getLogger("metrics")
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    if path == "-":
+        handler = logging.StreamHandler()
+    else:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(handler)
+    return log
+
+
+def enable(port=None, json_log=None, collect_only=False):
+    global _registry
+    _registry = Registry(_json_logger(json_log) if json_log else None, collect_only)
+    if port:
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            server = ThreadingHTTPServer(("127.0.0.1", int(port)), Handler)
+        except OSError as e:
+            logging.getLogger(__name__).warning("metrics endpoint not started on port %s: %s", port, e)
+        else:
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return _registry
+
+
+def configure():
+    # Called at the top of every script run; only the first one does any work.
+    # Streamlit is imported here rather than at the top because report worker
+    # processes import this module too.
+    global _configured
+    if _configured:
+        return enabled()
+    import streamlit as st
+    cfg = st.secrets.get("metrics", {})
+    with _configure_lock:
+        if not _configured:
+            if cfg.get("enabled", False):
+                enable(cfg.get("port"), cfg.get("json_log"))
+            _configured = True
+    return enabled()
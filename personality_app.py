@@ -1,128 +1,239 @@
 import streamlit as st
-import io
-import json
 import os
 from datetime import datetime
 
-import gspread
-from google.oauth2.service_account import Credentials
-
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+# Project modules (and through them ReportLab/gspread) are imported where they
+# are first needed, so a cold session renders Stage 1 with only Streamlit loaded.
+# benchmarks/bench_startup.py keeps an eye on this.
+import metrics
+from answers import Answers
+from questionnaire import CHOICES, OPTIONS, PAGES, RECOMMENDATIONS_COLUMN, SCHEMA_VERSION, SHEET_COLUMNS, WORKSHEETS
 
 # ---------------- CONFIG ----------------
 st.set_page_config(page_title="Business Personality & Readiness", page_icon="🧭", layout="centered")
 st.title("🧭 Business Personality & Readiness Assessment")
+metrics.configure()  # no-op unless [metrics] is enabled in secrets
 
 # ---------------- INITIALIZE ----------------
+# A reconnecting browser reloads the page with ?resume=<token>: pick up its draft (see drafts.py)
+if "stage" not in st.session_state and st.query_params.get("resume"):
+    from drafts import get_draft_store
+
+    draft = get_draft_store().load(st.query_params["resume"])
+    if draft is None:
+        del st.query_params["resume"]
+        st.info("Your saved progress has expired, so the assessment starts from the beginning.")
+    else:
+        st.session_state.stage, st.session_state.user_type, st.session_state.data = draft
+        st.session_state.draft_token = st.query_params["resume"]
+        if st.session_state.stage == 4:
+            # Already submitted: the final screen serves the report again from its key
+            from report_cache import report_key
+            st.session_state.report_key = report_key(st.session_state.user_type, st.session_state.data.pack())
+            st.session_state.report_job = None
+        metrics.inc("app_sessions_resumed")
+
 if "stage" not in st.session_state:
     st.session_state.stage = 1
 
 if "data" not in st.session_state:
-    st.session_state.data = {}
+    st.session_state.data = Answers()  # compact option indices, see answers.py
 
 if "user_type" not in st.session_state:
     st.session_state.user_type = None  # 'owner', 'starter', 'future'
 
-# Utility: Google Sheets saver (uses st.secrets for credentials)
-def save_to_google_sheet(data_dict):
+# Utility: Google Sheets saver (uses st.secrets for credentials).
+# submission_key makes it idempotent: a second save of the same assessment is dropped.
+def save_to_google_sheet(data_dict, user_type, submission_key=None):
+    try:
+        # Prepare row in the fixed column order of this user type's worksheet
+        # (header: questionnaire.SHEET_HEADERS)
+        row = [datetime.now().strftime("%Y-%m-%d %H:%M:%S"), SCHEMA_VERSION]
+        row.extend(data_dict.get(k, "") for k in SHEET_COLUMNS[user_type])
+
+        # Spooled locally and appended to the sheet in the background (see submission_queue.py)
+        from submission_queue import get_queue
+        if get_queue().enqueue(row, WORKSHEETS[user_type], key=submission_key):
+            from registrations import get_registration_index
+            get_registration_index().add(data_dict.get("Registration Code", ""))
+    except Exception as e:
+        metrics.inc("app_save_errors", type=type(e).__name__)
+        st.error(f"Failed to save your responses: {e}")
+
+# Decoded answers plus their readiness scores and recommendations: what the report and the saved row show
+def submission_data():
+    from recommendations import recommend, summary
+    from scoring import score
+
+    answers = st.session_state.data
+    data = {**answers.to_dict(), **score(answers)}
+    data[RECOMMENDATIONS_COLUMN] = summary(recommend(answers.layout, data))
+    return data
+
+# Queue the PDF on the worker pool (unless an identical report is already cached)
+def submit_report(user_type, data=None):
+    from report_cache import get_report_cache, report_key
+    from workers import get_report_pool
+
+    key = report_key(user_type, st.session_state.data.pack())
+    cache = get_report_cache()
+    job = None
+    if key not in cache:
+        job = get_report_pool().submit(user_type, data or submission_data())
+
+        # Cache from the pool's callback so the PDF is kept even if this session goes away
+        def store(future):
+            if not future.cancelled() and future.exception() is None:
+                cache.put(key, future.result())
+        job.add_done_callback(store)
+    st.session_state.report_key = key
+    st.session_state.report_job = job
+
+# Hand the PDF to the worker pool and move to the final screen, which picks it up
+def finish_assessment(user_type):
+    from workers import PoolBusy
+
+    with metrics.span("app_submit", user_type=user_type):
+        data = submission_data()
+        try:
+            submit_report(user_type, data)
+        except PoolBusy:
+            metrics.inc("app_pool_busy")
+            st.error("⚠️ The server is busy generating other reports. Please try again in a moment.")
+            return
+        save_to_google_sheet(data, user_type, submission_key=st.session_state.report_key)
+    st.session_state.stage = 4
+    save_draft()
+    st.rerun()
+
+# One st.form per page so answering a question doesn't rerun the script.
+# Widgets return option indices; labels come from OPTIONS via format_func.
+def render_page(page):
+    picks = {}
+    with st.form(page.form_key):
+        for q in page.questions:
+            widget = st.radio if q.widget == "radio" else st.selectbox
+            picks[q.key] = widget(q.text, CHOICES[q.key], format_func=OPTIONS[q.key].__getitem__)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            back_clicked = st.form_submit_button("⬅️ Back")
+        with col2:
+            submit_clicked = st.form_submit_button(page.submit_label)
+    return back_clicked, submit_clicked, picks
+
+# Stage 1 check against the index of codes that already completed the assessment.
+# "reject" refuses the code; "flag" warns once and lets a second Next through.
+def registration_allowed(reg_code):
+    from registrations import duplicate_policy, get_registration_index, normalize
+
+    if reg_code not in get_registration_index():
+        return True
+    metrics.inc("app_duplicate_registrations", policy=duplicate_policy())
+    if duplicate_policy() == "reject":
+        st.error("⚠️ This Registration Code has already been used to complete the assessment.")
+        return False
+    if st.session_state.get("confirmed_registration") == normalize(reg_code):
+        return True
+    st.session_state.confirmed_registration = normalize(reg_code)
+    st.warning("This Registration Code has already been used to complete the assessment. "
+               "Click Next again to continue anyway.")
+    return False
+
+# Checkpoint stage, user type and answers so a dropped connection can resume.
+# The first save puts the draft's token in the URL.
+def save_draft():
+    from drafts import get_draft_store
+
     try:
-        scopes = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive"
-        ]
-        credentials = Credentials.from_service_account_info(
-            json.loads(st.secrets["gcp"]["service_account"]),
-            scopes=scopes
-        )
-        client = gspread.authorize(credentials)
-        sheet = client.open_by_key(st.secrets["gcp"]["spreadsheet_key"]).sheet1
-
-        # Prepare row with defined order
-        row = [datetime.now().strftime("%Y-%m-%d %H:%M:%S")]
-        # include basic fields first
-        keys_order = ["Registration Code", "Age Group", "Gender", "KK Number"]
-        for k in keys_order:
-            row.append(data_dict.get(k, ""))
-
-        # Add rest of data in alphabetical order to keep stable
-        for k in sorted([kk for kk in data_dict.keys() if kk not in keys_order]):
-            row.append(data_dict.get(k, ""))
-
-        sheet.append_row(row)
+        token = get_draft_store().save(st.session_state.get("draft_token"), st.session_state.stage,
+                                       st.session_state.user_type, st.session_state.data)
     except Exception as e:
-        st.error(f"Failed to save to Google Sheets: {e}")
+        # Resuming is a convenience; never block the assessment on it
+        metrics.inc("app_draft_errors", type=type(e).__name__)
+        return
+    if token != st.session_state.get("draft_token"):
+        st.session_state.draft_token = token
+        st.query_params["resume"] = token
+
+def discard_draft():
+    from drafts import get_draft_store
+
+    token = st.session_state.pop("draft_token", None)
+    if token:
+        get_draft_store().delete(token)
+    st.query_params.pop("resume", None)
 
 # Navigation helpers
 def go_next():
     st.session_state.stage += 1
+    save_draft()
     st.rerun()
 
 def go_back():
     st.session_state.stage = max(1, st.session_state.stage - 1)
+    save_draft()
     st.rerun()
 
-# ----------------- STAGE 1 -----------------
-if st.session_state.stage == 1:
-    st.header("Stage 1 — Basic Details")
-
-    reg_code = st.text_input("Registration Code")
-
-    age_group = st.selectbox(
-        "Age group",
-        ["Select age group", "Below 18", "20–30", "31–40", "41–50", "51–60", "Above 60"]
-    )
-
-    gender = st.selectbox(
-        "Gender",
-        ["Select gender", "Male", "Female", "Other"]
-    )
-
-    kk_number = st.selectbox(
-        "KK Number",
-        ["Select KK number", "1", "2", "3", "4", "5", "6"]
-    )
-
-    if st.button("Next ➡️"):
-        if (
-            not reg_code
-            or age_group.startswith("Select")
-            or gender.startswith("Select")
-            or kk_number.startswith("Select")
-        ):
-            st.error("⚠️ Please fill all fields before moving ahead.")
-        else:
-            st.session_state.data.update({
-                "Registration Code": reg_code,
-                "Age Group": age_group,
-                "Gender": gender,
-                "KK Number": kk_number
-            })
-
-            # Branching logic (Option A)
-            if age_group == "Below 18":
-                st.session_state.user_type = "future"
-                st.session_state.stage = 2  # go to future entrepreneur form
-                st.rerun()
-            else:
-                # For adults ask whether currently running a business
-                st.session_state.stage = 1.5
+# Each script run is timed per stage (the span's count is the rerun count)
+with metrics.span("app_stage_run", stage=st.session_state.stage, user_type=st.session_state.user_type or ""):
+    # ----------------- STAGE 1 -----------------
+    if st.session_state.stage == 1:
+        st.header("Stage 1 — Basic Details")
+
+        # Inputs are batched in a form so the script only reruns on submit
+        with st.form("stage1"):
+            reg_code = st.text_input("Registration Code")
+
+            age_group = st.selectbox("Age group", OPTIONS["Age Group"])
+
+            gender = st.selectbox("Gender", OPTIONS["Gender"])
+
+            kk_number = st.selectbox("KK Number", OPTIONS["KK Number"])
+
+            next_clicked = st.form_submit_button("Next ➡️")
+
+        if next_clicked:
+            if (
+                not reg_code
+                or age_group.startswith("Select")
+                or gender.startswith("Select")
+                or kk_number.startswith("Select")
+            ):
+                st.error("⚠️ Please fill all fields before moving ahead.")
+            elif registration_allowed(reg_code):
+                st.session_state.data.update({
+                    "Registration Code": reg_code,
+                    "Age Group": age_group,
+                    "Gender": gender,
+                    "KK Number": kk_number
+                })
+
+                # Branching logic (Option A)
+                if age_group == "Below 18":
+                    st.session_state.user_type = "future"
+                    st.session_state.stage = 2  # go to future entrepreneur form
+                else:
+                    # For adults ask whether currently running a business
+                    st.session_state.stage = 1.5
+                save_draft()
                 st.rerun()
 
-# Small intermediate screen to ask business ownership for adults
-elif st.session_state.stage == 1.5:
-    st.header("Quick question — Business ownership")
-    st.write("Are you currently running a business?")
-    own = st.selectbox("", ["Select", "Yes", "No"]) 
-    col1, col2 = st.columns(2)
-    with col1:
-        if st.button("⬅️ Back"):
+    # Small intermediate screen to ask business ownership for adults
+    elif st.session_state.stage == 1.5:
+        st.header("Quick question — Business ownership")
+        st.write("Are you currently running a business?")
+        with st.form("stage1_5"):
+            own = st.selectbox("", ["Select", "Yes", "No"]) 
+            col1, col2 = st.columns(2)
+            with col1:
+                back_clicked = st.form_submit_button("⬅️ Back")
+            with col2:
+                continue_clicked = st.form_submit_button("Continue")
+
+        if back_clicked:
             go_back()
-    with col2:
-        if st.button("Continue"):
+        if continue_clicked:
             if own == "Select":
                 st.error("Please choose Yes or No to continue.")
             else:
@@ -132,390 +243,72 @@ elif st.session_state.stage == 1.5:
                 else:
                     st.session_state.user_type = "starter"
                     st.session_state.stage = 2  # will show starter form
+                save_draft()
                 st.rerun()
 
-# ----------------- STAGE 2: multiple variants -----------------
-elif st.session_state.stage == 2:
-    # FUTURE ENTREPRENEUR
-    if st.session_state.user_type == "future":
-        st.header("Future Entrepreneur — Assessment")
-        st.write("This short form is for young future entrepreneurs (below 18).")
-
-        fe1 = st.selectbox("1. Which subjects do you enjoy the most?",
-                           ["Select an option", "Math/Science", "Commerce/Economics", "Arts/Humanities", "Computer/Technology", "Other"])
-        fe2 = st.selectbox("2. What activities make you feel confident?",
-                           ["Select an option", "Public speaking", "Coding/Building things", "Arts & Crafts", "Sports", "Other"])
-        fe3 = st.selectbox("3. Do you enjoy solving problems or creating new ideas?",
-                           ["Select an option", "Yes, very much", "Sometimes", "Not really"]) 
-        fe4 = st.selectbox("4. Do you take initiative in school or at home?",
-                           ["Select an option", "Often", "Sometimes", "Rarely"]) 
-        fe5 = st.selectbox("5. Does your family support your interest in business?",
-                           ["Select an option", "Strongly support", "Somewhat support", "Not supportive"]) 
-        fe6 = st.selectbox("6. Do you have role models or entrepreneurs you look up to?",
-                           ["Select an option", "Yes", "No"]) 
-        fe7 = st.selectbox("7. Would you like to become an entrepreneur someday?",
-                           ["Select an option", "Yes", "Maybe", "No"]) 
-        fe8 = st.selectbox("8. How comfortable are you making decisions?",
-                           ["Select an option", "Very comfortable", "Somewhat comfortable", "Not comfortable"]) 
-        fe9 = st.selectbox("9. What type of business attracts you?",
-                           ["Select an option", "Technology", "Shop/Store", "Online services", "Food", "Other"]) 
-        fe10 = st.selectbox("10. Do you want to study further before starting a business?",
-                            ["Select an option", "Yes", "No", "Maybe"]) 
+    # ----------------- STAGES 2 & 3: schema-driven forms -----------------
+    # future/starter: Stage 2 only; owner: Stage 2 (personality & lifestyle) then
+    # Stage 3 (mandatory requirements). Questions live in questionnaire.py.
+    elif (st.session_state.user_type, st.session_state.stage) in PAGES:
+        page = PAGES[(st.session_state.user_type, st.session_state.stage)]
+        st.header(page.header)
+        if page.intro:
+            st.write(page.intro)
 
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("⬅️ Back"):
-                go_back()
-        with col2:
-            if st.button("Finish & Generate Report"):
-                missing = any([v.startswith("Select") for v in [fe1, fe2, fe3, fe4, fe5, fe6, fe7, fe8, fe9, fe10]])
-                if missing:
-                    st.error("Please answer all questions before continuing.")
-                else:
-                    st.session_state.data.update({
-                        "fe1": fe1, "fe2": fe2, "fe3": fe3, "fe4": fe4, "fe5": fe5,
-                        "fe6": fe6, "fe7": fe7, "fe8": fe8, "fe9": fe9, "fe10": fe10
-                    })
-                    # save and generate combined PDF (Option B: smart PDF)
-                    save_to_google_sheet(st.session_state.data)
-
-                    # build PDF
-                    pdf_buffer = io.BytesIO()
-                    doc = SimpleDocTemplate(pdf_buffer, pagesize=A4,
-                                            rightMargin=40, leftMargin=40,
-                                            topMargin=60, bottomMargin=40)
-                    styles = getSampleStyleSheet()
-                    elements = []
-
-                    title_style = ParagraphStyle(name='TitleStyle', fontSize=18, alignment=1, textColor=colors.HexColor("#023e8a"))
-                    elements.append(Paragraph("<b>Business Personality & Readiness Report</b>", title_style))
-                    elements.append(Spacer(1, 0.2 * inch))
-                    date_str = datetime.now().strftime("%d %B %Y, %I:%M %p")
-                    elements.append(Paragraph(f"Generated on {date_str}", styles["Normal"]))
-                    elements.append(Spacer(1, 0.2 * inch))
-
-                    heading = ParagraphStyle(name='Heading', fontSize=14, textColor="#0077b6")
-                    elements.append(Paragraph("<b>Stage 1 – Personal Information</b>", heading))
-                    for key in ["Registration Code", "Age Group", "Gender", "KK Number"]:
-                        elements.append(Paragraph(f"<b>{key}:</b> {st.session_state.data.get(key)}", styles["Normal"]))
-                    elements.append(Spacer(1, 0.2 * inch))
-
-                    elements.append(Paragraph("<b>Future Entrepreneur Assessment</b>", heading))
-                    for i in range(1, 11):
-                        elements.append(Paragraph(f"<b>Q{i}:</b> {st.session_state.data.get(f'fe{i}')}", styles["Normal"]))
-                        elements.append(Spacer(1, 0.05 * inch))
-
-                    note_text = ("<b>Note:</b> This assessment is an introductory guidance for young entrepreneurs. "
-                                 "Parents/guardians should supervise and support execution of plans.")
-                    note = Table([[Paragraph(note_text, styles["Normal"]) ]], colWidths=[6.3 * inch], style=[
-                        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor("#FFF8C4")),
-                        ('BOX', (0, 0), (-1, -1), 1, colors.HexColor("#B8860B"))
-                    ])
-                    elements.append(Spacer(1, 0.2 * inch))
-                    elements.append(note)
-
-                    doc.build(elements)
-                    pdf_buffer.seek(0)
-                    st.download_button("⬇️ Download Report (Future Entrepreneur)", pdf_buffer.getvalue(), file_name=f"Future_Entrepreneur_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf", mime="application/pdf")
-                    st.success("Report generated successfully!")
-                    st.session_state.stage = 4
-                    
-
-    # STARTER (Adult not running business)
-    elif st.session_state.user_type == "starter":
-        st.header("New Business Starter — Readiness")
-        st.write("This short form helps you evaluate readiness to start a business.")
-
-        s1 = st.selectbox("1. Do you have a business idea?",
-                          ["Select an option", "Yes, clear idea", "Have a few ideas", "No idea yet"]) 
-        s2 = st.selectbox("2. What problem will your business solve?",
-                          ["Select an option", "Local customer need", "Online convenience", "Skill/service gap", "Other"]) 
-        s3 = st.selectbox("3. Do you have savings to invest?",
-                          ["Select an option", "Enough savings", "Small savings", "No savings"]) 
-        s4 = st.selectbox("4. Will family support financially?",
-                          ["Select an option", "Yes", "Maybe", "No"]) 
-        s5 = st.selectbox("5. Do you have skills related to idea?",
-                          ["Select an option", "Yes", "Somewhat", "No"]) 
-        s6 = st.selectbox("6. Are you willing to take training?",
-                          ["Select an option", "Yes", "Maybe", "No"]) 
-        s7 = st.selectbox("7. Have you researched competitors?",
-                          ["Select an option", "Yes", "Partially", "Not yet"]) 
-        s8 = st.selectbox("8. Do you know your target customer?",
-                          ["Select an option", "Yes", "Somewhat", "No"]) 
-        s9 = st.selectbox("9. Are you comfortable taking risks?",
-                          ["Select an option", "Very", "Somewhat", "Not really"]) 
-        s10 = st.selectbox("10. How disciplined are you?",
-                           ["Select an option", "Very disciplined", "Moderately", "Not disciplined"]) 
-
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("⬅️ Back"):
-                go_back()
-        with col2:
-            if st.button("Finish & Generate Report"):
-                missing = any([v.startswith("Select") for v in [s1, s2, s3, s4, s5, s6, s7, s8, s9, s10]])
-                if missing:
-                    st.error("Please answer all questions before continuing.")
-                else:
-                    st.session_state.data.update({
-                        "s1": s1, "s2": s2, "s3": s3, "s4": s4, "s5": s5,
-                        "s6": s6, "s7": s7, "s8": s8, "s9": s9, "s10": s10
-                    })
-                    save_to_google_sheet(st.session_state.data)
-
-                    # Build PDF (Starter) — smart PDF includes only relevant sections
-                    pdf_buffer = io.BytesIO()
-                    doc = SimpleDocTemplate(pdf_buffer, pagesize=A4,
-                                            rightMargin=40, leftMargin=40,
-                                            topMargin=60, bottomMargin=40)
-                    styles = getSampleStyleSheet()
-                    elements = []
-
-                    title_style = ParagraphStyle(name='TitleStyle', fontSize=18, alignment=1, textColor=colors.HexColor("#023e8a"))
-                    elements.append(Paragraph("<b>Business Personality & Readiness Report</b>", title_style))
-                    elements.append(Spacer(1, 0.2 * inch))
-                    date_str = datetime.now().strftime("%d %B %Y, %I:%M %p")
-                    elements.append(Paragraph(f"Generated on {date_str}", styles["Normal"]))
-                    elements.append(Spacer(1, 0.2 * inch))
-
-                    heading = ParagraphStyle(name='Heading', fontSize=14, textColor="#0077b6")
-                    elements.append(Paragraph("<b>Stage 1 – Personal Information</b>", heading))
-                    for key in ["Registration Code", "Age Group", "Gender", "KK Number"]:
-                        elements.append(Paragraph(f"<b>{key}:</b> {st.session_state.data.get(key)}", styles["Normal"]))
-                    elements.append(Spacer(1, 0.2 * inch))
-
-                    elements.append(Paragraph("<b>New Business Starter Assessment</b>", heading))
-                    for i in range(1, 11):
-                        elements.append(Paragraph(f"<b>Q{i}:</b> {st.session_state.data.get(f's{i}')}", styles["Normal"]))
-                        elements.append(Spacer(1, 0.05 * inch))
-
-                    note_text = ("<b>Note:</b> This assessment helps you plan initial steps to start your business. "
-                                 "Consider mentorship and training to improve your readiness.")
-                    note = Table([[Paragraph(note_text, styles["Normal"]) ]], colWidths=[6.3 * inch], style=[
-                        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor("#FFF8C4")),
-                        ('BOX', (0, 0), (-1, -1), 1, colors.HexColor("#B8860B"))
-                    ])
-                    elements.append(Spacer(1, 0.2 * inch))
-                    elements.append(note)
-
-                    doc.build(elements)
-                    pdf_buffer.seek(0)
-                    st.download_button("⬇️ Download Report (Starter)", pdf_buffer.getvalue(), file_name=f"Starter_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf", mime="application/pdf")
-                    st.success("Report generated successfully!")
-                    st.session_state.stage = 4
-                    
-
-    # OWNER (we keep existing Stage 2 contents exactly — assume earlier code exists)
-    elif st.session_state.user_type == "owner":
-        # Here we will include the exact existing Stage 2 questions and flow
-        # For brevity and safety we will import existing behavior by reading from a helper
-        # But since you asked to keep things intact, we assume the owner flow continues as before.
-        # To keep this file self-contained, we replicate the previous 'owner' Stage 2 questions.
-
-        st.header("Stage 2 — Personality & Lifestyle")
-        st.write("Please answer honestly. Use the dropdowns to select the best option.")
-
-        # Family
-        family1 = st.selectbox("1. How would you describe your relationship with your family members?",
-                               ["Select an option", "Very close and understanding", "Supportive but sometimes distant",
-                                "Occasionally conflicting", "Difficult or strained"])
-        family2 = st.selectbox("2. How much support do you receive from your family in your personal growth?",
-                               ["Select an option", "Always supportive", "Supportive when needed",
-                                "Neutral or limited support", "Rarely supportive"])
-        family3 = st.selectbox("3. How often do you spend quality time with your family?",
-                               ["Select an option", "Every day", "Few times a week", "Occasionally", "Rarely"])
-
-        # Physical
-        physical1 = st.selectbox("1. How active are you physically in your daily routine?",
-                                 ["Select an option", "Very active (daily exercise)", "Moderately active",
-                                  "Occasionally active", "Mostly inactive"])
-        physical2 = st.selectbox("2. Do you maintain a healthy diet and sleeping pattern?",
-                                 ["Select an option", "Always maintain", "Most of the time", "Sometimes", "Rarely"])
-        physical3 = st.selectbox("3. Do you feel your physical health affects your confidence and overall personality?",
-                                 ["Select an option", "Yes, strongly", "Somewhat", "Not much", "No impact"])
-
-        # Mental
-        # For mental2 we keep link usage optional; showing plain question
-        mental1 = st.selectbox("1. How well do you handle stress or unexpected challenges?",
-                               ["Select an option", "Very well", "Manageable", "Sometimes struggle", "Find it difficult"])
-        mental2 = st.selectbox("2. Do you often feel positive and confident about your goals?",
-                               ["Select an option", "Always confident and focused", "Usually positive with minor doubts",
-                                "Sometimes uncertain", "Often lack clarity or motivation"])
-        mental3 = st.selectbox("3. How frequently do you take time to relax or clear your mind?",
-                               ["Select an option", "Daily", "Few times a week", "Occasionally", "Rarely"])
-
-        # Social
-        social1 = st.selectbox("1. How frequently do you meet or interact with friends or social groups?",
-                               ["Select an option", "Very frequently", "Occasionally", "Rarely", "Almost never"])
-        social2 = st.selectbox("2. Are you comfortable expressing your thoughts in social situations?",
-                               ["Select an option", "Very comfortable", "Somewhat comfortable", "Uncomfortable", "Avoid social interaction"])
-        social3 = st.selectbox("3. How do you usually contribute to your community or social circles?",
-                               ["Select an option", "Actively volunteer or participate", "Support occasionally", "Prefer to stay uninvolved"])
-
-        # Financial
-        financial1 = st.selectbox("1. Current Status of Income",
-                                  ["Select an option", "I have a regular and stable source of income", "I am self-employed or doing freelance work",
-                                   "I am currently unemployed but actively seeking opportunities", "I am a student or dependent on family",
-                                   "Retired or not seeking employment"])
-        financial2 = st.selectbox("2. Primary Source of Income",
-                                  ["Select an option", "Salary or professional income", "Business or self-employment",
-                                   "Parental/family support", "Savings or pension", "No fixed source of income"])
-        financial3 = st.selectbox("3. Financial Goal",
-                                  ["Select an option", "To find a stable source of income", "To grow my business or income level",
-                                   "To save and invest wisely", "To clear debts or improve stability", "I am financially comfortable"]) 
-
-        # Spiritual
-        spiritual1 = st.selectbox("1. How connected do you feel with your inner self or spiritual side?",                                   ["Select an option", "Strongly connected", "Moderately connected", "Slightly connected", "Not connected"])
-        spiritual2 = st.selectbox("2. Do you engage in activities like meditation, prayer, or self-reflection?",                                   ["Select an option", "Daily", "Few times a week", "Occasionally", "Rarely or never"]) 
-        spiritual3 = st.selectbox("3. How important is spiritual growth in your life?",                                   ["Select an option", "Very important", "Somewhat important", "Not very important", "Not important at all"]) 
+        back_clicked, submit_clicked, picks = render_page(page)
 
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("⬅️ Back"):
-                go_back()
-        with col2:
-            if st.button("Next ➡️"):
-                missing = any([
-                    family1.startswith("Select"), family2.startswith("Select"), family3.startswith("Select"),
-                    physical1.startswith("Select"), physical2.startswith("Select"), physical3.startswith("Select"),
-                    mental1.startswith("Select"), mental2.startswith("Select"), mental3.startswith("Select"),
-                    social1.startswith("Select"), social2.startswith("Select"), social3.startswith("Select"),
-                    financial1.startswith("Select"), financial2.startswith("Select"), financial3.startswith("Select"),
-                    spiritual1.startswith("Select"), spiritual2.startswith("Select"), spiritual3.startswith("Select")
-                ])
-
-                if missing:
-                    st.error("⚠️ Please answer all Stage 2 questions before continuing.")
+        if back_clicked:
+            go_back()
+        if submit_clicked:
+            if page.missing(picks):
+                st.error(page.error)
+            else:
+                st.session_state.data.set_codes(picks)
+                if page.final:
+                    # save and generate the PDF (smart PDF: only this user type's sections)
+                    finish_assessment(page.user_type)
                 else:
-                    st.session_state.data.update({
-                        "family1": family1, "family2": family2, "family3": family3,
-                        "physical1": physical1, "physical2": physical2, "physical3": physical3,
-                        "mental1": mental1, "mental2": mental2, "mental3": mental3,
-                        "social1": social1, "social2": social2, "social3": social3,
-                        "financial1": financial1, "financial2": financial2, "financial3": financial3,
-                        "spiritual1": spiritual1, "spiritual2": spiritual2, "spiritual3": spiritual3
-                    })
                     go_next()
 
-# ----------------- STAGE 3 for owners (kept intact) -----------------
-elif st.session_state.stage == 3:
-    st.header("Stage 3 — Mandatory Requirements")
-
-    reqs = {}
-    def q(txt):
-        return st.radio(txt, ["Select", "Yes", "No"])
-
-    reqs["Daily Account Review"] = q("1. Do you review business accounts daily (zero-zero balance)?")
-    reqs["Minimize Financial Burden"] = q("2. Do you maintain minimum loans and debts?")
-    reqs["Complete Technical Knowledge"] = q("3. Do you have complete technical knowledge of your business?")
-    reqs["Complete Equipment Knowledge"] = q("4. Do you have complete knowledge of your equipment (if any)?")
-    reqs["Fixed Duty Hours"] = q("5. Do you follow fixed duty hours?")
-    reqs["Accounting Course"] = q("6. Have you completed a share/purchase or accounting course?")
-    reqs["Tax & Compliance"] = q("7. Do you understand GST, tax, banking, and other government compliance?")
-    reqs["Worker Insurance"] = q("8. Have you insured your workers?")
-    reqs["Firm Insurance"] = q("9. Is your firm insured?")
-    reqs["Fire Safety"] = q("10. Do you have fire safety arrangements at the firm?")
-    reqs["Labour Rules"] = q("11. Do you understand basic labour rules?")
-
-    col1, col2 = st.columns(2)
-    with col1:
-        if st.button("⬅️ Back"):
-            go_back()
-    with col2:
-        if st.button("Generate Report 🧾"):
-
-            if any(v == "Select" for v in reqs.values()):
-                st.error("⚠️ Please answer all mandatory requirement questions.")
+    # ----------------- FINAL STAGE -----------------
+    elif st.session_state.stage == 4:
+        st.header("🎉 Thank You!")
+        st.write("Your personalized Business Personality & Readiness Report has been generated successfully.")
+
+        if st.session_state.get("report_key"):
+            from report_cache import get_report_cache
+            from report_specs import REPORTS
+            from workers import PoolBusy, settings as worker_settings
+
+            spec = REPORTS[st.session_state.user_type]
+            status = st.empty()
+            # Reruns and repeat downloads are served from the report cache
+            pdf_bytes = get_report_cache().get(st.session_state.report_key)
+            try:
+                if pdf_bytes is None:
+                    if st.session_state.get("report_job") is None:
+                        # Evicted since it was generated: build it again
+                        submit_report(st.session_state.user_type)
+                    with status, st.spinner("Generating your report..."), metrics.span("app_report_wait"):
+                        pdf_bytes = st.session_state.report_job.result(timeout=worker_settings()["report_timeout"])
+            except PoolBusy:
+                status.warning("The server is busy generating other reports. Please try again in a moment.")
+                st.button("Try again")
+            except TimeoutError:
+                status.warning("Your report is taking longer than usual. It will appear here when ready.")
+                st.button("Check again")
+            except Exception as e:
+                status.error(f"Failed to generate report: {e}")
             else:
-                st.session_state.data.update(reqs)
-
-                # generate PDF for owner (original behavior)
-                pdf_buffer = io.BytesIO()
-                doc = SimpleDocTemplate(pdf_buffer, pagesize=A4,
-                                        rightMargin=40, leftMargin=40,
-                                        topMargin=60, bottomMargin=40)
-                styles = getSampleStyleSheet()
-                elements = []
-
-                title_style = ParagraphStyle(name='TitleStyle', fontSize=18, alignment=1, textColor=colors.HexColor("#023e8a"))
-                elements.append(Paragraph("<b>Business Personality & Readiness Report</b>", title_style))
-                elements.append(Spacer(1, 0.2 * inch))
-                date_str = datetime.now().strftime("%d %B %Y, %I:%M %p")
-                elements.append(Paragraph(f"Generated on {date_str}", styles["Normal"]))
-                elements.append(Spacer(1, 0.2 * inch))
-
-                heading = ParagraphStyle(name='Heading', fontSize=14, textColor="#0077b6")
-                elements.append(Paragraph("<b>Stage 1 – Personal Information</b>", heading))
-                for key in ["Registration Code", "Age Group", "Gender", "KK Number"]:
-                    elements.append(Paragraph(f"<b>{key}:</b> {st.session_state.data.get(key)}", styles["Normal"]))
-                elements.append(Spacer(1, 0.2 * inch))
-
-                elements.append(Paragraph("<b>Stage 2 – Personality & Lifestyle</b>", heading))
-                stage2_labels = {
-                    "family1": "Relationship with family",
-                    "family2": "Family support",
-                    "family3": "Quality time",
-                    "physical1": "Physical activity",
-                    "physical2": "Diet & sleep",
-                    "physical3": "Health effect on confidence",
-                    "mental1": "Stress handling",
-                    "mental2": "Goal confidence",
-                    "mental3": "Relaxation frequency",
-                    "social1": "Social interaction",
-                    "social2": "Comfort expressing thoughts",
-                    "social3": "Community contribution",
-                    "financial1": "Income status",
-                    "financial2": "Financial support",
-                    "financial3": "Financial goal",
-                    "spiritual1": "Spiritual connection",
-                    "spiritual2": "Meditation/reflection",
-                    "spiritual3": "Spiritual importance"
-                }
-
-                for key, label in stage2_labels.items():
-                    ans = st.session_state.data.get(key)
-                    elements.append(Paragraph(f"<b>{label}:</b> {ans}", styles["Normal"]))
-                    elements.append(Spacer(1, 0.05 * inch))
-                elements.append(Spacer(1, 0.2 * inch))
-
-                elements.append(Paragraph("<b>Stage 3 – Mandatory Requirements</b>", heading))
-                table_data = [["Requirement", "Status"]]
-
-                for k, v in reqs.items():
-                    table_data.append([k, v])
-
-                t = Table(table_data)
-                t.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#0077b6")),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('GRID', (0, 0), (-1, -1), 0.4, colors.grey)
-                ]))
-                elements.append(t)
-                elements.append(Spacer(1, 0.2 * inch))
-
-                note_text = ("<b>Note:</b> To proceed further, the firm must ensure that all the listed requirements are fully implemented. "
-                             "Once all conditions are satisfied, a verification visit will be conducted by our team to validate completion and compliance.")
-                note = Table([[Paragraph(note_text, styles["Normal"]) ]], colWidths=[6.3 * inch], style=[
-                    ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor("#FFF8C4")),
-                    ('BOX', (0, 0), (-1, -1), 1, colors.HexColor("#B8860B"))
-                ])
-                elements.append(note)
-
-                doc.build(elements)
-                pdf_buffer.seek(0)
-                st.download_button("⬇️ Download Professional PDF Report", pdf_buffer.getvalue(), file_name=f"Business_Readiness_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf", mime="application/pdf")
-                st.success("Report generated successfully!")
-                save_to_google_sheet(st.session_state.data)
-                st.session_state.stage = 4
-                
-
-# ----------------- FINAL STAGE -----------------
-elif st.session_state.stage == 4:
-    st.header("🎉 Thank You!")
-    st.write("Your personalized Business Personality & Readiness Report has been generated successfully.")
-
-    if st.button("Start New Assessment"):
-        st.session_state.stage = 1
-        st.session_state.data = {}
-        st.session_state.user_type = None
-        st.rerun()
+                st.session_state.report_job = None  # the cache holds the bytes from here on
+                status.success("Report generated successfully!")
+                st.download_button(spec.download_label, pdf_bytes, file_name=spec.file_name(), mime="application/pdf")
+
+        if st.button("Start New Assessment"):
+            discard_draft()
+            st.session_state.stage = 1
+            st.session_state.data = Answers()
+            st.session_state.user_type = None
+            st.session_state.report_key = None
+            st.session_state.report_job = None
+            st.rerun()
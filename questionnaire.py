@@ -0,0 +1,310 @@
+"""Declarative questionnaire schema.
+
+Every question the app asks after Stage 1 is defined once here, grouped into
+pages (one per stage and user type). ``compile_schema`` turns the pages into
+the lookup tables the rest of the app uses, once at import time:
+
+* ``PAGES``          (user_type, stage) -> Page, used to render the forms
+* ``OPTIONS``        question key -> option tuple (index 0 is the placeholder)
+* ``LAYOUTS``        user_type -> question keys in storage order
+* ``SHEET_COLUMNS``  user_type -> columns of a saved row after the prefix: Stage 1
+  fields, answers in schema order, then one score per ``SCORE_DIMENSIONS`` entry
+  and the ``RECOMMENDATIONS_COLUMN``
+* ``WORKSHEETS``     user_type -> worksheet title (one per user type and version)
+* ``SHEET_HEADERS``  worksheet title -> header row
+* ``REPORT_SECTIONS`` user_type -> (title, ((label, key), ...), kind) per page
+
+Adding a question means adding one ``Question`` to the right page.
+"""
+from dataclasses import dataclass
+
+BASIC_FIELDS = ["Registration Code", "Age Group", "Gender", "KK Number"]
+
+# Bump when a change to the questions would shift sheet columns; rows then go
+# to a fresh set of worksheets with the new header.
+SCHEMA_VERSION = 1
+
+ROW_PREFIX = ["Timestamp", "Schema Version"]
+
+YES_NO = ("Select", "Yes", "No")
+
+# Readiness dimensions scored per user type; the points live in scoring.py
+SCORE_DIMENSIONS = {
+    "future": ("Future Aptitude",),
+    "starter": ("Starter Readiness",),
+    "owner": ("Family", "Physical", "Mental", "Social", "Financial", "Spiritual", "Stage 3 Compliance"),
+}
+SCORE_COLUMNS = {user_type: tuple(f"{d} Score" for d in dims) for user_type, dims in SCORE_DIMENSIONS.items()}
+
+# Titles of the recommendations that fired (see recommendations.py)
+RECOMMENDATIONS_COLUMN = "Recommendations"
+
+# Columns computed from the answers, saved after them
+DERIVED_COLUMNS = {user_type: columns + (RECOMMENDATIONS_COLUMN,) for user_type, columns in SCORE_COLUMNS.items()}
+
+
+@dataclass(frozen=True)
+class Question:
+    key: str
+    text: str
+    options: tuple           # options[0] is the "Select ..." placeholder
+    report_label: str = ""   # defaults to Q<n> in the report
+    widget: str = "selectbox"
+
+
+@dataclass(frozen=True)
+class Page:
+    user_type: str
+    stage: int
+    header: str
+    intro: str
+    questions: tuple
+    submit_label: str
+    error: str
+    report_title: str
+    report_kind: str = "list"   # "list" of answers or a "table" of statuses
+    final: bool = False         # submitting this page finishes the assessment
+
+    @property
+    def form_key(self):
+        return f"stage{self.stage}_{self.user_type}"
+
+    @property
+    def keys(self):
+        return tuple(q.key for q in self.questions)
+
+    def missing(self, picks):
+        # picks maps key -> selected option index; 0 is the placeholder
+        return 0 in picks.values()
+
+
+BASIC_QUESTIONS = (
+    Question("Age Group", "Age group",
+             ("Select age group", "Below 18", "20–30", "31–40", "41–50", "51–60", "Above 60")),
+    Question("Gender", "Gender", ("Select gender", "Male", "Female", "Other")),
+    Question("KK Number", "KK Number", ("Select KK number", "1", "2", "3", "4", "5", "6")),
+)
+
+PAGE_DEFINITIONS = (
+    Page(
+        user_type="future", stage=2,
+        header="Future Entrepreneur — Assessment",
+        intro="This short form is for young future entrepreneurs (below 18).",
+        submit_label="Finish & Generate Report",
+        error="Please answer all questions before continuing.",
+        report_title="Future Entrepreneur Assessment",
+        final=True,
+        questions=(
+        Question("fe1", "1. Which subjects do you enjoy the most?",
+                 ("Select an option", "Math/Science", "Commerce/Economics", "Arts/Humanities",
+                  "Computer/Technology", "Other")),
+        Question("fe2", "2. What activities make you feel confident?",
+                 ("Select an option", "Public speaking", "Coding/Building things", "Arts & Crafts", "Sports",
+                  "Other")),
+        Question("fe3", "3. Do you enjoy solving problems or creating new ideas?",
+                 ("Select an option", "Yes, very much", "Sometimes", "Not really")),
+        Question("fe4", "4. Do you take initiative in school or at home?",
+                 ("Select an option", "Often", "Sometimes", "Rarely")),
+        Question("fe5", "5. Does your family support your interest in business?",
+                 ("Select an option", "Strongly support", "Somewhat support", "Not supportive")),
+        Question("fe6", "6. Do you have role models or entrepreneurs you look up to?",
+                 ("Select an option", "Yes", "No")),
+        Question("fe7", "7. Would you like to become an entrepreneur someday?",
+                 ("Select an option", "Yes", "Maybe", "No")),
+        Question("fe8", "8. How comfortable are you making decisions?",
+                 ("Select an option", "Very comfortable", "Somewhat comfortable", "Not comfortable")),
+        Question("fe9", "9. What type of business attracts you?",
+                 ("Select an option", "Technology", "Shop/Store", "Online services", "Food", "Other")),
+        Question("fe10", "10. Do you want to study further before starting a business?",
+                 ("Select an option", "Yes", "No", "Maybe")),
+        ),
+    ),
+    Page(
+        user_type="starter", stage=2,
+        header="New Business Starter — Readiness",
+        intro="This short form helps you evaluate readiness to start a business.",
+        submit_label="Finish & Generate Report",
+        error="Please answer all questions before continuing.",
+        report_title="New Business Starter Assessment",
+        final=True,
+        questions=(
+        Question("s1", "1. Do you have a business idea?",
+                 ("Select an option", "Yes, clear idea", "Have a few ideas", "No idea yet")),
+        Question("s2", "2. What problem will your business solve?",
+                 ("Select an option", "Local customer need", "Online convenience", "Skill/service gap",
+                  "Other")),
+        Question("s3", "3. Do you have savings to invest?",
+                 ("Select an option", "Enough savings", "Small savings", "No savings")),
+        Question("s4", "4. Will family support financially?", ("Select an option", "Yes", "Maybe", "No")),
+        Question("s5", "5. Do you have skills related to idea?",
+                 ("Select an option", "Yes", "Somewhat", "No")),
+        Question("s6", "6. Are you willing to take training?", ("Select an option", "Yes", "Maybe", "No")),
+        Question("s7", "7. Have you researched competitors?",
+                 ("Select an option", "Yes", "Partially", "Not yet")),
+        Question("s8", "8. Do you know your target customer?", ("Select an option", "Yes", "Somewhat", "No")),
+        Question("s9", "9. Are you comfortable taking risks?",
+                 ("Select an option", "Very", "Somewhat", "Not really")),
+        Question("s10", "10. How disciplined are you?",
+                 ("Select an option", "Very disciplined", "Moderately", "Not disciplined")),
+        ),
+    ),
+    Page(
+        user_type="owner", stage=2,
+        header="Stage 2 — Personality & Lifestyle",
+        intro="Please answer honestly. Use the dropdowns to select the best option.",
+        submit_label="Next ➡️",
+        error="⚠️ Please answer all Stage 2 questions before continuing.",
+        report_title="Stage 2 – Personality & Lifestyle",
+        questions=(
+        # Family
+        Question("family1", "1. How would you describe your relationship with your family members?",
+                 ("Select an option", "Very close and understanding", "Supportive but sometimes distant",
+                  "Occasionally conflicting", "Difficult or strained"),
+                 report_label="Relationship with family"),
+        Question("family2", "2. How much support do you receive from your family in your personal growth?",
+                 ("Select an option", "Always supportive", "Supportive when needed",
+                  "Neutral or limited support", "Rarely supportive"),
+                 report_label="Family support"),
+        Question("family3", "3. How often do you spend quality time with your family?",
+                 ("Select an option", "Every day", "Few times a week", "Occasionally", "Rarely"),
+                 report_label="Quality time"),
+        # Physical
+        Question("physical1", "1. How active are you physically in your daily routine?",
+                 ("Select an option", "Very active (daily exercise)", "Moderately active",
+                  "Occasionally active", "Mostly inactive"),
+                 report_label="Physical activity"),
+        Question("physical2", "2. Do you maintain a healthy diet and sleeping pattern?",
+                 ("Select an option", "Always maintain", "Most of the time", "Sometimes", "Rarely"),
+                 report_label="Diet & sleep"),
+        Question("physical3", "3. Do you feel your physical health affects your confidence and overall personality?",
+                 ("Select an option", "Yes, strongly", "Somewhat", "Not much", "No impact"),
+                 report_label="Health effect on confidence"),
+        # Mental
+        Question("mental1", "1. How well do you handle stress or unexpected challenges?",
+                 ("Select an option", "Very well", "Manageable", "Sometimes struggle", "Find it difficult"),
+                 report_label="Stress handling"),
+        Question("mental2", "2. Do you often feel positive and confident about your goals?",
+                 ("Select an option", "Always confident and focused", "Usually positive with minor doubts",
+                  "Sometimes uncertain", "Often lack clarity or motivation"),
+                 report_label="Goal confidence"),
+        Question("mental3", "3. How frequently do you take time to relax or clear your mind?",
+                 ("Select an option", "Daily", "Few times a week", "Occasionally", "Rarely"),
+                 report_label="Relaxation frequency"),
+        # Social
+        Question("social1", "1. How frequently do you meet or interact with friends or social groups?",
+                 ("Select an option", "Very frequently", "Occasionally", "Rarely", "Almost never"),
+                 report_label="Social interaction"),
+        Question("social2", "2. Are you comfortable expressing your thoughts in social situations?",
+                 ("Select an option", "Very comfortable", "Somewhat comfortable", "Uncomfortable",
+                  "Avoid social interaction"),
+                 report_label="Comfort expressing thoughts"),
+        Question("social3", "3. How do you usually contribute to your community or social circles?",
+                 ("Select an option", "Actively volunteer or participate", "Support occasionally",
+                  "Prefer to stay uninvolved"),
+                 report_label="Community contribution"),
+        # Financial
+        Question("financial1", "1. Current Status of Income",
+                 ("Select an option", "I have a regular and stable source of income",
+                  "I am self-employed or doing freelance work",
+                  "I am currently unemployed but actively seeking opportunities",
+                  "I am a student or dependent on family", "Retired or not seeking employment"),
+                 report_label="Income status"),
+        Question("financial2", "2. Primary Source of Income",
+                 ("Select an option", "Salary or professional income", "Business or self-employment",
+                  "Parental/family support", "Savings or pension", "No fixed source of income"),
+                 report_label="Financial support"),
+        Question("financial3", "3. Financial Goal",
+                 ("Select an option", "To find a stable source of income",
+                  "To grow my business or income level", "To save and invest wisely",
+                  "To clear debts or improve stability", "I am financially comfortable"),
+                 report_label="Financial goal"),
+        # Spiritual
+        Question("spiritual1", "1. How connected do you feel with your inner self or spiritual side?",
+                 ("Select an option", "Strongly connected", "Moderately connected", "Slightly connected",
+                  "Not connected"),
+                 report_label="Spiritual connection"),
+        Question("spiritual2", "2. Do you engage in activities like meditation, prayer, or self-reflection?",
+                 ("Select an option", "Daily", "Few times a week", "Occasionally", "Rarely or never"),
+                 report_label="Meditation/reflection"),
+        Question("spiritual3", "3. How important is spiritual growth in your life?",
+                 ("Select an option", "Very important", "Somewhat important", "Not very important",
+                  "Not important at all"),
+                 report_label="Spiritual importance"),
+        ),
+    ),
+    Page(
+        user_type="owner", stage=3,
+        header="Stage 3 — Mandatory Requirements",
+        intro="",
+        submit_label="Generate Report 🧾",
+        error="⚠️ Please answer all mandatory requirement questions.",
+        report_title="Stage 3 – Mandatory Requirements",
+        report_kind="table",
+        final=True,
+        questions=(
+        Question("Daily Account Review", "1. Do you review business accounts daily (zero-zero balance)?",
+                 YES_NO,
+                 widget="radio"),
+        Question("Minimize Financial Burden", "2. Do you maintain minimum loans and debts?",
+                 YES_NO,
+                 widget="radio"),
+        Question("Complete Technical Knowledge", "3. Do you have complete technical knowledge of your business?",
+                 YES_NO,
+                 widget="radio"),
+        Question("Complete Equipment Knowledge", "4. Do you have complete knowledge of your equipment (if any)?",
+                 YES_NO,
+                 widget="radio"),
+        Question("Fixed Duty Hours", "5. Do you follow fixed duty hours?", YES_NO, widget="radio"),
+        Question("Accounting Course", "6. Have you completed a share/purchase or accounting course?",
+                 YES_NO,
+                 widget="radio"),
+        Question("Tax & Compliance", "7. Do you understand GST, tax, banking, and other government compliance?",
+                 YES_NO,
+                 widget="radio"),
+        Question("Worker Insurance", "8. Have you insured your workers?", YES_NO, widget="radio"),
+        Question("Firm Insurance", "9. Is your firm insured?", YES_NO, widget="radio"),
+        Question("Fire Safety", "10. Do you have fire safety arrangements at the firm?",
+                 YES_NO,
+                 widget="radio"),
+        Question("Labour Rules", "11. Do you understand basic labour rules?", YES_NO, widget="radio"),
+        ),
+    ),
+)
+
+
+def compile_schema(basic_questions, pages, derived_columns):
+    page_index = {}
+    options = {q.key: q.options for q in basic_questions}
+    layouts = {}
+    report_sections = {}
+    for page in pages:
+        page_index[(page.user_type, page.stage)] = page
+        layout = layouts.setdefault(page.user_type, [])
+        items = []
+        for position, q in enumerate(page.questions, start=1):
+            if q.key in options:
+                raise ValueError(f"duplicate question key {q.key!r}")
+            options[q.key] = q.options
+            layout.append(q.key)
+            items.append((q.report_label or f"Q{position}", q.key))
+        report_sections.setdefault(page.user_type, []).append(
+            (page.report_title, tuple(items), page.report_kind))
+    sheet_columns = {
+        # Stage 1 fields first, then the questions in the order they are asked, then scores etc.
+        user_type: BASIC_FIELDS + layout + list(derived_columns.get(user_type, ()))
+        for user_type, layout in layouts.items()
+    }
+    return (page_index, options, {k: tuple(v) for k, v in layouts.items()},
+            sheet_columns, {k: tuple(v) for k, v in report_sections.items()})
+
+
+PAGES, OPTIONS, LAYOUTS, SHEET_COLUMNS, REPORT_SECTIONS = compile_schema(
+    BASIC_QUESTIONS, PAGE_DEFINITIONS, DERIVED_COLUMNS)
+
+WORKSHEETS = {user_type: f"{user_type}_v{SCHEMA_VERSION}" for user_type in LAYOUTS}
+SHEET_HEADERS = {WORKSHEETS[user_type]: ROW_PREFIX + columns for user_type, columns in SHEET_COLUMNS.items()}
+
+# Widget choices are option indices; the label comes from OPTIONS via format_func
+CHOICES = {key: tuple(range(len(options))) for key, options in OPTIONS.items()}
+
+OWNER_REQUIREMENTS = list(PAGES[("owner", 3)].keys)
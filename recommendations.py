@@ -0,0 +1,173 @@
+"""Personalized recommendations from a rule table.
+
+Each ``Rule`` fires when every question in its ``when`` has one of the listed
+answers, e.g. ``(("s3", "No savings"), ("s4", "No"))`` for financing guidance.
+``RULES`` is checked against the questionnaire schema and compiled at import
+into one index per user type, keyed by (question key, option): the rules that
+condition can satisfy. ``recommend`` then costs one dict lookup per question
+some rule mentions, counting hits per rule; a rule fires once all of its
+conditions were hit. No rule is evaluated on its own.
+
+Fired rules come back sorted by priority (1 = act first), then table order.
+The reports list them in a "Recommended Next Steps" section and the saved row
+keeps their titles in the ``Recommendations`` column.
+"""
+from dataclasses import dataclass
+
+from questionnaire import LAYOUTS, OPTIONS
+
+SECTION_TITLE = "Recommended Next Steps"
+PRIORITIES = {1: "High", 2: "Medium", 3: "Low"}
+NONE_FIRED = "Your answers don't call for any specific action right now. Keep building on your strengths."
+
+
+@dataclass(frozen=True)
+class Rule:
+    title: str       # short label, stored in the sheet
+    text: str        # the advice printed in the report
+    priority: int    # key of PRIORITIES
+    when: tuple      # ((question key, option or tuple of options), ...), all must hold
+
+
+def _requirement(key, title, text, priority=1):
+    return Rule(title, text, priority, ((key, "No"),))
+
+
+RULES = (
+    # ---- future entrepreneurs ----
+    Rule("Build initiative",
+         "Join a school club, competition or small project where you lead something from start to finish.",
+         2, (("fe3", "Not really"), ("fe4", "Rarely"))),
+    Rule("Practise decisions",
+         "Practise small decisions every day (planning a budget, choosing a project) and review how they went.",
+         2, (("fe8", "Not comfortable"),)),
+    Rule("Talk with your family",
+         "Share your business interest with your family. A small project they can see, such as a stall at a "
+         "school fair, often earns their support.",
+         2, (("fe5", "Not supportive"),)),
+    Rule("Find a role model",
+         "Read about or meet local entrepreneurs and note how they started.",
+         3, (("fe6", "No"),)),
+    Rule("Start small",
+         "You are motivated and have role models: try a tiny venture now, such as selling crafts or offering a "
+         "service to neighbours, with a parent's help.",
+         3, (("fe7", "Yes"), ("fe6", "Yes"))),
+    Rule("Plan your studies",
+         "Choose courses that support your business goal, such as commerce, accounting or technology.",
+         3, (("fe10", "Yes"),)),
+
+    # ---- business starters ----
+    Rule("Financing guidance",
+         "With no savings and no family backing, look into micro-finance and government start-up loan schemes, "
+         "and plan a low-capital first version of the business.",
+         1, (("s3", "No savings"), ("s4", "No"))),
+    Rule("Budget carefully",
+         "Your savings are small and family support is uncertain: write a month-by-month budget before you "
+         "commit any money.",
+         2, (("s3", "Small savings"), ("s4", ("Maybe", "No")))),
+    Rule("Shape an idea",
+         "Spend the next few weeks listing problems people around you pay to solve; pick one to test.",
+         1, (("s1", "No idea yet"),)),
+    Rule("Define your customer",
+         "Describe your target customer in one sentence and speak to five of them before you build anything.",
+         1, (("s8", "No"),)),
+    Rule("Research competitors",
+         "Visit or study at least three competitors and note their prices, strengths and gaps.",
+         2, (("s7", "Not yet"),)),
+    Rule("Skill training",
+         "Take a short course or apprenticeship in the skills your idea needs.",
+         2, (("s5", "No"), ("s6", ("Yes", "Maybe")))),
+    Rule("Find a skilled partner",
+         "You don't have the skills yet and prefer not to train: partner with someone who has them.",
+         1, (("s5", "No"), ("s6", "No"))),
+    Rule("Manage risk",
+         "Start with a small test (a pilot order or a weekend stall) so a setback costs little.",
+         3, (("s9", "Not really"),)),
+    Rule("Set a routine",
+         "Fix working hours and weekly goals, and review them every Sunday.",
+         3, (("s10", "Not disciplined"),)),
+
+    # ---- business owners: Stage 3 requirements answered No ----
+    _requirement("Fire Safety", "Fire safety action item",
+                 "Install extinguishers, mark exits and train staff on a fire drill before the verification visit."),
+    _requirement("Worker Insurance", "Insure your workers",
+                 "Arrange insurance cover for every worker; it protects them and the firm."),
+    _requirement("Firm Insurance", "Insure the firm",
+                 "Insure the premises, stock and equipment against fire, theft and damage."),
+    _requirement("Tax & Compliance", "Tax and compliance",
+                 "Get GST, tax and banking registrations in order; a local accountant can review them with you."),
+    _requirement("Labour Rules", "Labour rules",
+                 "Learn the basic labour rules on wages, working hours and leave that apply to your firm."),
+    Rule("Bookkeeping basics",
+         "You neither review accounts daily nor have accounting training: take a short bookkeeping course and "
+         "close the books every evening.",
+         1, (("Daily Account Review", "No"), ("Accounting Course", "No"))),
+    _requirement("Daily Account Review", "Daily account review",
+                 "Close the day's accounts every evening so cash and books match (zero-zero balance).", 2),
+    _requirement("Accounting Course", "Accounting course",
+                 "Complete a purchase/sales or accounting course.", 2),
+    _requirement("Minimize Financial Burden", "Reduce debt",
+                 "List loans by interest rate and pay the most expensive first; avoid new borrowing for now.", 2),
+    _requirement("Fixed Duty Hours", "Fixed duty hours",
+                 "Set and post fixed business hours for yourself and your staff.", 2),
+    _requirement("Complete Technical Knowledge", "Technical knowledge",
+                 "Close the gaps in your technical knowledge of the business with training or a mentor.", 2),
+    _requirement("Complete Equipment Knowledge", "Equipment knowledge",
+                 "Learn the operation and maintenance of your equipment from the supplier or manual.", 3),
+
+    # ---- business owners: Stage 2 ----
+    Rule("Stabilise income",
+         "You have no fixed income while looking for work: keep personal and business money separate and build a "
+         "three-month reserve before expanding.",
+         1, (("financial1", "I am currently unemployed but actively seeking opportunities"),
+             ("financial2", "No fixed source of income"))),
+    Rule("Manage stress",
+         "Stress is hard to handle right now: schedule regular breaks and share the workload where you can.",
+         2, (("mental1", "Find it difficult"),)),
+    Rule("Grow your network",
+         "Join a trade association or local business group to meet peers and customers.",
+         3, (("social1", ("Rarely", "Almost never")),)),
+    Rule("Stay active",
+         "Add a short daily walk or exercise routine; energy and focus follow.",
+         3, (("physical1", "Mostly inactive"),)),
+)
+
+
+def compile_rules(rules):
+    # user_type -> {(question key, option): (rule index, ...)}
+    owners = {key: user_type for user_type, layout in LAYOUTS.items() for key in layout}
+    index = {}
+    for i, rule in enumerate(rules):
+        if rule.priority not in PRIORITIES:
+            raise ValueError(f"rule {rule.title!r} has unknown priority {rule.priority}")
+        user_types = {owners.get(key) for key, _ in rule.when}
+        if len(user_types) != 1 or None in user_types:
+            raise ValueError(f"rule {rule.title!r} must use questions of exactly one user type")
+        lookup = index.setdefault(user_types.pop(), {})
+        for key, options in rule.when:
+            for option in (options if isinstance(options, tuple) else (options,)):
+                if option not in OPTIONS[key][1:]:
+                    raise ValueError(f"rule {rule.title!r}: {option!r} is not an option of {key!r}")
+                lookup.setdefault((key, option), []).append(i)
+    return {user_type: {k: tuple(v) for k, v in lookup.items()} for user_type, lookup in index.items()}
+
+
+INDEX = compile_rules(RULES)
+# Questions some rule mentions, per user type: the only ones recommend() looks at
+KEYS = {user_type: tuple(dict.fromkeys(key for key, _ in lookup)) for user_type, lookup in INDEX.items()}
+
+
+def recommend(user_type, answers):
+    # answers maps question key -> option text (Answers.to_dict() or a stored row as a dict)
+    lookup = INDEX.get(user_type, {})
+    hits = {}
+    for key in KEYS.get(user_type, ()):
+        for i in lookup.get((key, answers.get(key)), ()):
+            hits[i] = hits.get(i, 0) + 1
+    fired = sorted(i for i, n in hits.items() if n == len(RULES[i].when))
+    return sorted((RULES[i] for i in fired), key=lambda rule: rule.priority)
+
+
+def summary(rules):
+    # The saved row's Recommendations cell
+    return "; ".join(rule.title for rule in rules)
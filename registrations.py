@@ -0,0 +1,163 @@
+"""Index of Registration Codes that have already completed the assessment.
+
+Stage 1 checks a new code against an in-memory set, so spotting a repeat is
+one hash lookup however many rows the sheet holds. The set is persisted in a
+small SQLite file next to the submission spool and is kept current from two
+sides:
+
+* the app adds a code as soon as its row is spooled (``add``), so a repeat is
+  caught before the row has even reached the sheet;
+* a background thread pages through the stored worksheets from a persisted
+  cursor (the same approach as analytics.py), picking up rows written by other
+  app instances. A fresh index reads the sheet once; after that, only new rows.
+  The first worksheet, where submissions went before per-user-type worksheets
+  (storage.LEGACY_SHEET), is read too, so codes used before the upgrade count.
+
+What Stage 1 does with a repeat is set in the optional ``[registrations]``
+table in ``st.secrets``::
+
+    [registrations]
+    duplicates = "flag"        # "flag": warn and continue on a second Next; "reject": refuse
+    path = ".spool/registrations.db"
+    refresh_seconds = 300      # how often to read rows other instances wrote
+    page_size = 1000
+"""
+import os
+import sqlite3
+import threading
+
+import streamlit as st
+
+import metrics
+from questionnaire import ROW_PREFIX, WORKSHEETS
+
+DEFAULT_PATH = os.path.join(".spool", "registrations.db")
+REFRESH_SECONDS = 300.0
+PAGE_SIZE = 1000
+CODE_COLUMN = len(ROW_PREFIX)   # Registration Code is the first field after the prefix
+LEGACY_CODE_COLUMN = 1          # sheet1 rows: timestamp, Registration Code, ... (no Schema Version)
+
+
+def normalize(code):
+    # "ab-12 " and "AB-12" are the same registration
+    return str(code).strip().casefold()
+
+
+class RegistrationIndex:
+    def __init__(self, path, storage_fn, refresh_seconds=REFRESH_SECONDS, page_size=PAGE_SIZE):
+        self._storage_fn = storage_fn
+        self.refresh_seconds = refresh_seconds
+        self.page_size = page_size
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS codes (code TEXT PRIMARY KEY)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS cursors (sheet TEXT PRIMARY KEY, rows INTEGER NOT NULL)")
+        self._db_lock = threading.Lock()
+        self._codes = {row[0] for row in self._db.execute("SELECT code FROM codes")}
+        self._cursors = dict(self._db.execute("SELECT sheet, rows FROM cursors"))
+        self.synced = False        # True once every worksheet has been read to the end
+        self.last_error = None
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="registration-index", daemon=True)
+        self._thread.start()
+
+    # -------- lookups --------
+    def __contains__(self, code):
+        return normalize(code) in self._codes
+
+    def __len__(self):
+        return len(self._codes)
+
+    def add(self, code):
+        code = normalize(code)
+        if code in self._codes:
+            return
+        with self._db_lock:
+            self._codes.add(code)
+            self._db.execute("INSERT OR IGNORE INTO codes (code) VALUES (?)", (code,))
+
+    # -------- catching up with the store --------
+    def sync(self):
+        # Reads rows appended since the last sync; returns how many were new
+        from storage import LEGACY_SHEET
+
+        storage = self._storage_fn()
+        new = 0
+        sources = [(LEGACY_SHEET, LEGACY_CODE_COLUMN)] + [(sheet, CODE_COLUMN) for sheet in WORKSHEETS.values()]
+        for sheet, column in sources:
+            while True:
+                start = self._cursors.get(sheet, 0)
+                rows = storage.read_rows(sheet, start, self.page_size)
+                codes = {normalize(row[column]) for row in rows if len(row) > column and row[column]}
+                with self._db_lock:
+                    self._db.execute("BEGIN")
+                    try:
+                        self._db.executemany("INSERT OR IGNORE INTO codes (code) VALUES (?)",
+                                             [(c,) for c in codes])
+                        self._db.execute("INSERT OR REPLACE INTO cursors (sheet, rows) VALUES (?, ?)",
+                                         (sheet, start + len(rows)))
+                        self._db.execute("COMMIT")
+                    except BaseException:
+                        self._db.execute("ROLLBACK")
+                        raise
+                    self._codes |= codes
+                    self._cursors[sheet] = start + len(rows)
+                new += len(rows)
+                if len(rows) < self.page_size:
+                    break
+        self.synced = True
+        return new
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with metrics.span("registrations_sync"):
+                    self.sync()
+                self.last_error = None
+            except Exception as e:
+                # Stage 1 keeps checking against what is already indexed
+                self.last_error = repr(e)
+                metrics.inc("registrations_sync_errors", type=type(e).__name__)
+            self._stop.wait(self.refresh_seconds)
+
+    def close(self, timeout=5.0):
+        self._stop.set()
+        self._thread.join(timeout)
+        with self._db_lock:
+            self._db.close()
+
+    def stats(self):
+        return {
+            "codes": len(self._codes),
+            "synced": self.synced,
+            "cursors": dict(self._cursors),
+            "last_error": self.last_error,
+        }
+
+
+def _storage(config):
+    from storage import get_storage
+    return get_storage(config)
+
+
+@st.cache_resource(show_spinner=False)
+def _cached_index(path, storage_config, refresh_seconds, page_size):
+    return RegistrationIndex(path, lambda: _storage(storage_config), refresh_seconds, page_size)
+
+
+def get_registration_index():
+    from storage import storage_config
+
+    cfg = st.secrets.get("registrations", {})
+    # The sync thread runs outside any script run, so the storage config is captured here
+    return _cached_index(cfg.get("path", DEFAULT_PATH), storage_config(),
+                         float(cfg.get("refresh_seconds", REFRESH_SECONDS)),
+                         int(cfg.get("page_size", PAGE_SIZE)))
+
+
+def duplicate_policy():
+    return st.secrets.get("registrations", {}).get("duplicates", "flag")
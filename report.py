@@ -0,0 +1,170 @@
+"""PDF report rendering shared by the future, starter and owner flows.
+
+Styles and the static flowables (title, note boxes) are built once per process
+and cloned per report, so a render only lays out the respondent's answers.
+Each user type is described by a ``ReportSpec`` (see report_specs.py);
+``render_report`` turns a spec plus the answer dict into PDF bytes. The
+recommendations section is worked out from the answers at render time
+(recommendations.py), so regenerated reports follow the current rules.
+"""
+import copy
+import io
+from datetime import datetime
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+import metrics
+from recommendations import NONE_FIRED, PRIORITIES, SECTION_TITLE, recommend
+from report_specs import BASIC_FIELDS, REPORTS
+
+
+# ---------------- cached styles and static flowables ----------------
+@lru_cache(maxsize=None)
+def _styles():
+    with metrics.span("report_styles"):
+        styles = getSampleStyleSheet()
+    return {
+        "normal": styles["Normal"],
+        "title": ParagraphStyle(name='TitleStyle', fontSize=18, alignment=1, textColor=colors.HexColor("#023e8a")),
+        "heading": ParagraphStyle(name='Heading', fontSize=14, textColor="#0077b6"),
+        "table": TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#0077b6")),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('GRID', (0, 0), (-1, -1), 0.4, colors.grey)
+        ]),
+        "note": [
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor("#FFF8C4")),
+            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor("#B8860B"))
+        ],
+    }
+
+
+@lru_cache(maxsize=None)
+def _heading(text):
+    return Paragraph(f"<b>{text}</b>", _styles()["heading"])
+
+
+@lru_cache(maxsize=None)
+def _title():
+    return Paragraph("<b>Business Personality & Readiness Report</b>", _styles()["title"])
+
+
+@lru_cache(maxsize=None)
+def _note_paragraph(text):
+    return Paragraph(text, _styles()["normal"])
+
+
+def _clone(flowable):
+    # Layout state is stored on the instance, so each build gets its own shallow
+    # copy while sharing the already-parsed paragraph fragments.
+    return copy.copy(flowable)
+
+
+def _note(text):
+    return Table([[_clone(_note_paragraph(text))]], colWidths=[6.3 * inch], style=_styles()["note"])
+
+
+def warm_up():
+    # Build every cached style/flowable up front so the first respondent doesn't pay for it
+    _title()
+    _heading("Stage 1 – Personal Information")
+    _heading(SECTION_TITLE)
+    for spec in REPORTS.values():
+        _note_paragraph(spec.note)
+        for section in spec.sections:
+            _heading(section.title)
+
+
+# ---------------- rendering ----------------
+def _section_flowables(section, data, normal):
+    elements = [_clone(_heading(section.title))]
+    if section.kind == "table":
+        table_data = [["Requirement", "Status"]]
+        for label, key in section.items:
+            table_data.append([label, data.get(key)])
+        t = Table(table_data)
+        t.setStyle(_styles()["table"])
+        elements.append(t)
+    elif section.kind == "scores":
+        table_data = [["Dimension", "Score (out of 100)"]]
+        for label, key in section.items:
+            value = data.get(key)
+            table_data.append([label, "" if value is None else f"{value:.0f}"])
+        t = Table(table_data)
+        t.setStyle(_styles()["table"])
+        elements.append(t)
+    else:
+        for label, key in section.items:
+            elements.append(Paragraph(f"<b>{label}:</b> {data.get(key)}", normal))
+            elements.append(Spacer(1, 0.05 * inch))
+    elements.append(Spacer(1, 0.2 * inch))
+    return elements
+
+
+def _recommendation_flowables(rules, normal):
+    elements = [_clone(_heading(SECTION_TITLE))]
+    if rules:
+        table_data = [["Priority", "Action"]]
+        for rule in rules:
+            table_data.append([PRIORITIES[rule.priority], Paragraph(f"<b>{rule.title}.</b> {rule.text}", normal)])
+        t = Table(table_data, colWidths=[0.9 * inch, 5.4 * inch])
+        t.setStyle(_styles()["table"])
+        elements.append(t)
+    else:
+        elements.append(Paragraph(NONE_FIRED, normal))
+    elements.append(Spacer(1, 0.2 * inch))
+    return elements
+
+
+def build_elements(spec, data, generated_at=None):
+    normal = _styles()["normal"]
+    generated_at = generated_at or datetime.now()
+
+    elements = [_clone(_title()), Spacer(1, 0.2 * inch)]
+    date_str = generated_at.strftime("%d %B %Y, %I:%M %p")
+    elements.append(Paragraph(f"Generated on {date_str}", normal))
+    elements.append(Spacer(1, 0.2 * inch))
+
+    elements.append(_clone(_heading("Stage 1 – Personal Information")))
+    for key in BASIC_FIELDS:
+        elements.append(Paragraph(f"<b>{key}:</b> {data.get(key)}", normal))
+    elements.append(Spacer(1, 0.2 * inch))
+
+    for section in spec.sections:
+        elements.extend(_section_flowables(section, data, normal))
+
+    elements.extend(_recommendation_flowables(recommend(spec.user_type, data), normal))
+    elements.append(_note(spec.note))
+    return elements
+
+
+def render_report(user_type, data, generated_at=None):
+    spec = REPORTS[user_type]
+    pdf_buffer = io.BytesIO()
+    doc = SimpleDocTemplate(pdf_buffer, pagesize=A4,
+                            rightMargin=40, leftMargin=40,
+                            topMargin=60, bottomMargin=40)
+    with metrics.span("report_build", user_type=user_type):
+        doc.build(build_elements(spec, data, generated_at))
+    return pdf_buffer.getvalue()
+
+
+# ---------------- bundles ----------------
+def render_contents(title, entries):
+    # Contents page(s) for a merged bundle of reports; entries are (label, page number)
+    normal = _styles()["normal"]
+    rows = [["Report", "Page"]] + [[Paragraph(escape(label), normal), str(page)] for label, page in entries]
+    elements = [_clone(_title()), Spacer(1, 0.2 * inch), _clone(_heading(title)), Spacer(1, 0.2 * inch),
+                Table(rows, colWidths=[5.5 * inch, 0.8 * inch], repeatRows=1, style=_styles()["table"])]
+    pdf_buffer = io.BytesIO()
+    doc = SimpleDocTemplate(pdf_buffer, pagesize=A4,
+                            rightMargin=40, leftMargin=40,
+                            topMargin=60, bottomMargin=40)
+    doc.build(elements)
+    return pdf_buffer.getvalue(), doc.page
@@ -0,0 +1,203 @@
+"""Content-addressed cache of generated PDF reports.
+
+Reports are keyed by a hash of the report type plus the packed answers, so a
+rerun, a second download click or another session with identical answers gets
+the same bytes back without touching ReportLab. The hash is salted with the
+report layouts, recommendation rules and scoring weights (and ``REPORT_VERSION``
+for rendering changes they don't show), so reports spilled to disk before an
+edit to any of them are never served again. The in-memory part is an LRU
+bounded by total bytes; evicted reports spill to an optional directory on disk
+(itself size-bounded) and are promoted back on the next hit. The spilled files
+and their sizes are listed once at startup and tracked in memory from then on,
+so a spill never scans the directory.
+
+Settings come from the optional ``[report_cache]`` table in ``st.secrets``:
+``max_mb``, ``spill_dir`` and ``max_disk_mb``. Hit, miss, eviction and spill
+counts and the size of both tiers are exported through metrics.py as
+``report_cache_*``.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+import metrics
+
+DEFAULT_MAX_MB = 64
+DEFAULT_DISK_MB = 512
+REPORT_VERSION = 1   # bump when report.py renders differently from the same tables
+
+
+def _layout_salt():
+    # Everything besides the answers that decides what a report says
+    from recommendations import NONE_FIRED, PRIORITIES, RULES, SECTION_TITLE
+    from report_specs import REPORTS
+    from scoring import POINTS
+    tables = (REPORT_VERSION, REPORTS, RULES, SECTION_TITLE, PRIORITIES, NONE_FIRED, POINTS)
+    return hashlib.sha256(repr(tables).encode("utf-8")).digest()
+
+
+LAYOUT_SALT = _layout_salt()
+
+
+def report_key(user_type, packed_answers):
+    # packed_answers is Answers.pack(): already a canonical byte form
+    return hashlib.sha256(LAYOUT_SALT + user_type.encode("ascii") + b"\0" + packed_answers).hexdigest()
+
+
+class ReportCache:
+    def __init__(self, max_bytes, spill_dir=None, max_disk_bytes=0):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.spills = 0
+        self._disk = OrderedDict()   # spilled key -> size, oldest first
+        self._disk_size = 0
+        self._disk_lock = threading.Lock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            self._scan_disk()
+
+    # -------- disk tier --------
+    def _path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.pdf")
+
+    def _scan_disk(self):
+        # The only directory listing: files left by an earlier run, oldest first
+        found = []
+        for name in os.listdir(self.spill_dir):
+            if name.endswith(".pdf"):
+                try:
+                    info = os.stat(os.path.join(self.spill_dir, name))
+                except FileNotFoundError:
+                    continue
+                found.append((info.st_mtime, name[:-len(".pdf")], info.st_size))
+        for _, key, size in sorted(found):
+            self._disk[key] = size
+            self._disk_size += size
+
+    def _spill(self, key, pdf_bytes):
+        if not self.spill_dir:
+            return
+        # A temporary name per thread, so two spills of one key don't write the same file
+        tmp = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(pdf_bytes)
+        os.replace(tmp, self._path(key))
+        with self._disk_lock:
+            self._disk_size += len(pdf_bytes) - self._disk.pop(key, 0)
+            self._disk[key] = len(pdf_bytes)
+            self.spills += 1
+            self._trim_disk()
+
+    def _forget(self, key):
+        with self._disk_lock:
+            self._disk_size -= self._disk.pop(key, 0)
+
+    def _trim_disk(self):
+        # Drop the oldest spills until the tier fits; called with _disk_lock held
+        while self._disk_size > self.max_disk_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass   # removed by hand or by another process sharing the directory
+
+    def _load(self, key):
+        if not self.spill_dir:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                pdf_bytes = f.read()
+        except FileNotFoundError:
+            self._forget(key)
+            return None
+        with self._disk_lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+        return pdf_bytes
+
+    # -------- memory tier --------
+    def _insert(self, key, pdf_bytes):
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        self._entries[key] = pdf_bytes
+        self._size += len(pdf_bytes)
+        evicted = []
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            old_key, old_bytes = self._entries.popitem(last=False)
+            self._size -= len(old_bytes)
+            self.evictions += 1
+            evicted.append((old_key, old_bytes))
+        return evicted
+
+    def get(self, key):
+        with self._lock:
+            pdf_bytes = self._entries.get(key)
+            if pdf_bytes is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pdf_bytes
+        pdf_bytes = self._load(key)
+        with self._lock:
+            if pdf_bytes is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            evicted = self._insert(key, pdf_bytes)
+        for old_key, old_bytes in evicted:
+            self._spill(old_key, old_bytes)
+        return pdf_bytes
+
+    def put(self, key, pdf_bytes):
+        with self._lock:
+            evicted = self._insert(key, pdf_bytes)
+        for old_key, old_bytes in evicted:
+            self._spill(old_key, old_bytes)
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._entries:
+                return True
+        return bool(self.spill_dir) and os.path.exists(self._path(key))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "spills": self.spills,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_size,
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def _cached_report_cache(max_mb, spill_dir, max_disk_mb):
+    cache = ReportCache(int(max_mb * 1024 * 1024), spill_dir, int(max_disk_mb * 1024 * 1024))
+    metrics.watch_stats("report_cache", cache.stats,
+                        counters=("hits", "disk_hits", "misses", "evictions", "spills"),
+                        gauges=("entries", "bytes", "max_bytes", "disk_entries", "disk_bytes"))
+    return cache
+
+
+def get_report_cache():
+    cfg = st.secrets.get("report_cache", {})
+    return _cached_report_cache(float(cfg.get("max_mb", DEFAULT_MAX_MB)),
+                                cfg.get("spill_dir"),
+                                float(cfg.get("max_disk_mb", DEFAULT_DISK_MB)))
@@ -0,0 +1,64 @@
+"""Report layouts per user type.
+
+Kept free of ReportLab so the app can look up labels and file names without
+loading the PDF stack; report.py does the actual rendering.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+
+from questionnaire import BASIC_FIELDS, REPORT_SECTIONS, SCORE_COLUMNS, SCORE_DIMENSIONS
+
+
+@dataclass(frozen=True)
+class Section:
+    title: str
+    items: tuple          # (label, data key) pairs
+    kind: str = "list"    # "list" of answers, a "table" of requirement statuses or "scores"
+
+
+@dataclass(frozen=True)
+class ReportSpec:
+    user_type: str
+    sections: tuple
+    note: str
+    download_label: str
+    file_prefix: str
+
+    def file_name(self, when=None):
+        when = when or datetime.now()
+        return f"{self.file_prefix}_{when.strftime('%Y%m%d_%H%M%S')}.pdf"
+
+
+def _sections(user_type):
+    # Scores first (see scoring.py), then the answers as laid out in the questionnaire schema
+    scores = Section("Readiness Scores", tuple(zip(SCORE_DIMENSIONS[user_type], SCORE_COLUMNS[user_type])),
+                     kind="scores")
+    return (scores,) + tuple(Section(title, items, kind) for title, items, kind in REPORT_SECTIONS[user_type])
+
+
+REPORTS = {
+    "future": ReportSpec(
+        user_type="future",
+        sections=_sections("future"),
+        note=("<b>Note:</b> This assessment is an introductory guidance for young entrepreneurs. "
+              "Parents/guardians should supervise and support execution of plans."),
+        download_label="⬇️ Download Report (Future Entrepreneur)",
+        file_prefix="Future_Entrepreneur_Report",
+    ),
+    "starter": ReportSpec(
+        user_type="starter",
+        sections=_sections("starter"),
+        note=("<b>Note:</b> This assessment helps you plan initial steps to start your business. "
+              "Consider mentorship and training to improve your readiness."),
+        download_label="⬇️ Download Report (Starter)",
+        file_prefix="Starter_Report",
+    ),
+    "owner": ReportSpec(
+        user_type="owner",
+        sections=_sections("owner"),
+        note=("<b>Note:</b> To proceed further, the firm must ensure that all the listed requirements are fully implemented. "
+              "Once all conditions are satisfied, a verification visit will be conducted by our team to validate completion and compliance."),
+        download_label="⬇️ Download Professional PDF Report",
+        file_prefix="Business_Readiness_Report",
+    ),
+}
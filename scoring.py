@@ -0,0 +1,148 @@
+"""Readiness scores per dimension.
+
+Each scored question maps its options to points and counts towards one
+dimension with a weight (``POINTS`` below). A dimension's score is the weighted
+share of the best possible points, 0-100; questions that only describe the
+respondent (favourite subjects, type of business, ...) are not scored.
+
+The table is checked against the questionnaire schema and compiled at import
+into one lookup per user type: for every scored position in the answer layout,
+the dimension it feeds and its ready-scaled contribution for each option index.
+Scoring a session (``score``) is then one tuple lookup and add per question.
+Stored submissions are scored as a batch with NumPy (``score_batch`` /
+``score_rows``); NumPy is imported on first batch use only.
+"""
+from functools import lru_cache
+
+from questionnaire import (BASIC_FIELDS, LAYOUTS, OPTIONS, OWNER_REQUIREMENTS, ROW_PREFIX,
+                           SCORE_COLUMNS, SCORE_DIMENSIONS)
+
+# question key -> (dimension, weight, points for options 1..n)
+POINTS = {
+    # ---- future: aptitude ----
+    "fe3": ("Future Aptitude", 1.0, (2, 1, 0)),
+    "fe4": ("Future Aptitude", 1.0, (2, 1, 0)),
+    "fe5": ("Future Aptitude", 0.5, (2, 1, 0)),
+    "fe6": ("Future Aptitude", 0.5, (1, 0)),
+    "fe7": ("Future Aptitude", 1.0, (2, 1, 0)),
+    "fe8": ("Future Aptitude", 1.0, (2, 1, 0)),
+
+    # ---- starter: readiness ----
+    "s1": ("Starter Readiness", 1.0, (2, 1, 0)),
+    "s3": ("Starter Readiness", 1.5, (2, 1, 0)),
+    "s4": ("Starter Readiness", 1.0, (2, 1, 0)),
+    "s5": ("Starter Readiness", 1.0, (2, 1, 0)),
+    "s6": ("Starter Readiness", 0.5, (2, 1, 0)),
+    "s7": ("Starter Readiness", 1.0, (2, 1, 0)),
+    "s8": ("Starter Readiness", 1.0, (2, 1, 0)),
+    "s9": ("Starter Readiness", 0.5, (2, 1, 0)),
+    "s10": ("Starter Readiness", 1.0, (2, 1, 0)),
+
+    # ---- owner Stage 2: options run from strongest to weakest ----
+    "family1": ("Family", 1.0, (3, 2, 1, 0)),
+    "family2": ("Family", 1.0, (3, 2, 1, 0)),
+    "family3": ("Family", 1.0, (3, 2, 1, 0)),
+    "physical1": ("Physical", 1.0, (3, 2, 1, 0)),
+    "physical2": ("Physical", 1.0, (3, 2, 1, 0)),
+    "physical3": ("Physical", 0.5, (3, 2, 1, 0)),
+    "mental1": ("Mental", 1.0, (3, 2, 1, 0)),
+    "mental2": ("Mental", 1.0, (3, 2, 1, 0)),
+    "mental3": ("Mental", 1.0, (3, 2, 1, 0)),
+    "social1": ("Social", 1.0, (3, 2, 1, 0)),
+    "social2": ("Social", 1.0, (3, 2, 1, 0)),
+    "social3": ("Social", 1.0, (2, 1, 0)),
+    # income status / source / goal are categories, not a scale
+    "financial1": ("Financial", 1.0, (3, 3, 1, 1, 0)),
+    "financial2": ("Financial", 1.0, (3, 3, 1, 2, 0)),
+    "financial3": ("Financial", 0.5, (1, 3, 3, 1, 3)),
+    "spiritual1": ("Spiritual", 1.0, (3, 2, 1, 0)),
+    "spiritual2": ("Spiritual", 1.0, (3, 2, 1, 0)),
+    "spiritual3": ("Spiritual", 1.0, (3, 2, 1, 0)),
+
+    # ---- owner Stage 3: share of requirements met ----
+    **{key: ("Stage 3 Compliance", 1.0, (1, 0)) for key in OWNER_REQUIREMENTS},
+}
+
+
+def compile_points(points):
+    # user_type -> ((position, dimension index, contribution per option index), ...)
+    lookups = {}
+    for user_type, layout in LAYOUTS.items():
+        dims = SCORE_DIMENSIONS[user_type]
+        totals = [0.0] * len(dims)
+        scored = []
+        for position, key in enumerate(layout):
+            if key not in points:
+                continue
+            dim, weight, option_points = points[key]
+            if dim not in dims:
+                raise ValueError(f"{key!r} scores {dim!r}, which {user_type!r} doesn't have")
+            if len(option_points) != len(OPTIONS[key]) - 1:
+                raise ValueError(f"{key!r} has {len(OPTIONS[key]) - 1} options but "
+                                 f"{len(option_points)} point values")
+            totals[dims.index(dim)] += weight
+            scored.append((position, dims.index(dim), weight, option_points))
+        for dim, total in zip(dims, totals):
+            if not total:
+                raise ValueError(f"no questions score {dim!r} for {user_type!r}")
+        lookups[user_type] = tuple(
+            # Index 0 is the unanswered placeholder and scores nothing
+            (position, d, (0.0,) + tuple(100 * weight * p / max(option_points) / totals[d]
+                                         for p in option_points))
+            for position, d, weight, option_points in scored
+        )
+    return lookups
+
+
+LOOKUPS = compile_points(POINTS)
+
+
+# ---------------- one session ----------------
+def score(answers):
+    # answers is an Answers; returns {"<dimension> Score": 0-100} for its user type
+    if answers.layout is None:
+        return {}
+    totals = [0.0] * len(SCORE_COLUMNS[answers.layout])
+    codes = answers.codes
+    for position, dim, contributions in LOOKUPS[answers.layout]:
+        totals[dim] += contributions[codes[position]]
+    return {column: round(total, 1) for column, total in zip(SCORE_COLUMNS[answers.layout], totals)}
+
+
+# ---------------- many submissions ----------------
+@lru_cache(maxsize=None)
+def _matrices(user_type):
+    # contributions[position, option] and membership[position, dimension]
+    import numpy as np
+    layout = LAYOUTS[user_type]
+    width = max(len(OPTIONS[key]) for key in layout)
+    contributions = np.zeros((len(layout), width))
+    membership = np.zeros((len(layout), len(SCORE_DIMENSIONS[user_type])))
+    for position, dim, values in LOOKUPS[user_type]:
+        contributions[position, :len(values)] = values
+        membership[position, dim] = 1.0
+    return contributions, membership
+
+
+def score_batch(user_type, codes):
+    # codes: (submissions, len(LAYOUTS[user_type])) option indices -> (submissions, dimensions)
+    import numpy as np
+    contributions, membership = _matrices(user_type)
+    codes = np.asarray(codes, dtype=np.intp)
+    return contributions[np.arange(contributions.shape[0]), codes] @ membership
+
+
+def encode_rows(user_type, rows):
+    # Stored rows (SHEET_HEADERS order) -> option index matrix; unknown text counts as unanswered
+    import numpy as np
+    start = len(ROW_PREFIX) + len(BASIC_FIELDS)
+    layout = LAYOUTS[user_type]
+    indices = [{option: i for i, option in enumerate(OPTIONS[key])} for key in layout]
+    codes = np.zeros((len(rows), len(layout)), dtype=np.uint8)
+    for column, index in enumerate(indices):
+        codes[:, column] = [index.get(row[start + column], 0) for row in rows]
+    return codes
+
+
+def score_rows(user_type, rows):
+    return score_batch(user_type, encode_rows(user_type, rows))
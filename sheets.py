@@ -0,0 +1,203 @@
+"""Process-wide Google Sheets connection shared by every session.
+
+Authorizing gspread and opening the spreadsheet costs an OAuth token exchange
+plus a couple of HTTPS round trips, so we do it once per process and keep the
+client/worksheet around. Tokens are refreshed ahead of expiry and the
+connection is rebuilt on auth or transport errors.
+
+Each user type writes to its own worksheet (see questionnaire.WORKSHEETS).
+The worksheet is created with its header row on first use, and an existing
+header is checked once per process so rows never land under the wrong columns.
+
+``health()`` (a cached ``health_check``) backs the ``sheets_ok`` and
+``sheets_token_expires_in`` gauges on the metrics endpoint.
+"""
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import streamlit as st
+
+import gspread
+from google.auth.exceptions import RefreshError, TransportError
+from google.auth.transport.requests import Request
+from google.oauth2.service_account import Credentials
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+
+import metrics
+
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive"
+]
+
+# Refresh the access token this long before Google says it expires
+REFRESH_MARGIN = timedelta(minutes=5)
+
+# Seconds a health_check result is reused by health() (the metrics endpoint reads it per scrape)
+HEALTH_INTERVAL = 30.0
+
+# HTTP statuses that mean our token/connection went bad rather than the request
+_RECONNECT_STATUSES = {401, 403}
+
+_TRANSIENT_ERRORS = (RefreshError, TransportError, RequestsConnectionError, Timeout)
+
+
+class SchemaMismatch(Exception):
+    pass
+
+
+def _utcnow():
+    # google-auth stores expiry as a naive UTC datetime
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class SheetsConnection:
+    def __init__(self, service_account_info, spreadsheet_key):
+        self._info = service_account_info
+        self._spreadsheet_key = spreadsheet_key
+        self._lock = threading.RLock()
+        self._credentials = None
+        self._spreadsheet = None
+        self._worksheet = None
+        self._worksheets = {}
+        self.reconnects = 0
+        self.last_error = None
+        self._health = None
+        self._health_checked = 0.0
+
+    # -------- connection management --------
+    def _connect(self):
+        with metrics.span("sheets_authorize"):
+            credentials = Credentials.from_service_account_info(self._info, scopes=SCOPES)
+            credentials.refresh(Request())
+            client = gspread.authorize(credentials)
+        with metrics.span("sheets_open"):
+            spreadsheet = client.open_by_key(self._spreadsheet_key)
+        self._credentials = credentials
+        self._spreadsheet = spreadsheet
+        self._worksheet = spreadsheet.sheet1
+
+    def _reset(self):
+        self._credentials = None
+        self._spreadsheet = None
+        self._worksheet = None
+        self._worksheets = {}
+
+    def _open_worksheet(self, title, header):
+        # Caller holds the lock and has a live spreadsheet
+        try:
+            ws = self._spreadsheet.worksheet(title)
+        except gspread.exceptions.WorksheetNotFound:
+            ws = self._spreadsheet.add_worksheet(title, rows=1000, cols=len(header))
+            ws.append_row(header)
+        else:
+            existing = ws.row_values(1)
+            if not existing:
+                ws.append_row(header)
+            elif existing != header:
+                raise SchemaMismatch(f"worksheet {title!r} has header {existing}, expected {header}")
+        self._worksheets[title] = ws
+        return ws
+
+    def _ensure_ready(self):
+        with self._lock:
+            if self._worksheet is None:
+                self._connect()
+            elif self._credentials.expiry is not None and \
+                    self._credentials.expiry - _utcnow() < REFRESH_MARGIN:
+                with metrics.span("sheets_token_refresh"):
+                    self._credentials.refresh(Request())
+            return self._worksheet
+
+    def _get_worksheet(self, title=None, header=None):
+        with self._lock:
+            ws = self._ensure_ready()
+            if title is None:
+                return ws
+            return self._worksheets.get(title) or self._open_worksheet(title, header)
+
+    def _call(self, op, fn, title=None, header=None):
+        # Run fn(worksheet), reconnecting once if the failure looks like auth/transport
+        for attempt in range(2):
+            try:
+                ws = self._get_worksheet(title, header)
+                with metrics.span("sheets_call", op=op):
+                    return fn(ws)
+            except gspread.exceptions.APIError as e:
+                status = getattr(e.response, "status_code", None)
+                metrics.inc("sheets_errors", type="APIError", status=status)
+                if attempt or status not in _RECONNECT_STATUSES:
+                    self.last_error = repr(e)
+                    raise
+            except _TRANSIENT_ERRORS as e:
+                metrics.inc("sheets_errors", type=type(e).__name__, status="")
+                if attempt:
+                    self.last_error = repr(e)
+                    raise
+            metrics.inc("sheets_reconnects")
+            with self._lock:
+                self._reset()
+                self.reconnects += 1
+
+    # -------- public API --------
+    @property
+    def worksheet(self):
+        return self._ensure_ready()
+
+    def append_row(self, row, title=None, header=None):
+        return self._call("append_row", lambda ws: ws.append_row(row), title, header)
+
+    def append_rows(self, rows, title=None, header=None):
+        # title=None is the legacy sheet1 layout
+        return self._call("append_rows", lambda ws: ws.append_rows(rows), title, header)
+
+    def row_count(self, title, header):
+        # Data rows below the header (every row when header is None), from one fetch of column A
+        below = 0 if header is None else 1
+        return max(0, self._call("row_count", lambda ws: len(ws.col_values(1)) - below, title, header))
+
+    def read_rows(self, title, header, first_row, last_row):
+        # One ranged fetch of whole rows; with no header, every column of the rows
+        if header is None:
+            cells = f"{first_row}:{last_row}"
+        else:
+            last_col = gspread.utils.rowcol_to_a1(1, len(header)).rstrip("0123456789")
+            cells = f"A{first_row}:{last_col}{last_row}"
+        return self._call("read_rows", lambda ws: ws.get(cells), title, header)
+
+    def health_check(self):
+        # Cheap metadata read: proves the token works and the sheet is reachable
+        try:
+            self._call("health_check", lambda ws: ws.spreadsheet.fetch_sheet_metadata())
+        except Exception as e:
+            return {"ok": False, "error": str(e), "reconnects": self.reconnects}
+        expiry = self._credentials.expiry if self._credentials else None
+        return {
+            "ok": True,
+            "token_expires_in": (expiry - _utcnow()).total_seconds() if expiry else None,
+            "reconnects": self.reconnects,
+        }
+
+    def health(self, max_age=HEALTH_INTERVAL):
+        # health_check() at most once per max_age seconds
+        now = time.monotonic()
+        if self._health is None or now - self._health_checked >= max_age:
+            self._health = self.health_check()
+            self._health_checked = now
+        return self._health
+
+
+@st.cache_resource(show_spinner=False)
+def _cached_connection(service_account_json, spreadsheet_key):
+    connection = SheetsConnection(json.loads(service_account_json), spreadsheet_key)
+    # sheets_ok (0/1), sheets_token_expires_in (seconds), sheets_reconnects_total
+    metrics.watch_stats("sheets", connection.health, counters=("reconnects",), gauges=("ok", "token_expires_in"))
+    return connection
+
+
+def get_connection():
+    # Cached on the secret values so a rotated key gets a fresh connection
+    return _cached_connection(st.secrets["gcp"]["service_account"],
+                              st.secrets["gcp"]["spreadsheet_key"])
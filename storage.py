@@ -0,0 +1,355 @@
+"""Storage backends for submitted rows.
+
+The submission queue writes through ``get_storage()``, which returns one of:
+
+* ``sheets``  - the Google spreadsheet (default; see sheets.py)
+* ``sqlite``  - a local SQLite file, one table per worksheet, indexed on the
+  Stage 1 fields
+* ``csv`` / ``parquet`` - an append-only log directory, one file (CSV) or one
+  part file per batch (Parquet, needs pyarrow) per worksheet
+* ``fake``    - in-process stand-in for the Sheets API with configurable
+  latency and quota errors, for load tests and CI
+
+Every backend takes rows in the fixed per-worksheet column order from
+questionnaire.SHEET_HEADERS and can page them back with ``read_rows``. Rows of
+the pre-versioned first worksheet (``LEGACY_SHEET``) have no fixed layout; they
+are read back as lists of text cells, from the worksheet's first row.
+The backend is picked with the ``[storage]`` table in ``st.secrets``, e.g.::
+
+    [storage]
+    backend = "sqlite"
+    path = "data/submissions.db"
+"""
+import abc
+import csv
+import itertools
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+
+from questionnaire import SHEET_HEADERS
+
+LEGACY_SHEET = ""   # rows spooled before per-user-type worksheets
+INDEXED_COLUMNS = ("Registration Code", "KK Number", "Timestamp")
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+class Storage(abc.ABC):
+    # A backend missing one of these fails when it is created, not on its first read
+    name = "base"
+
+    @abc.abstractmethod
+    def append_rows(self, sheet, rows):
+        pass
+
+    @abc.abstractmethod
+    def read_rows(self, sheet, start=0, limit=None):
+        # Data rows (no header) from 0-based offset start
+        pass
+
+    @abc.abstractmethod
+    def row_count(self, sheet):
+        pass
+
+
+# ---------------- Google Sheets ----------------
+class SheetsStorage(Storage):
+    name = "sheets"
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def append_rows(self, sheet, rows):
+        if sheet == LEGACY_SHEET:
+            self._connection.append_rows(rows)
+        else:
+            self._connection.append_rows(rows, sheet, SHEET_HEADERS[sheet])
+
+    def row_count(self, sheet):
+        if sheet == LEGACY_SHEET:
+            return self._connection.row_count(None, None)
+        return self._connection.row_count(sheet, SHEET_HEADERS[sheet])
+
+    def read_rows(self, sheet, start=0, limit=None):
+        if limit is None:
+            limit = self.row_count(sheet) - start
+        if limit <= 0:
+            return []
+        if sheet == LEGACY_SHEET:
+            # sheet1 has no header we know of: its rows from the first
+            return self._connection.read_rows(None, None, start + 1, start + limit)
+        header = SHEET_HEADERS[sheet]
+        rows = self._connection.read_rows(sheet, header, start + 2, start + 1 + limit)
+        # The API drops trailing empty cells; pad back to the header width
+        return [row + [""] * (len(header) - len(row)) for row in rows]
+
+
+# ---------------- SQLite ----------------
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SQLiteStorage(Storage):
+    name = "sqlite"
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+        self._ready = set()
+
+    def _table(self, sheet):
+        table = sheet or "legacy"
+        if table in self._ready:
+            return table
+        header = SHEET_HEADERS.get(sheet)
+        if header is None:
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS {_quote(table)} (row TEXT NOT NULL)")
+        else:
+            cols = ", ".join(f"{_quote(c)} TEXT" for c in header)
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS {_quote(table)} ({cols})")
+            for col in INDEXED_COLUMNS:
+                self._db.execute(f"CREATE INDEX IF NOT EXISTS {_quote(f'{table}_{col}')} "
+                                 f"ON {_quote(table)} ({_quote(col)})")
+        self._ready.add(table)
+        return table
+
+    def append_rows(self, sheet, rows):
+        with self._lock:
+            table = self._table(sheet)
+            header = SHEET_HEADERS.get(sheet)
+            if header is None:
+                params = [(json.dumps(r),) for r in rows]
+                sql = f"INSERT INTO {_quote(table)} (row) VALUES (?)"
+            else:
+                params = [[str(v) for v in r] for r in rows]
+                sql = f"INSERT INTO {_quote(table)} VALUES ({', '.join('?' * len(header))})"
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(sql, params)
+                self._db.execute("COMMIT")
+            except BaseException:
+                # Leave the shared connection usable for the other worksheets
+                self._db.execute("ROLLBACK")
+                raise
+
+    def row_count(self, sheet):
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM {_quote(self._table(sheet))}").fetchone()[0]
+
+    def read_rows(self, sheet, start=0, limit=None):
+        # Tables are append-only, so the n-th row has rowid n + 1: seek on the
+        # rowid rather than OFFSET, which would step over every earlier row
+        with self._lock:
+            cur = self._db.execute(
+                f"SELECT * FROM {_quote(self._table(sheet))} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (start, -1 if limit is None else limit))
+            if sheet not in SHEET_HEADERS:
+                return [[str(v) for v in json.loads(r[0])] for r in cur.fetchall()]
+            return [list(r) for r in cur.fetchall()]
+
+
+# ---------------- append-only logs ----------------
+class CsvLogStorage(Storage):
+    name = "csv"
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self._dir = directory
+        self._lock = threading.Lock()
+        self._resume = {}   # sheet -> (rows read, file position after them) of the last read
+
+    def _path(self, sheet):
+        return os.path.join(self._dir, f"{sheet or 'legacy'}.csv")
+
+    def append_rows(self, sheet, rows):
+        path = self._path(sheet)
+        with self._lock:
+            new = not os.path.exists(path)
+            with open(path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                if new and sheet in SHEET_HEADERS:
+                    writer.writerow(SHEET_HEADERS[sheet])
+                writer.writerows(rows)
+
+    def _iter_rows(self, sheet, start=0):
+        # Rows from start on. A read that starts where the previous one stopped
+        # (the admin dashboard's cursor) seeks there instead of re-parsing the file.
+        path = self._path(sheet)
+        if not os.path.exists(path):
+            return
+        with open(path, newline="", encoding="utf-8") as f:
+            index, position = self._resume.get(sheet, (0, None))
+            if position is not None and index <= start:
+                f.seek(position)
+            else:
+                index = 0
+            # readline rather than iterating the file, which would disable tell()
+            reader = csv.reader(iter(f.readline, ""))
+            if index == 0 and sheet in SHEET_HEADERS:
+                next(reader, None)
+            for row in reader:
+                index += 1
+                self._resume[sheet] = (index, f.tell())
+                if index > start:
+                    yield row
+
+    def row_count(self, sheet):
+        with self._lock:
+            return sum(1 for _ in self._iter_rows(sheet))
+
+    def read_rows(self, sheet, start=0, limit=None):
+        with self._lock:
+            return list(itertools.islice(self._iter_rows(sheet, start), limit))
+
+
+class ParquetLogStorage(Storage):
+    name = "parquet"
+
+    def __init__(self, directory):
+        import pyarrow  # noqa: F401 - optional dependency, fail at startup not on first flush
+        os.makedirs(directory, exist_ok=True)
+        self._dir = directory
+        self._lock = threading.Lock()
+        self._seq = 0
+
+    def _sheet_dir(self, sheet):
+        return os.path.join(self._dir, sheet or "legacy")
+
+    def append_rows(self, sheet, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        header = SHEET_HEADERS.get(sheet, ["row"])
+        if sheet not in SHEET_HEADERS:
+            rows = [[json.dumps(r)] for r in rows]
+        columns = {name: [str(r[i]) if i < len(r) else "" for r in rows] for i, name in enumerate(header)}
+        with self._lock:
+            self._seq += 1
+            part = f"part-{time.time_ns()}-{self._seq:06d}.parquet"
+            os.makedirs(self._sheet_dir(sheet), exist_ok=True)
+            pq.write_table(pa.table(columns), os.path.join(self._sheet_dir(sheet), part))
+
+    def _parts(self, sheet):
+        d = self._sheet_dir(sheet)
+        return sorted(os.path.join(d, n) for n in os.listdir(d)) if os.path.isdir(d) else []
+
+    def row_count(self, sheet):
+        import pyarrow.parquet as pq
+        return sum(pq.ParquetFile(p).metadata.num_rows for p in self._parts(sheet))
+
+    def read_rows(self, sheet, start=0, limit=None):
+        import pyarrow.parquet as pq
+        rows = []
+        offset = 0
+        for path in self._parts(sheet):
+            n = pq.ParquetFile(path).metadata.num_rows
+            if offset + n <= start:
+                offset += n
+                continue
+            table = pq.read_table(path)
+            columns = [table.column(i).to_pylist() for i in range(table.num_columns)]
+            if sheet in SHEET_HEADERS:
+                part_rows = map(list, zip(*columns))
+            else:
+                part_rows = ([str(v) for v in json.loads(value)] for value in columns[0])
+            for row in part_rows:
+                if offset >= start and (limit is None or len(rows) < limit):
+                    rows.append(row)
+                offset += 1
+            if limit is not None and len(rows) >= limit:
+                break
+        return rows
+
+
+# ---------------- in-process Sheets stand-in ----------------
+class FakeSheetsStorage(Storage):
+    """Mimics append_row/append_rows latency and the per-minute write quota."""
+    name = "fake"
+
+    def __init__(self, latency=0.3, jitter=0.1, quota_per_minute=60, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.quota_per_minute = quota_per_minute
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._calls = deque()
+        self._sheets = {}
+        self._lock = threading.Lock()
+        self.quota_errors = 0
+
+    def _request(self):
+        with self._lock:
+            now = time.monotonic()
+            while self._calls and now - self._calls[0] > 60:
+                self._calls.popleft()
+            if self.quota_per_minute and len(self._calls) >= self.quota_per_minute:
+                self.quota_errors += 1
+                raise QuotaExceeded("429: Quota exceeded for 'Write requests per minute per user'")
+            self._calls.append(now)
+            fail = self._random.random() < self.error_rate
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+        time.sleep(delay)
+        if fail:
+            raise ConnectionError("simulated transport error")
+
+    def append_row(self, sheet, row):
+        self.append_rows(sheet, [row])
+
+    def append_rows(self, sheet, rows):
+        self._request()
+        with self._lock:
+            self._sheets.setdefault(sheet, []).extend(list(r) for r in rows)
+
+    def row_count(self, sheet):
+        with self._lock:
+            return len(self._sheets.get(sheet, []))
+
+    def read_rows(self, sheet, start=0, limit=None):
+        self._request()
+        with self._lock:
+            rows = self._sheets.get(sheet, [])
+            return [list(r) for r in rows[start:None if limit is None else start + limit]]
+
+
+def make_storage(cfg):
+    backend = cfg.get("backend", "sheets")
+    if backend == "sheets":
+        from sheets import get_connection
+        return SheetsStorage(get_connection())
+    if backend == "sqlite":
+        return SQLiteStorage(cfg.get("path", os.path.join("data", "submissions.db")))
+    if backend == "csv":
+        return CsvLogStorage(cfg.get("path", os.path.join("data", "csv")))
+    if backend == "parquet":
+        return ParquetLogStorage(cfg.get("path", os.path.join("data", "parquet")))
+    if backend == "fake":
+        return FakeSheetsStorage(latency=float(cfg.get("latency", 0.3)),
+                                 jitter=float(cfg.get("jitter", 0.1)),
+                                 quota_per_minute=int(cfg.get("quota_per_minute", 60)),
+                                 error_rate=float(cfg.get("error_rate", 0.0)))
+    raise ValueError(f"unknown storage backend {backend!r}")
+
+
+@st.cache_resource(show_spinner=False)
+def _cached_storage(cfg_items):
+    return make_storage(dict(cfg_items))
+
+
+def storage_config():
+    # Hashable snapshot of the [storage] secret; read it on a script thread
+    return tuple(sorted(dict(st.secrets.get("storage", {})).items()))
+
+
+def get_storage(config=None):
+    return _cached_storage(storage_config() if config is None else config)
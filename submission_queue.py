@@ -0,0 +1,262 @@
+"""Write-behind queue between the app and the storage backend (see storage.py).
+
+Finished assessments are first written to a local SQLite spool (WAL mode,
+synchronous=FULL), so the submit click returns as soon as the row is durable on
+disk, power loss included. A single
+background thread drains the spool in batches with one ``append_rows`` call
+per batch and worksheet. Rows are only removed from the spool after the backend
+accepts them, so a crash, restart or quota error never loses a submission;
+anything left in the spool is replayed when the queue starts again.
+
+Rows can carry an idempotency key (the app uses the assessment's content
+hash). The spool remembers keys for ``KEY_TTL`` seconds and ``enqueue`` drops
+a row whose key it has already seen, so a double-clicked submit or a rerun
+that repeats the save never writes the same assessment twice.
+
+Each worksheet drains on its own. A worksheet whose flush fails backs off
+(1 s doubling to ``MAX_BACKOFF``) while the others keep draining, and is listed
+in ``stats()["stuck"]`` until a flush succeeds. The spool depth and the stuck
+worksheets and rows are exported through metrics.py as ``queue_depth``,
+``queue_stuck_worksheets`` and ``queue_stuck_rows``.
+
+There is one queue per spool file. The storage backend is looked up on every
+flush from the ``[storage]`` secrets of the latest script run, so editing the
+secrets redirects the running queue rather than starting a second writer that
+would drain the same spool and store its rows twice.
+"""
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+
+import metrics
+
+DEFAULT_SPOOL_PATH = os.path.join(".spool", "submissions.db")
+MAX_BATCH = 50         # rows per append_rows call
+MAX_WAIT = 1.0         # seconds a row may wait for a batch to fill
+MAX_BACKOFF = 60.0     # seconds between retries of a worksheet whose flushes fail
+KEY_TTL = 7 * 24 * 3600  # seconds an idempotency key is remembered
+
+
+class SubmissionQueue:
+    def __init__(self, flush_fn, spool_path=DEFAULT_SPOOL_PATH,
+                 max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        self._flush_fn = flush_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        if os.path.dirname(spool_path):
+            os.makedirs(os.path.dirname(spool_path), exist_ok=True)
+        self._db = sqlite3.connect(spool_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pending ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " row TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " sheet TEXT NOT NULL DEFAULT '')"
+        )
+        columns = [r[1] for r in self._db.execute("PRAGMA table_info(pending)")]
+        if "sheet" not in columns:
+            # Spools written before per-user-type worksheets: '' means sheet1
+            self._db.execute("ALTER TABLE pending ADD COLUMN sheet TEXT NOT NULL DEFAULT ''")
+        self._db.execute("CREATE TABLE IF NOT EXISTS submitted (key TEXT PRIMARY KEY, created REAL NOT NULL)")
+        self._db.execute("DELETE FROM submitted WHERE created < ?", (time.time() - KEY_TTL,))
+        self._db_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+        self._depth = self._db.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+        self.flushed = 0
+        self.failures = 0
+        self.duplicates = 0
+        self.last_error = None
+        self._blocked = {}   # worksheet -> backoff state while its flushes fail
+        self.last_flush_latency = None
+        self._latency_total = 0.0
+        self._flush_count = 0
+
+        self._thread = threading.Thread(target=self._run, name="submission-writer", daemon=True)
+        self._thread.start()
+        if self._depth:
+            # Replay whatever a previous process left behind
+            self._wake.set()
+
+    # -------- producer side --------
+    def enqueue(self, row, sheet="", key=None):
+        # Returns False, spooling nothing, if a row with this key was already enqueued
+        now = time.time()
+        with self._db_lock:
+            self._db.execute("BEGIN")
+            try:
+                if key is not None and not self._db.execute(
+                        "INSERT OR IGNORE INTO submitted (key, created) VALUES (?, ?)", (key, now)).rowcount:
+                    self._db.execute("ROLLBACK")
+                    self.duplicates += 1
+                    metrics.inc("queue_duplicates")
+                    return False
+                self._db.execute("INSERT INTO pending (row, created, sheet) VALUES (?, ?, ?)",
+                                 (json.dumps(row), now, sheet))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._depth += 1
+            full = self._depth >= self.max_batch
+        if full:
+            self._wake.set()
+        return True
+
+    # -------- consumer side --------
+    def _pending_sheets(self):
+        # Worksheets with spooled rows, the one holding the oldest row first
+        with self._db_lock:
+            return [r[0] for r in self._db.execute(
+                "SELECT sheet FROM pending GROUP BY sheet ORDER BY MIN(id)")]
+
+    def _take_batch(self, sheet):
+        # Oldest pending rows of one worksheet
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT id, row FROM pending WHERE sheet = ? ORDER BY id LIMIT ?", (sheet, self.max_batch)
+            ).fetchall()
+        return [r[0] for r in rows], [json.loads(r[1]) for r in rows]
+
+    def _ack(self, ids):
+        with self._db_lock:
+            self._db.executemany("DELETE FROM pending WHERE id = ?", [(i,) for i in ids])
+            self._depth -= len(ids)
+
+    def flush(self):
+        # Drain the spool now, retrying worksheets that are backing off;
+        # returns False if any worksheet failed (its rows stay spooled)
+        with self._flush_lock:
+            return self._drain(retry_blocked=True)
+
+    def _drain(self, retry_blocked=False):
+        # Each worksheet drains on its own: a worksheet that keeps failing (a
+        # header edited by hand, a missing sheet) backs off without holding up
+        # rows for the others
+        ok = True
+        now = time.monotonic()
+        for sheet in self._pending_sheets():
+            blocked = self._blocked.get(sheet)
+            if blocked and not retry_blocked and now < blocked["retry_at"]:
+                ok = False
+                continue
+            ok = self._drain_sheet(sheet) and ok
+        return ok
+
+    def _drain_sheet(self, sheet):
+        while True:
+            ids, rows = self._take_batch(sheet)
+            if not ids:
+                self._blocked.pop(sheet, None)
+                return True
+            started = time.perf_counter()
+            try:
+                self._flush_fn(sheet, rows)
+            except Exception as e:
+                self._fail(sheet, e)
+                return False
+            latency = time.perf_counter() - started
+            metrics.observe("queue_flush_seconds", latency, sheet=sheet)
+            metrics.inc("queue_rows_flushed", len(ids))
+            self._ack(ids)
+            self._blocked.pop(sheet, None)
+            self.flushed += len(ids)
+            self.last_flush_latency = latency
+            self._latency_total += latency
+            self._flush_count += 1
+
+    def _fail(self, sheet, error):
+        self.failures += 1
+        self.last_error = repr(error)
+        metrics.inc("queue_flush_errors", type=type(error).__name__, sheet=sheet)
+        blocked = self._blocked.get(sheet)
+        backoff = min(MAX_BACKOFF, blocked["backoff"] * 2) if blocked else 1.0
+        self._blocked[sheet] = {
+            "backoff": backoff,
+            "retry_at": time.monotonic() + backoff,
+            "failures": (blocked["failures"] if blocked else 0) + 1,
+            "last_error": repr(error),
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(timeout=self.max_wait)
+            self._wake.clear()
+            if self._depth == 0:
+                continue
+            with self._flush_lock:
+                self._drain()
+
+    def close(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self.flush()
+        self._db.close()
+
+    # -------- introspection --------
+    @property
+    def depth(self):
+        return self._depth
+
+    def stuck(self):
+        # {worksheet: {"rows", "failures", "last_error", "retry_in"}} for worksheets whose last flush failed
+        with self._db_lock:
+            counts = dict(self._db.execute("SELECT sheet, COUNT(*) FROM pending GROUP BY sheet"))
+        now = time.monotonic()
+        return {sheet: {"rows": counts.get(sheet, 0), "failures": b["failures"], "last_error": b["last_error"],
+                        "retry_in": max(0.0, b["retry_at"] - now)}
+                for sheet, b in list(self._blocked.items())}
+
+    def stats(self):
+        stuck = self.stuck()
+        return {
+            "depth": self._depth,
+            "stuck_worksheets": len(stuck),
+            "stuck_rows": sum(s["rows"] for s in stuck.values()),
+            "stuck": stuck,
+            "flushed": self.flushed,
+            "failures": self.failures,
+            "duplicates": self.duplicates,
+            "last_error": self.last_error,
+            "last_flush_latency": self.last_flush_latency,
+            "avg_flush_latency": (self._latency_total / self._flush_count) if self._flush_count else None,
+        }
+
+
+_storage_configs = {}   # spool path -> storage config of the latest script run
+
+
+def _append_to_storage(spool_path, sheet, rows):
+    # Resolved per flush so a broken backend only delays the spool and a
+    # secrets edit takes effect on the next flush. The backend (gspread for
+    # Sheets) is built on the writer thread, not at startup.
+    from storage import get_storage
+    get_storage(_storage_configs[spool_path]).append_rows(sheet, rows)
+
+
+@st.cache_resource(show_spinner=False)
+def _cached_queue(spool_path):
+    queue = SubmissionQueue(functools.partial(_append_to_storage, spool_path), spool_path=spool_path)
+    metrics.watch_stats("queue", queue.stats, gauges=("depth", "stuck_worksheets", "stuck_rows"))
+    return queue
+
+
+def get_queue():
+    from storage import storage_config
+
+    spool_path = st.secrets.get("queue", {}).get("spool_path", DEFAULT_SPOOL_PATH)
+    # The writer thread runs outside any script run, so the config is captured
+    # here; set before the queue starts, which may replay spooled rows at once
+    _storage_configs[spool_path] = storage_config()
+    return _cached_queue(spool_path)
@@ -0,0 +1,66 @@
+import pytest
+
+from answers import Answers
+from questionnaire import BASIC_QUESTIONS, LAYOUTS, OPTIONS
+
+
+def filled(user_type, code="AB-12", pick=-1):
+    answers = Answers()
+    answers["Registration Code"] = code
+    answers.update({q.key: q.options[pick] for q in BASIC_QUESTIONS})
+    answers.update({key: OPTIONS[key][pick] for key in LAYOUTS[user_type]})
+    return answers
+
+
+@pytest.mark.parametrize("user_type", sorted(LAYOUTS))
+def test_pack_round_trip(user_type):
+    answers = filled(user_type)
+    restored = Answers.unpack(answers.pack())
+    assert restored.layout == user_type
+    assert restored.to_dict() == answers.to_dict()
+    assert restored.pack() == answers.pack()
+
+
+def test_unicode_registration_code():
+    answers = filled("future", code="क-१२ · ü")
+    assert Answers.unpack(answers.pack()).registration_code == "क-१२ · ü"
+
+
+def test_empty():
+    answers = Answers()
+    restored = Answers.unpack(answers.pack())
+    assert restored.layout is None
+    assert restored.to_dict() == {}
+
+
+def test_stage1_only():
+    answers = Answers()
+    answers.update({"Registration Code": "X1", "Age Group": "31–40", "Gender": "Other", "KK Number": "6"})
+    restored = Answers.unpack(answers.pack())
+    assert restored.to_dict() == {"Registration Code": "X1", "Age Group": "31–40", "Gender": "Other",
+                                  "KK Number": "6"}
+
+
+def test_unanswered_questions_stay_unanswered():
+    answers = Answers()
+    answers.set_codes({"s1": 1, "s2": 0})
+    restored = Answers.unpack(answers.pack())
+    assert restored.get("s1") == OPTIONS["s1"][1]
+    assert restored.get("s2") is None
+
+
+def test_switching_user_type_starts_a_fresh_layout():
+    answers = filled("starter")
+    answers.set_codes({"fe1": 2})
+    assert answers.layout == "future"
+    assert answers.get("s1") is None
+    assert Answers.unpack(answers.pack()).to_dict() == {**{q.key: q.options[-1] for q in BASIC_QUESTIONS},
+                                                        "Registration Code": "AB-12", "fe1": OPTIONS["fe1"][2]}
+
+
+def test_pack_is_canonical():
+    # report_cache keys on pack(): the same answers in any order give the same bytes
+    a, b = Answers(), Answers()
+    a.update({"Gender": "Male", "s1": "No idea yet", "s2": "Other"})
+    b.update({"s2": "Other", "s1": "No idea yet", "Gender": "Male"})
+    assert a.pack() == b.pack()
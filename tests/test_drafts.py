@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+import drafts
+from answers import Answers
+from drafts import DraftStore
+from questionnaire import BASIC_QUESTIONS, LAYOUTS, OPTIONS
+
+
+def filled(user_type, code="AB-12"):
+    answers = Answers()
+    answers["Registration Code"] = code
+    answers.update({q.key: q.options[1] for q in BASIC_QUESTIONS})
+    answers.update({key: OPTIONS[key][1] for key in LAYOUTS[user_type]})
+    return answers
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # drafts.time.time, moved by hand
+    now = [time.time()]
+    monkeypatch.setattr(drafts.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DraftStore(str(tmp_path / "drafts.db"), ttl=3600)
+
+
+@pytest.mark.parametrize("user_type", sorted(LAYOUTS))
+def test_save_load_round_trip(store, user_type):
+    answers = filled(user_type)
+    token = store.save(None, 3, user_type, answers)
+    stage, loaded_type, loaded = store.load(token)
+    assert (stage, loaded_type) == (3, user_type)
+    assert type(stage) is int
+    assert loaded.to_dict() == answers.to_dict()
+
+
+def test_stage_one_and_a_half_survives(store):
+    # Stage 1.5 (the "own a business?" question) is stored as a REAL; whole stages come back as ints
+    token = store.save(None, 1.5, None, filled("owner"))
+    stage, user_type, _ = store.load(token)
+    assert stage == 1.5 and type(stage) is float
+    assert user_type is None
+
+
+def test_saving_under_a_token_replaces_the_draft(store):
+    token = store.save(None, 1, None, Answers())
+    assert store.save(token, 2, "starter", filled("starter")) == token
+    assert store.load(token)[:2] == (2, "starter")
+    assert store.stats()["live"] == 1
+    store.delete(token)
+    assert store.load(token) is None
+
+
+def test_unknown_token(store):
+    assert store.load("nope") is None
+
+
+def test_drafts_expire_after_ttl(tmp_path, clock):
+    store = DraftStore(str(tmp_path / "drafts.db"), ttl=60)
+    token = store.save(None, 2, "future", filled("future"))
+    clock[0] += 59
+    assert store.load(token) is not None
+    clock[0] += 2
+    assert store.load(token) is None
+    assert store.stats()["live"] == 0
+
+    # The next save after PURGE_INTERVAL deletes the expired row
+    clock[0] += drafts.PURGE_INTERVAL
+    store.save(None, 1, None, Answers())
+    assert store.stats()["expired"] == 1
+
+
+def test_drafts_survive_restart(tmp_path):
+    path = str(tmp_path / "drafts.db")
+    token = DraftStore(path, ttl=3600).save(None, 1.5, None, filled("starter"))
+    assert DraftStore(path, ttl=3600).load(token)[0] == 1.5
@@ -0,0 +1,151 @@
+import csv
+
+import pytest
+
+import storage
+from storage import LEGACY_SHEET
+from analytics import Aggregates
+from answers import Answers
+from batch_reports import submissions
+from export import export
+from history import LEGACY_LAYOUTS, legacy_user_type, upgrade_legacy
+from questionnaire import (LAYOUTS, OPTIONS, RECOMMENDATIONS_COLUMN, SCHEMA_VERSION, SCORE_COLUMNS, SHEET_HEADERS,
+                           WORKSHEETS)
+from recommendations import recommend, summary
+from scoring import score
+
+
+def answers_of(user_type, pick):
+    return {key: OPTIONS[key][pick] for key in LAYOUTS[user_type]}
+
+
+def stored_row(user_type, code, pick=-1, kk="3"):
+    # A row as the app saves it
+    answers = answers_of(user_type, pick)
+    session = Answers()
+    session.update(answers)
+    derived = {**score(session), RECOMMENDATIONS_COLUMN: summary(recommend(user_type, answers))}
+    values = {"Timestamp": "2025-01-01 10:00:00", "Schema Version": SCHEMA_VERSION, "Registration Code": code,
+              "Age Group": "31–40", "Gender": "Female", "KK Number": kk, **answers, **derived}
+    return [str(values[column]) for column in SHEET_HEADERS[WORKSHEETS[user_type]]]
+
+
+# ---------------- sheet1 ----------------
+def legacy_row(user_type, code, pick=-1):
+    # What the original app appended to sheet1: answers in alphabetical key order
+    answers = answers_of(user_type, pick)
+    return (["2024-06-01 09:30:00", code, "Below 18" if user_type == "future" else "41–50", "Male", "2"]
+            + [answers[key] for key in sorted(answers)])
+
+
+@pytest.mark.parametrize("user_type", sorted(LAYOUTS))
+def test_legacy_rows_are_placed_by_their_answers(user_type):
+    row = legacy_row(user_type, "L-1")
+    assert legacy_user_type(row) == user_type
+    placed_type, placed = upgrade_legacy(row)
+    expected = stored_row(user_type, "L-1")
+    data = dict(zip(SHEET_HEADERS[WORKSHEETS[user_type]], placed))
+    assert placed_type == user_type
+    assert data["Schema Version"] == "0"
+    assert data["Timestamp"] == "2024-06-01 09:30:00"
+    assert all(data[key] == answers_of(user_type, -1)[key] for key in LAYOUTS[user_type])
+    assert placed[len(expected) - len(SCORE_COLUMNS[user_type]) - 1:] == \
+        expected[len(expected) - len(SCORE_COLUMNS[user_type]) - 1:]
+
+
+def test_legacy_rows_that_fit_no_user_type():
+    header = ["Timestamp", "Registration Code", "Age Group", "Gender", "KK Number"] + list(LEGACY_LAYOUTS["starter"])
+    assert legacy_user_type(header) is None
+    assert upgrade_legacy(legacy_row("starter", "L-1")[:-1]) is None
+    mixed = legacy_row("starter", "L-1")
+    mixed[-1] = "Math/Science"
+    assert upgrade_legacy(mixed) is None
+
+
+def test_export_includes_sheet1(tmp_path):
+    backend = storage.SQLiteStorage(str(tmp_path / "rows.db"))
+    backend.append_rows(LEGACY_SHEET, [["Timestamp", "Registration Code"], legacy_row("future", "L-1"),
+                                       legacy_row("owner", "L-2"), legacy_row("future", "L-3")])
+    backend.append_rows(WORKSHEETS["future"], [stored_row("future", "N-1")])
+    results, unplaced = export(backend, "csv", str(tmp_path / "out"), ["future"])
+    assert unplaced == 1
+    assert [(r["sheet"], r["rows"]) for r in results] == [("sheet1", 2), (WORKSHEETS["future"], 1)]
+    with open(tmp_path / "out" / f"{WORKSHEETS['future']}.csv", newline="", encoding="utf-8") as f:
+        header, *rows = list(csv.reader(f))
+    assert [(row[1], row[2]) for row in rows] == [("0", "L-1"), ("0", "L-3"), (str(SCHEMA_VERSION), "N-1")]
+
+
+def test_dashboard_counts_sheet1(tmp_path):
+    backend = storage.SQLiteStorage(str(tmp_path / "rows.db"))
+    backend.append_rows(LEGACY_SHEET, [["Timestamp", "Registration Code"], legacy_row("owner", "L-1", pick=1),
+                                       legacy_row("future", "L-2")])
+    backend.append_rows(WORKSHEETS["owner"], [stored_row("owner", "N-1", pick=1)])
+    aggregates = Aggregates(backend, page_size=2)
+    assert aggregates.refresh() == 4
+    assert aggregates.stats()["unplaced"] == 1
+    assert aggregates.counts("KK Number") == {"2": {"future": 1, "starter": 0, "owner": 1},
+                                              "3": {"future": 0, "starter": 0, "owner": 1}}
+    assert aggregates.compliance("User Type")["owner"]["Fire Safety"] == 1.0
+    # sheet1 saved no scores: the dashboard's come from the answers
+    means = aggregates.mean_scores("owner", by="User Type")["owner"]
+    assert means["Stage 3 Compliance Score"] == 100.0
+
+    backend.append_rows(LEGACY_SHEET, [legacy_row("starter", "L-3")])
+    assert aggregates.refresh() == 1   # only past the sheet1 cursor
+    assert aggregates.counts("User Type")["starter"]["starter"] == 1
+
+
+class CountingStorage(storage.SQLiteStorage):
+    def __init__(self, path):
+        super().__init__(path)
+        self.reads = {}
+
+    def read_rows(self, sheet, start=0, limit=None):
+        self.reads[sheet] = self.reads.get(sheet, 0) + 1
+        return super().read_rows(sheet, start, limit)
+
+
+@pytest.fixture
+def mixed(tmp_path):
+    backend = CountingStorage(str(tmp_path / "rows.db"))
+    order = ["owner", "future", "starter", "future", "owner"]
+    backend.append_rows(LEGACY_SHEET, [legacy_row(user_type, f"L-{i}") for i, user_type in enumerate(order)])
+    for user_type in LAYOUTS:
+        backend.append_rows(WORKSHEETS[user_type], [stored_row(user_type, f"N-{user_type}")])
+    return backend
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "xlsx"])
+def test_sheet1_is_read_once(mixed, tmp_path, fmt):
+    if fmt != "csv":
+        pytest.importorskip("pyarrow" if fmt == "parquet" else "openpyxl")
+    results, unplaced = export(mixed, fmt, str(tmp_path / "out"), page_size=2)
+    assert mixed.reads[LEGACY_SHEET] == 3   # 5 rows in pages of 2
+    assert [(r["sheet"], r["rows"]) for r in results] == [("sheet1", 5)] + [(WORKSHEETS[t], 1) for t in LAYOUTS]
+
+    codes = {}
+    if fmt == "csv":
+        for user_type in LAYOUTS:
+            with open(tmp_path / "out" / f"{WORKSHEETS[user_type]}.csv", newline="", encoding="utf-8") as f:
+                codes[user_type] = [row[2] for row in list(csv.reader(f))[1:]]
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+        for user_type in LAYOUTS:
+            table = pq.read_table(tmp_path / "out" / f"{WORKSHEETS[user_type]}.parquet")
+            codes[user_type] = table.column("Registration Code").to_pylist()
+    else:
+        from openpyxl import load_workbook
+        workbook = load_workbook(tmp_path / "out" / "submissions.xlsx", read_only=True)
+        for user_type in LAYOUTS:
+            rows = workbook[WORKSHEETS[user_type]].iter_rows(min_row=2, values_only=True)
+            codes[user_type] = [row[2] for row in rows]
+    assert codes == {"owner": ["L-0", "L-4", "N-owner"], "future": ["L-1", "L-3", "N-future"],
+                     "starter": ["L-2", "N-starter"]}
+
+
+def test_batch_reports_place_sheet1_rows(mixed):
+    found = [(user_type, data["Registration Code"])
+             for user_type, data in submissions(mixed, list(LAYOUTS), page_size=2)]
+    assert mixed.reads[LEGACY_SHEET] == 3
+    assert found == [("owner", "L-0"), ("future", "L-1"), ("starter", "L-2"), ("future", "L-3"), ("owner", "L-4")] \
+        + [(user_type, f"N-{user_type}") for user_type in LAYOUTS]
@@ -0,0 +1,60 @@
+import pytest
+
+from recommendations import RULES, Rule, compile_rules, recommend, summary
+
+
+def titles(user_type, answers):
+    return [rule.title for rule in recommend(user_type, answers)]
+
+
+@pytest.mark.parametrize("s3, s4, fires", [
+    ("No savings", "No", True),
+    ("No savings", "Yes", False),
+    ("Enough savings", "No", False),
+    ("No savings", None, False),   # s4 not answered yet
+])
+def test_financing_guidance_needs_both_conditions(s3, s4, fires):
+    assert ("Financing guidance" in titles("starter", {"s3": s3, "s4": s4})) is fires
+
+
+@pytest.mark.parametrize("s4, fires", [("Maybe", True), ("No", True), ("Yes", False)])
+def test_tuple_options_match_any_of_them(s4, fires):
+    assert ("Budget carefully" in titles("starter", {"s3": "Small savings", "s4": s4})) is fires
+
+
+@pytest.mark.parametrize("answer", ["Rarely", "Almost never"])
+def test_single_condition_tuple_options(answer):
+    assert titles("owner", {"social1": answer}) == ["Grow your network"]
+
+
+def test_sorted_by_priority_then_table_order():
+    answers = {"s9": "Not really", "s7": "Not yet", "s1": "No idea yet", "s8": "No",
+               "s3": "No savings", "s4": "No"}
+    assert titles("starter", answers) == [
+        "Financing guidance", "Shape an idea", "Define your customer",   # priority 1, in table order
+        "Research competitors",
+        "Manage risk",
+    ]
+    assert summary(recommend("starter", answers)).startswith("Financing guidance; Shape an idea; ")
+
+
+def test_rules_only_fire_for_their_user_type():
+    assert titles("future", {"s3": "No savings", "s4": "No"}) == []
+    assert titles("nobody", {"s3": "No savings", "s4": "No"}) == []
+
+
+def test_every_rule_compiles():
+    index = compile_rules(RULES)
+    assert sorted(index) == ["future", "owner", "starter"]
+    assert sorted({i for lookup in index.values() for ids in lookup.values() for i in ids}) == list(range(len(RULES)))
+
+
+@pytest.mark.parametrize("rule, message", [
+    (Rule("Mixed", "x", 1, (("s3", "No savings"), ("fe6", "No"))), "exactly one user type"),
+    (Rule("Unknown key", "x", 1, (("s99", "No"),)), "exactly one user type"),
+    (Rule("Typo", "x", 1, (("s4", "Nope"),)), "not an option"),
+    (Rule("Urgent", "x", 0, (("s4", "No"),)), "unknown priority"),
+])
+def test_compile_rules_rejects_bad_rules(rule, message):
+    with pytest.raises(ValueError, match=message):
+        compile_rules(RULES + (rule,))
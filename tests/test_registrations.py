@@ -0,0 +1,74 @@
+import time
+
+import storage
+from questionnaire import SHEET_HEADERS, WORKSHEETS
+from registrations import RegistrationIndex
+
+
+def stored_row(sheet, code):
+    row = [""] * len(SHEET_HEADERS[sheet])
+    row[SHEET_HEADERS[sheet].index("Registration Code")] = code
+    return row
+
+
+def wait_synced(index):
+    deadline = time.monotonic() + 5
+    while not index.synced and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert index.synced
+
+
+def test_sync_reads_stored_codes(tmp_path):
+    backend = storage.SQLiteStorage(str(tmp_path / "rows.db"))
+    backend.append_rows(WORKSHEETS["owner"], [stored_row(WORKSHEETS["owner"], "AB-1")])
+    index = RegistrationIndex(str(tmp_path / "codes.db"), lambda: backend, refresh_seconds=3600, page_size=2)
+    wait_synced(index)
+    assert " ab-1" in index
+
+    sheet = WORKSHEETS["future"]
+    backend.append_rows(sheet, [stored_row(sheet, f"F-{i}") for i in range(5)])
+    assert index.sync() == 5
+    assert "F-4" in index
+    assert index.sync() == 0   # only rows past the cursor are read
+    index.close()
+
+
+def test_codes_and_cursors_survive_restart(tmp_path):
+    backend = storage.SQLiteStorage(str(tmp_path / "rows.db"))
+    sheet = WORKSHEETS["starter"]
+    backend.append_rows(sheet, [stored_row(sheet, "S-1")])
+    index = RegistrationIndex(str(tmp_path / "codes.db"), lambda: backend, refresh_seconds=3600)
+    wait_synced(index)
+    index.add("LOCAL-1")
+    index.close()
+
+    index = RegistrationIndex(str(tmp_path / "codes.db"), lambda: backend, refresh_seconds=3600)
+    wait_synced(index)
+    assert "S-1" in index and "local-1" in index
+    assert index.stats()["cursors"][sheet] == 1
+    index.close()
+
+
+def test_failed_sync_keeps_the_index_usable(tmp_path):
+    def broken():
+        raise ConnectionError("storage down")
+    index = RegistrationIndex(str(tmp_path / "codes.db"), broken, refresh_seconds=3600)
+    deadline = time.monotonic() + 5
+    while index.last_error is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert "ConnectionError" in index.last_error
+    index.add("X-1")
+    assert "x-1" in index
+    index.close()
+
+
+def test_codes_of_sheet1_count(tmp_path):
+    # sheet1 rows have no Schema Version: the code is the second cell
+    backend = storage.SQLiteStorage(str(tmp_path / "rows.db"))
+    backend.append_rows(storage.LEGACY_SHEET, [["2024-05-01 10:00:00", "OLD-7", "41–50", "Male", "2", "Yes"]])
+    index = RegistrationIndex(str(tmp_path / "codes.db"), lambda: backend, refresh_seconds=3600)
+    wait_synced(index)
+    assert "OLD-7" in index
+    assert "2024-05-01 10:00:00" not in index
+    assert index.stats()["codes"] == 1
+    index.close()
@@ -0,0 +1,49 @@
+import os
+
+import report_cache
+from report_cache import ReportCache, report_key
+
+
+def spill_files(spill_dir):
+    return sorted(name for name in os.listdir(spill_dir) if name.endswith(".pdf"))
+
+
+def test_spills_are_trimmed_oldest_first(tmp_path):
+    # A memory tier of one report: every put spills the previous one
+    cache = ReportCache(10, str(tmp_path), max_disk_bytes=25)
+    for key in "abcde":
+        cache.put(key, key.encode() * 10)
+    assert spill_files(tmp_path) == ["c.pdf", "d.pdf"]
+    assert cache.stats()["disk_bytes"] == 20
+    assert "a" not in cache
+    # A disk hit counts as a use: promoting "c" spills "e" and trims "d", not "c"
+    assert cache.get("c") == b"c" * 10
+    assert spill_files(tmp_path) == ["c.pdf", "e.pdf"]
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    cache = ReportCache(10, str(tmp_path), max_disk_bytes=100)
+    for key in "abc":
+        cache.put(key, key.encode() * 10)
+    cache = ReportCache(10, str(tmp_path), max_disk_bytes=100)
+    assert cache.stats()["disk_entries"] == 2
+    assert cache.stats()["disk_bytes"] == 20
+    assert cache.get("a") == b"a" * 10
+
+
+def test_files_removed_behind_its_back_are_tolerated(tmp_path):
+    cache = ReportCache(10, str(tmp_path), max_disk_bytes=15)
+    cache.put("a", b"a" * 10)
+    cache.put("b", b"b" * 10)
+    os.remove(tmp_path / "a.pdf")
+    cache.put("c", b"c" * 10)   # trims "a", which is already gone
+    assert spill_files(tmp_path) == ["b.pdf"]
+    assert cache.stats()["disk_bytes"] == 10
+
+
+def test_key_changes_with_the_report_tables(monkeypatch):
+    before = report_key("owner", b"\x01\x02")
+    assert report_key("owner", b"\x01\x02") == before
+    assert report_key("starter", b"\x01\x02") != before
+    monkeypatch.setattr(report_cache, "LAYOUT_SALT", b"edited rules")
+    assert report_key("owner", b"\x01\x02") != before
@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+from answers import Answers
+from questionnaire import BASIC_FIELDS, LAYOUTS, OPTIONS, ROW_PREFIX, SCORE_COLUMNS, SHEET_HEADERS, WORKSHEETS
+from scoring import LOOKUPS, POINTS, compile_points, score, score_batch, score_rows
+
+
+def pick(key, choose):
+    # Option index of the best (choose=max) or worst (choose=min) answer; unscored questions take option 1
+    if key not in POINTS:
+        return 1
+    option_points = POINTS[key][2]
+    return 1 + option_points.index(choose(option_points))
+
+
+def session(user_type, codes):
+    answers = Answers()
+    answers.set_codes(dict(zip(LAYOUTS[user_type], codes)))
+    return answers
+
+
+@pytest.mark.parametrize("user_type", sorted(LAYOUTS))
+def test_best_answers_score_100(user_type):
+    answers = session(user_type, [pick(key, max) for key in LAYOUTS[user_type]])
+    assert score(answers) == dict.fromkeys(SCORE_COLUMNS[user_type], 100.0)
+
+
+@pytest.mark.parametrize("user_type", sorted(LAYOUTS))
+def test_worst_answers_score_0(user_type):
+    answers = session(user_type, [pick(key, min) for key in LAYOUTS[user_type]])
+    expected = dict.fromkeys(SCORE_COLUMNS[user_type], 0.0)
+    if user_type == "owner":
+        # Every financial3 option (a goal, not a scale) earns at least 1 of 3 points, weight 0.5 of 2.5
+        expected["Financial Score"] = round(100 * 0.5 * 1 / 3 / 2.5, 1)
+    assert score(answers) == expected
+
+
+def test_no_user_type_scores_nothing():
+    assert score(Answers()) == {}
+
+
+def test_weights_are_normalized_per_dimension():
+    # The best contribution of every question of a dimension adds up to 100
+    for user_type, lookup in LOOKUPS.items():
+        best = [0.0] * len(SCORE_COLUMNS[user_type])
+        for _, dim, contributions in lookup:
+            assert contributions[0] == 0.0
+            best[dim] += max(contributions)
+        assert best == pytest.approx([100.0] * len(best))
+
+
+def test_weight_counts_towards_the_share():
+    points = dict(POINTS, s3=("Starter Readiness", 9.0, (2, 1, 0)))
+    position = LAYOUTS["starter"].index("s3")
+    contributions = {p: c for p, _, c in compile_points(points)["starter"]}[position]
+    total = sum(weight for key, (dim, weight, _) in points.items() if dim == "Starter Readiness")
+    assert contributions[1] == pytest.approx(100 * 9.0 / total)
+    assert contributions[2] == pytest.approx(100 * 9.0 / total / 2)
+
+
+@pytest.mark.parametrize("change, message", [
+    ({"s3": ("Starter Readiness", 1.0, (2, 1))}, "point values"),
+    ({"s3": ("Family", 1.0, (2, 1, 0))}, "doesn't have"),
+    ({key: None for key in POINTS if POINTS[key][0] == "Future Aptitude"}, "no questions score"),
+])
+def test_compile_points_rejects_bad_tables(change, message):
+    points = {key: value for key, value in {**POINTS, **change}.items() if value is not None}
+    with pytest.raises(ValueError, match=message):
+        compile_points(points)
+
+
+@pytest.mark.parametrize("user_type", sorted(LAYOUTS))
+def test_batch_matches_single_sessions(user_type):
+    rng = random.Random(7)
+    layout = LAYOUTS[user_type]
+    # Index 0 (unanswered) included, as a half-finished draft would have it
+    codes = [[rng.randrange(len(OPTIONS[key])) for key in layout] for _ in range(50)]
+    batch = score_batch(user_type, codes)
+    for row, scores in zip(codes, batch):
+        expected = score(session(user_type, row))
+        assert list(scores) == pytest.approx(list(expected.values()), abs=0.05)
+
+
+def test_score_rows_reads_stored_rows():
+    user_type = "owner"
+    header = SHEET_HEADERS[WORKSHEETS[user_type]]
+    start = len(ROW_PREFIX) + len(BASIC_FIELDS)
+    best = [pick(key, max) for key in LAYOUTS[user_type]]
+    row = [""] * len(header)
+    row[start:start + len(best)] = [OPTIONS[key][i] for key, i in zip(LAYOUTS[user_type], best)]
+    edited = list(row)
+    edited[start + LAYOUTS[user_type].index("family1")] = "edited by hand"   # counts as unanswered
+
+    scores = score_rows(user_type, [row, edited])
+    assert list(scores[0]) == pytest.approx([100.0] * len(SCORE_COLUMNS[user_type]))
+    family = SCORE_COLUMNS[user_type].index("Family Score")
+    assert scores[1][family] == pytest.approx(200 / 3)
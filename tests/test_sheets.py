@@ -0,0 +1,72 @@
+import gspread
+import pytest
+
+import sheets
+import storage
+
+
+class StubWorksheet:
+    def __init__(self, header=None):
+        self.rows = [list(header)] if header else []
+
+    def row_values(self, n):
+        return self.rows[n - 1] if len(self.rows) >= n else []
+
+    def append_row(self, row):
+        self.rows.append(list(row))
+
+    def append_rows(self, rows):
+        self.rows.extend(list(r) for r in rows)
+
+    def col_values(self, n):
+        return [row[n - 1] for row in self.rows]
+
+    def get(self, cells):
+        # "A2:R10" or "2:10": whole rows are enough for these tests
+        first, last = (int(part.lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ")) for part in cells.split(":"))
+        return [list(row) for row in self.rows[first - 1:last]]
+
+
+class StubSpreadsheet:
+    def __init__(self, worksheets=None):
+        self.worksheets = dict(worksheets or {})
+        self.sheet1 = StubWorksheet()
+
+    def worksheet(self, title):
+        if title not in self.worksheets:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return self.worksheets[title]
+
+    def add_worksheet(self, title, rows, cols):
+        ws = self.worksheets[title] = StubWorksheet()
+        return ws
+
+
+def connection(spreadsheet):
+    conn = sheets.SheetsConnection({}, "key")
+    conn._spreadsheet = spreadsheet
+    conn._worksheet = spreadsheet.sheet1
+    conn._credentials = type("Credentials", (), {"expiry": None})()
+    return conn
+
+
+def test_new_worksheet_gets_its_header():
+    spreadsheet = StubSpreadsheet()
+    header = ["a", "b"]
+    connection(spreadsheet).append_rows([["1", "2"]], "new", header)
+    assert spreadsheet.worksheets["new"].rows == [header, ["1", "2"]]
+
+
+def test_header_mismatch_is_refused():
+    spreadsheet = StubSpreadsheet({"ws": StubWorksheet(["a", "edited"])})
+    with pytest.raises(sheets.SchemaMismatch):
+        connection(spreadsheet).append_rows([["1", "2"]], "ws", ["a", "b"])
+    assert spreadsheet.worksheets["ws"].rows == [["a", "edited"]]
+
+
+def test_legacy_sheet_is_read_from_its_first_row():
+    spreadsheet = StubSpreadsheet()
+    spreadsheet.sheet1.rows = [["a", "b"], ["c"], ["d", "e", "f"]]
+    backend = storage.SheetsStorage(connection(spreadsheet))
+    assert backend.row_count(storage.LEGACY_SHEET) == 3
+    assert backend.read_rows(storage.LEGACY_SHEET, 1, 5) == [["c"], ["d", "e", "f"]]
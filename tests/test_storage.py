@@ -0,0 +1,120 @@
+import csv
+import json
+import sqlite3
+
+import pytest
+
+import storage
+from questionnaire import SHEET_HEADERS, WORKSHEETS
+
+SHEET = WORKSHEETS["future"]
+WIDTH = len(SHEET_HEADERS[SHEET])
+
+
+def rows(n, start=0):
+    return [[f"r{i}"] + [f"c{i}-{j}" for j in range(1, WIDTH)] for i in range(start, start + n)]
+
+
+def _sqlite(tmp_path):
+    return storage.SQLiteStorage(str(tmp_path / "rows.db"))
+
+
+def _csv(tmp_path):
+    return storage.CsvLogStorage(str(tmp_path / "csv"))
+
+
+def _parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    return storage.ParquetLogStorage(str(tmp_path / "parquet"))
+
+
+def _fake(tmp_path):
+    return storage.FakeSheetsStorage(latency=0, jitter=0, quota_per_minute=0)
+
+
+@pytest.fixture(params=[_sqlite, _csv, _parquet, _fake], ids=["sqlite", "csv", "parquet", "fake"])
+def backend(request, tmp_path):
+    return request.param(tmp_path)
+
+
+def test_round_trip(backend):
+    backend.append_rows(SHEET, rows(3))
+    backend.append_rows(SHEET, rows(2, start=3))
+    assert backend.row_count(SHEET) == 5
+    assert backend.read_rows(SHEET) == rows(5)
+
+
+def test_read_pages(backend):
+    backend.append_rows(SHEET, rows(7))
+    pages = [backend.read_rows(SHEET, start, 3) for start in (0, 3, 6, 9)]
+    assert pages == [rows(3), rows(3, start=3), rows(1, start=6), []]
+    # Reading from the middle again (not where the last read stopped)
+    assert backend.read_rows(SHEET, 2, 2) == rows(2, start=2)
+
+
+def test_worksheets_are_separate(backend):
+    other = WORKSHEETS["starter"]
+    other_row = ["x"] * len(SHEET_HEADERS[other])
+    backend.append_rows(SHEET, rows(2))
+    backend.append_rows(other, [other_row])
+    assert backend.read_rows(SHEET) == rows(2)
+    assert backend.read_rows(other) == [other_row]
+
+
+def test_empty_worksheet(backend):
+    assert backend.row_count(SHEET) == 0
+    assert backend.read_rows(SHEET, 0, 10) == []
+
+
+def test_sqlite_failed_append_rolls_back(tmp_path):
+    backend = _sqlite(tmp_path)
+    with pytest.raises(sqlite3.Error):
+        backend.append_rows(SHEET, [["too", "short"]])
+    # The failed batch left nothing behind and the connection still takes writes
+    backend.append_rows(SHEET, rows(1))
+    backend.append_rows(WORKSHEETS["owner"], [["x"] * len(SHEET_HEADERS[WORKSHEETS["owner"]])])
+    assert backend.read_rows(SHEET) == rows(1)
+
+
+def test_sqlite_partial_batch_is_not_kept(tmp_path):
+    backend = _sqlite(tmp_path)
+    with pytest.raises(sqlite3.Error):
+        backend.append_rows(SHEET, rows(2) + [["too", "short"]])
+    assert backend.row_count(SHEET) == 0
+
+
+def test_fake_quota(tmp_path):
+    backend = storage.FakeSheetsStorage(latency=0, jitter=0, quota_per_minute=2)
+    backend.append_rows(SHEET, rows(1))
+    backend.append_rows(SHEET, rows(1))
+    with pytest.raises(storage.QuotaExceeded):
+        backend.append_rows(SHEET, rows(1))
+    assert backend.row_count(SHEET) == 2
+    assert backend.quota_errors == 1
+
+
+def test_fake_transport_error(tmp_path):
+    backend = storage.FakeSheetsStorage(latency=0, jitter=0, quota_per_minute=0, error_rate=1.0)
+    with pytest.raises(ConnectionError):
+        backend.append_rows(SHEET, rows(1))
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        storage.make_storage({"backend": "nope"})
+
+
+def test_incomplete_backend_fails_when_created():
+    class WriteOnly(storage.Storage):
+        def append_rows(self, sheet, rows):
+            pass
+
+    with pytest.raises(TypeError, match="read_rows"):
+        WriteOnly()
+
+
+def test_legacy_sheet_round_trip(backend):
+    legacy = [["2024-01-01 00:00:00", "A-1", "3"], ["2024-01-02 00:00:00", "A-2", "x", "y"]]
+    backend.append_rows(storage.LEGACY_SHEET, legacy)
+    assert backend.read_rows(storage.LEGACY_SHEET) == legacy
+    assert backend.read_rows(storage.LEGACY_SHEET, 1, 1) == [["2024-01-02 00:00:00", "A-2", "x", "y"]]
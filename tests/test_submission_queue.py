@@ -0,0 +1,144 @@
+import functools
+import time
+
+import pytest
+
+import submission_queue
+from submission_queue import SubmissionQueue
+
+
+class Sink:
+    def __init__(self):
+        self.rows = {}
+        self.failing = set()
+
+    def __call__(self, sheet, rows):
+        if sheet in self.failing:
+            raise RuntimeError(f"{sheet} is broken")
+        self.rows.setdefault(sheet, []).extend(rows)
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return str(tmp_path / "spool.db")
+
+
+def stop_writer(queue):
+    # Tests drive flush() themselves; a full batch would otherwise wake the writer thread
+    queue._stop.set()
+    queue._wake.set()
+    queue._thread.join()
+    return queue
+
+
+def open_queue(sink, spool, **kwargs):
+    return stop_writer(SubmissionQueue(sink, spool_path=spool, **kwargs))
+
+
+def test_flush_writes_in_order(spool):
+    sink = Sink()
+    queue = open_queue(sink, spool)
+    for i in range(5):
+        queue.enqueue([i], "a")
+    assert queue.flush()
+    assert sink.rows == {"a": [[0], [1], [2], [3], [4]]}
+    assert queue.depth == 0
+    queue.close()
+
+
+def test_batches_respect_max_batch(spool):
+    calls = []
+    queue = open_queue(lambda sheet, rows: calls.append(len(rows)), spool, max_batch=2)
+    for i in range(5):
+        queue.enqueue([i], "a")
+    queue.flush()
+    assert calls == [2, 2, 1]
+    queue.close()
+
+
+def test_failed_rows_stay_spooled_and_replay_after_restart(spool):
+    sink = Sink()
+    sink.failing.add("a")
+    queue = open_queue(sink, spool)
+    queue.enqueue(["x"], "a")
+    assert not queue.flush()
+    assert queue.depth == 1
+    queue._db.close()   # simulate a crash: nothing flushed on the way out
+
+    sink = Sink()
+    queue = SubmissionQueue(sink, spool_path=spool, max_wait=0.01)
+    deadline = time.monotonic() + 5
+    while queue.depth and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sink.rows == {"a": [["x"]]}
+    queue.close()
+
+
+def test_duplicate_key_is_dropped(spool):
+    sink = Sink()
+    queue = open_queue(sink, spool)
+    assert queue.enqueue(["first"], "a", key="k1")
+    assert not queue.enqueue(["again"], "a", key="k1")
+    assert queue.enqueue(["other"], "a", key="k2")
+    assert queue.enqueue(["no key"], "a")
+    queue.flush()
+    assert sink.rows == {"a": [["first"], ["other"], ["no key"]]}
+    assert queue.stats()["duplicates"] == 1
+    queue.close()
+
+
+def test_duplicate_key_is_remembered_across_restarts(spool):
+    queue = open_queue(Sink(), spool)
+    queue.enqueue(["first"], "a", key="k1")
+    queue.close()
+    queue = open_queue(Sink(), spool)
+    assert not queue.enqueue(["again"], "a", key="k1")
+    queue.close()
+
+
+def test_failing_worksheet_does_not_block_the_others(spool):
+    sink = Sink()
+    sink.failing.add("broken")
+    queue = open_queue(sink, spool)
+    queue.enqueue(["b1"], "broken")
+    queue.enqueue(["g1"], "good")
+    queue.enqueue(["o1"], "other")
+    assert not queue.flush()
+    assert sink.rows == {"good": [["g1"]], "other": [["o1"]]}
+    stuck = queue.stats()["stuck"]
+    assert list(stuck) == ["broken"]
+    assert stuck["broken"]["rows"] == 1
+
+    # While "broken" backs off, the writer's drain skips it and carries on with the rest
+    queue.enqueue(["g2"], "good")
+    assert not queue._drain()
+    assert sink.rows["good"] == [["g1"], ["g2"]]
+    assert queue.stats()["failures"] == 1
+
+    sink.failing.clear()
+    assert queue.flush()
+    assert sink.rows["broken"] == [["b1"]]
+    assert queue.stats()["stuck"] == {}
+    queue.close()
+
+
+def test_spool_syncs_every_commit(spool):
+    queue = open_queue(Sink(), spool)
+    assert queue._db.execute("PRAGMA synchronous").fetchone()[0] == 2   # FULL
+    queue.close()
+
+
+def test_flush_uses_the_latest_storage_config(spool, tmp_path, monkeypatch):
+    # A secrets edit redirects the one queue on the spool instead of starting another
+    from storage import SQLiteStorage
+    monkeypatch.setattr(submission_queue, "_storage_configs", {})
+    flush_fn = functools.partial(submission_queue._append_to_storage, spool)
+    queue = open_queue(flush_fn, spool)
+    for name in ("first", "second"):
+        config = (("backend", "sqlite"), ("path", str(tmp_path / f"{name}.db")))
+        submission_queue._storage_configs[spool] = config
+        queue.enqueue([name], "a")
+        assert queue.flush()
+    queue.close()
+    assert SQLiteStorage(str(tmp_path / "first.db")).read_rows("a", 0, 10) == [["first"]]
+    assert SQLiteStorage(str(tmp_path / "second.db")).read_rows("a", 0, 10) == [["second"]]
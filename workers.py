@@ -0,0 +1,148 @@
+"""Bounded worker pool for report rendering.
+
+ReportLab layout is CPU-bound and holds the GIL, so reports are rendered in a
+small process pool instead of on the Streamlit script thread. The number of
+renders in flight is capped; once the cap is hit new work is rejected with
+``PoolBusy`` so the UI can tell the respondent instead of queueing forever.
+
+Settings come from the optional ``[workers]`` table in ``st.secrets``:
+``pdf_processes``, ``max_pending`` and ``report_timeout`` (seconds).
+
+Workers are spawned, and a spawned process normally re-runs the parent's
+``__main__`` first. Under ``streamlit run`` that is the app script itself, so
+every worker would execute personality_app.py (page config, secrets, widgets)
+before rendering anything. ``_SpawnProcess`` hides the script while a worker
+starts; workers only need this module and report.py.
+"""
+import multiprocessing.context
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import streamlit as st
+
+import metrics
+
+
+# Pool entry points import report.py inside the worker, so the app process
+# never has to load ReportLab itself.
+def _warm_up(collect_metrics=False):
+    if collect_metrics:
+        metrics.enable(collect_only=True)
+    import report
+    report.warm_up()
+
+
+def _render(user_type, data, generated_at=None):
+    # Timings recorded in the worker travel back with the PDF
+    import report
+    return report.render_report(user_type, data, generated_at), metrics.drain()
+
+
+class PoolBusy(Exception):
+    pass
+
+
+_main_lock = threading.Lock()
+
+
+class _SpawnProcess(multiprocessing.context.SpawnProcess):
+    # spawn reads __main__'s __spec__/__file__ while starting the child; a bare
+    # module has neither, so the child imports nothing of the parent's script
+    def start(self):
+        bare = types.ModuleType("__main__")
+        with _main_lock:
+            main = sys.modules["__main__"]
+            sys.modules["__main__"] = bare
+            try:
+                super().start()
+            finally:
+                # Streamlit swaps __main__ per script run; only undo our own swap
+                if sys.modules.get("__main__") is bare:
+                    sys.modules["__main__"] = main
+
+
+class _SpawnContext(multiprocessing.context.SpawnContext):
+    Process = _SpawnProcess
+
+
+class ReportPool:
+    def __init__(self, processes, max_pending):
+        # spawn, not fork: the Streamlit server is multi-threaded. The pool
+        # starts workers on demand (and replaces dead ones), always through
+        # _SpawnProcess.start.
+        self._executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=_SpawnContext(),
+            initializer=_warm_up,
+            initargs=(metrics.enabled(),),
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self.processes = processes
+        self.max_pending = max_pending
+        self.submitted = 0
+        self.rejected = 0
+
+    def submit(self, user_type, data, generated_at=None):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PoolBusy(f"{self.max_pending} reports are already being generated")
+        try:
+            job = self._executor.submit(_render, user_type, data, generated_at)
+        except Exception:
+            self._slots.release()
+            raise
+        # Callers get a future of the PDF bytes alone
+        future = Future()
+        future.set_running_or_notify_cancel()
+        started = time.perf_counter()
+
+        def done(job):
+            self._slots.release()
+            metrics.observe("report_job_seconds", time.perf_counter() - started, user_type=user_type)
+            if job.cancelled() or job.exception() is not None:
+                error = job.exception() if not job.cancelled() else RuntimeError("report job cancelled")
+                metrics.inc("report_errors", type=type(error).__name__)
+                future.set_exception(error)
+                return
+            pdf_bytes, samples = job.result()
+            metrics.merge(samples)
+            metrics.observe("report_pdf_bytes", len(pdf_bytes), user_type=user_type)
+            future.set_result(pdf_bytes)
+        job.add_done_callback(done)
+        self.submitted += 1
+        return future
+
+    def close(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self):
+        return {
+            "processes": self.processes,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+        }
+
+
+def settings():
+    cfg = st.secrets.get("workers", {})
+    processes = int(cfg.get("pdf_processes", min(4, os.cpu_count() or 1)))
+    return {
+        "pdf_processes": processes,
+        "max_pending": int(cfg.get("max_pending", processes * 4)),
+        "report_timeout": float(cfg.get("report_timeout", 30)),
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def _cached_pool(processes, max_pending):
+    return ReportPool(processes, max_pending)
+
+
+def get_report_pool():
+    cfg = settings()
+    return _cached_pool(cfg["pdf_processes"], cfg["max_pending"])